@@ -1,5 +1,5 @@
 from uuid import UUID
-from typing import List, Tuple
+from typing import List, Tuple, BinaryIO
 from app.services.parse_service import ParseService
 
 
@@ -7,6 +7,6 @@ class BatchController:
     def __init__(self):
         self.service = ParseService()
 
-    def create_batch(self, uploads: List[Tuple[str, bytes]]) -> UUID:
+    def create_batch(self, uploads: List[Tuple[str, BinaryIO]]) -> UUID:
         return self.service.create_batch_and_schedule(uploads)
 
@@ -18,6 +18,22 @@ class Settings(BaseSettings):
     minio_root_user: str = "minioadmin"
     minio_root_password: str = "minioadmin"
     minio_bucket: str = "omip"
+    # Host clients use for presigned URLs (MinIO as reachable from outside docker); defaults to minio_endpoint
+    minio_public_endpoint: str | None = None
+    minio_public_secure: bool = False
+    minio_region: str = "us-east-1"
+    presigned_url_expiry_seconds: int = 3600
+    # Streaming ingest: read size for hashing, and MinIO multipart part size (min 5 MiB)
+    upload_chunk_size: int = 1024 * 1024
+    minio_part_size: int = 8 * 1024 * 1024
+    # Files hashed/uploaded in parallel per request; the pool must cover it
+    upload_concurrency: int = 4
+    minio_pool_size: int = 16
+    # Resumable upload sessions: chunk size clients must use (>= 5 MiB, below proxy limit)
+    upload_session_part_size: int = 16 * 1024 * 1024
+    upload_session_ttl_seconds: int = 24 * 3600
+    # Archive ingestion: members larger than this are skipped (one member is held in memory at a time)
+    archive_max_member_size: int = 200 * 1024 * 1024
 
     celery_broker_url: str = "redis://localhost:6379/0"
     celery_result_backend: str = "redis://localhost:6379/0"
@@ -25,11 +41,88 @@ class Settings(BaseSettings):
 
     # PARSER API config
     parser_api_url: str = "https://edb59857d1b8.ngrok-free.app"
+    # Raw PARSER responses cached in MinIO by (file hash, schema, options, url, version);
+    # bump parser_version after a PARSER upgrade to stop serving old responses
+    parse_cache_enabled: bool = True
+    parser_version: str = "1"
+    parse_cache_max_age_days: int = 30
+    parse_cache_max_bytes: int = 5 * 1024 * 1024 * 1024
+    # celery beat runs prune_parse_cache_task this often
+    parse_cache_prune_interval_s: float = 24 * 3600.0
+    # Concurrent tasks for the same PDF wait for one PARSER call instead of repeating it.
+    # A waiting task is re-queued every poll_s (it does not hold a worker meanwhile)
+    # and calls PARSER itself after wait_s.
+    parse_single_flight_enabled: bool = True
+    parse_single_flight_wait_s: float = 600.0
+    parse_single_flight_poll_s: float = 5.0
+    # Comma-separated PARSER replicas; when set, replaces parser_api_url. Each request goes to
+    # the healthy replica with the lowest (in-flight + 1) x latency EWMA; a replica is evicted
+    # after parser_pool_failure_threshold consecutive failures and re-admitted after
+    # parser_pool_readmit_after_s. Raise parser_max_concurrency along with the replica count.
+    parser_api_urls: str = ""
+    parser_pool_failure_threshold: int = 3
+    parser_pool_readmit_after_s: float = 30.0
+    parser_timeout_s: float = 120.0  # read timeout
+    parser_connect_timeout_s: float = 10.0
+    # Keep-alive connections per PARSER host in each worker process
+    parser_http_pool_size: int = 8
+    # Cluster-wide adaptive (AIMD) limit on concurrent PARSER requests
+    parser_limiter_enabled: bool = True
+    parser_min_concurrency: float = 1
+    parser_max_concurrency: float = 8
+    parser_initial_concurrency: float = 1
+    parser_latency_target_s: float = 90.0  # slower successes do not raise the limit
+    parser_slot_wait_timeout_s: float = 300.0
+    # Cluster-wide requests/second per upstream (0 = unlimited); tasks wait for a token
+    parser_rate_limit_rps: float = 0
+    parser_rate_limit_burst: int = 1
+    rate_limit_wait_timeout_s: float = 300.0
+    # A task that timed out waiting for either limiter is re-queued after this, without using a retry
+    parser_limiter_requeue_s: float = 30.0
+    # Hedged PARSER requests: a duplicate is sent once a call outlives the observed latency
+    # quantile (needs min_samples recent observations), to parser_hedge_url if set
+    parser_hedge_enabled: bool = False
+    parser_hedge_quantile: float = 0.95
+    parser_hedge_min_samples: int = 50
+    parser_hedge_url: str | None = None
+    # Open the PARSER circuit after this many consecutive connection errors/timeouts/5xx;
+    # while open, tasks are parked and /schemas is probed every probe interval
+    parser_breaker_enabled: bool = True
+    parser_breaker_failure_threshold: int = 5
+    parser_breaker_probe_interval_s: float = 30.0
+
+    # Fair-share scheduling of bulk batches: at most scheduler_window parse tasks are
+    # queued/running at once, released round-robin across active batches
+    scheduler_enabled: bool = True
+    scheduler_window: int = 16
+    scheduler_lease_ttl_s: float = 3600.0
+    # Celery beat pumps the scheduler this often, reclaiming leases of lost or killed tasks
+    scheduler_reap_interval_s: float = 60.0
+
+    # Pipelined workers (opt-in): bulk batches are dispatched in chunks and each worker
+    # process downloads the next PDF and writes the previous result while PARSER works.
+    # Chunks are dispatched directly, bypassing the fair scheduler.
+    pipeline_enabled: bool = False
+    pipeline_chunk_size: int = 8
+    pipeline_prefetch: int = 2
+
+    # Split-and-merge (opt-in): PDFs with at least parse_split_min_pages pages are parsed as
+    # page ranges in parallel (a Celery chord) and the responses merged in page order.
+    # Applies to single-PDF tasks, not pipelined chunks; the merged response is put in the parse cache.
+    parse_split_enabled: bool = False
+    parse_split_min_pages: int = 40
+    parse_split_pages_per_chunk: int = 15
+
+    # Celery worker processes; the limiter above keeps PARSER load in check
+    worker_concurrency: int = 4
 
     # LLM config (mock in tests; do not call by default)
     LLM_PROVIDER: str | None = None
     LLM_MODEL: str | None = None
     LLM_API_KEY: str | None = None
+    llm_rate_limit_rps: float = 1.0
+    llm_rate_limit_burst: int = 5
+    llm_max_concurrency: int = 4
 
 
 settings = Settings()  # singleton
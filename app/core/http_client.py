@@ -0,0 +1,22 @@
+import os
+from functools import lru_cache
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.core.config import settings
+
+
+def get_parser_session() -> requests.Session:
+    """Keep-alive session for PARSER calls, one per process (never shared across a fork)."""
+    return _parser_session(os.getpid())
+
+
+@lru_cache(maxsize=1)
+def _parser_session(pid: int) -> requests.Session:
+    session = requests.Session()
+    # One pool per PARSER host; connections are reused across tasks in this worker process
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=settings.parser_http_pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
@@ -0,0 +1,11 @@
+from functools import lru_cache
+
+import redis
+
+from app.core.config import settings
+
+
+@lru_cache(maxsize=1)
+def get_redis() -> redis.Redis:
+    """Process-wide Redis client (same instance Celery uses as broker)."""
+    return redis.Redis.from_url(settings.redis_url, decode_responses=True)
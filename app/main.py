@@ -3,7 +3,7 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse
 
 from app.routers import batches, papers, elements, reviews, health, root
-from app.routers import uploads, parse_ops, runs, export
+from app.routers import uploads, parse_ops, runs, export, upload_sessions
 from app.routers import uploads, parse_ops
 
 
@@ -14,6 +14,7 @@ def create_app() -> FastAPI:
     app.include_router(health.router, prefix="/api", tags=["health"])
     app.include_router(batches.router, prefix="/api", tags=["batches"])
     app.include_router(uploads.router, prefix="/api", tags=["uploads"])
+    app.include_router(upload_sessions.router, prefix="/api", tags=["uploads"])
     app.include_router(parse_ops.router, prefix="/api", tags=["parse"])
     app.include_router(runs.router, prefix="/api", tags=["runs"])
     app.include_router(export.router, prefix="/api", tags=["export"])
@@ -27,6 +27,12 @@ class ParseStatus(enum.Enum):
     failed = "failed"
 
 
+class ParseStage(str, enum.Enum):
+    """Furthest pipeline step a run has completed (parse_runs.stage, NULL = not started)."""
+    parsed = "parsed"        # raw PARSER response checkpointed in MinIO
+    persisted = "persisted"  # result written to the database
+
+
 class ElementType(enum.Enum):
     table = "table"
     figure = "figure"
@@ -68,6 +74,7 @@ class ParseRun(Base):
     task_state = Column(Enum(BatchStatus, name="batch_status"), nullable=False)
     raw_metadata = Column(JSON, nullable=False)
     error_msg = Column(Text, nullable=True)
+    stage = Column(String(20), nullable=True)
     created_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"))
     updated_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"))
     annotated_at = Column(TIMESTAMP(timezone=True))
@@ -1,5 +1,5 @@
 from uuid import UUID
-from sqlalchemy import select, update
+from sqlalchemy import and_, case, func, literal, select, update
 from sqlalchemy.orm import Session
 from app.models.models import Batch, BatchStatus
 
@@ -17,28 +17,37 @@ class BatchRepository:
     def get(self, batch_id: UUID) -> Batch | None:
         return self.db.get(Batch, batch_id)
 
-    def increment_success(self, batch_id: UUID):
-        stmt = (
-            update(Batch)
-            .where(Batch.id == batch_id)
-            .values(success_count=Batch.success_count + 1)
-        )
-        self.db.execute(stmt)
+    def record_result(self, batch_id: UUID, success: bool):
+        """
+        Count one finished run and, if it was the last one, set the terminal
+        status, in a single UPDATE ... RETURNING.
 
-    def increment_failed(self, batch_id: UUID):
+        Concurrent callers are serialised by the row lock, so exactly one of
+        them gets back success_count + failed_count == total_count (see
+        just_completed). Returns the updated row, or None if the batch is gone.
+        """
+        status_type = Batch.__table__.c.status.type
+        failed_after = Batch.failed_count + (0 if success else 1)
+        done = Batch.success_count + Batch.failed_count + 1 >= Batch.total_count
         stmt = (
             update(Batch)
             .where(Batch.id == batch_id)
-            .values(failed_count=Batch.failed_count + 1)
+            .values(
+                success_count=Batch.success_count + (1 if success else 0),
+                failed_count=failed_after,
+                status=case(
+                    (and_(done, failed_after == 0), literal(BatchStatus.completed, status_type)),
+                    (done, literal(BatchStatus.failed, status_type)),
+                    else_=Batch.status,
+                ),
+                updated_at=func.now(),
+            )
+            .returning(Batch.id, Batch.status, Batch.total_count, Batch.success_count, Batch.failed_count)
+            .execution_options(synchronize_session=False)
         )
-        self.db.execute(stmt)
+        return self.db.execute(stmt).one_or_none()
 
-    def finalize_if_done(self, batch_id: UUID):
-        batch = self.get(batch_id)
-        if not batch:
-            return
-        processed = int(batch.success_count or 0) + int(batch.failed_count or 0)
-        if processed >= batch.total_count:
-            new_status = BatchStatus.completed if batch.failed_count == 0 else BatchStatus.failed
-            batch.status = new_status
-            self.db.add(batch)
+    @staticmethod
+    def just_completed(row) -> bool:
+        """True only for the record_result call that processed the batch's last run."""
+        return row is not None and row.success_count + row.failed_count == row.total_count
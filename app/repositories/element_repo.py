@@ -1,4 +1,4 @@
-from sqlalchemy import select
+from sqlalchemy import select, insert
 from sqlalchemy.orm import Session
 from uuid import UUID
 from app.models.models import ExtractedElement, ElementType
@@ -16,6 +16,19 @@ class ElementRepository:
         self.db.flush()
         return el
 
+    def bulk_create(self, run_id: UUID, elements: list[dict]) -> int:
+        """
+        Insert all elements of a run in one statement.
+
+        Each dict has type, label, caption, content and order_index. SQLAlchemy
+        sends the list as multi-row INSERT ... VALUES pages (insertmanyvalues),
+        so the round-trip count does not grow with the number of elements.
+        """
+        if not elements:
+            return 0
+        self.db.execute(insert(ExtractedElement), [{"run_id": run_id, **el} for el in elements])
+        return len(elements)
+
     def get(self, element_id: UUID) -> ExtractedElement | None:
         return self.db.get(ExtractedElement, element_id)
 
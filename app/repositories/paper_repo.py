@@ -1,6 +1,7 @@
-from sqlalchemy import select
+from sqlalchemy import select, any_, bindparam, String
+from sqlalchemy.dialects.postgresql import insert as pg_insert, ARRAY
 from sqlalchemy.orm import Session
-from uuid import UUID
+from uuid import UUID, uuid4
 from app.models.models import Paper
 
 
@@ -12,6 +13,47 @@ class PaperRepository:
         stmt = select(Paper).where(Paper.file_hash == file_hash)
         return self.db.execute(stmt).scalars().first()
 
+    def get_by_hashes(self, file_hashes: list[str]) -> dict[str, Paper]:
+        """Resolve many hashes in one ``WHERE file_hash = ANY(...)`` query."""
+        if not file_hashes:
+            return {}
+        hashes = bindparam("file_hashes", list(set(file_hashes)), type_=ARRAY(String))
+        stmt = select(Paper).where(Paper.file_hash == any_(hashes))
+        return {p.file_hash: p for p in self.db.execute(stmt).scalars().all()}
+
+    def bulk_create_missing(self, items: list[tuple[str, str]]) -> dict[str, Paper]:
+        """
+        Insert (filename, file_hash) pairs in one statement, skipping existing hashes.
+
+        Uses ``INSERT ... ON CONFLICT (file_hash) DO NOTHING RETURNING`` so rows
+        created concurrently by another request are silently left out of the
+        result rather than raising.
+        """
+        rows: dict[str, dict] = {}
+        for filename, file_hash in items:
+            rows.setdefault(file_hash, {"id": uuid4(), "filename": filename, "file_hash": file_hash})
+        if not rows:
+            return {}
+        stmt = (
+            pg_insert(Paper)
+            .values(list(rows.values()))
+            .on_conflict_do_nothing(index_elements=[Paper.file_hash])
+            .returning(Paper)
+        )
+        return {p.file_hash: p for p in self.db.scalars(stmt).all()}
+
+    def get_or_create_many(self, items: list[tuple[str, str]]) -> dict[str, Paper]:
+        """Map every file_hash in (filename, file_hash) pairs to a Paper in O(1) round trips."""
+        papers = self.get_by_hashes([h for _, h in items])
+        missing = [(f, h) for f, h in items if h not in papers]
+        if missing:
+            papers.update(self.bulk_create_missing(missing))
+            # Hashes skipped by ON CONFLICT were inserted by a concurrent request
+            lost = [h for _, h in missing if h not in papers]
+            if lost:
+                papers.update(self.get_by_hashes(lost))
+        return papers
+
     def create(self, filename: str, file_hash: str) -> Paper:
         paper = Paper(filename=filename, file_hash=file_hash)
         self.db.add(paper)
@@ -1,6 +1,6 @@
-from sqlalchemy import select
+from sqlalchemy import select, insert, update
 from sqlalchemy.orm import Session
-from uuid import UUID
+from uuid import UUID, uuid4
 from app.models.models import ParseRun, ParseStatus
 
 
@@ -34,6 +34,61 @@ class RunRepository:
         
         return run
 
+    def bulk_create(self, paper_ids: list[UUID], batch_id: UUID | None) -> list[UUID]:
+        """Create one pending run per paper in a single INSERT. Returns run ids in input order."""
+        from app.models.models import BatchStatus
+        if not paper_ids:
+            return []
+        rows = [
+            {
+                "id": uuid4(),
+                "paper_id": paper_id,
+                "batch_id": batch_id,
+                "status": ParseStatus.draft,
+                "task_state": BatchStatus.pending,
+                "raw_metadata": {},
+            }
+            for paper_id in paper_ids
+        ]
+        self.db.execute(insert(ParseRun).values(rows))
+        return [r["id"] for r in rows]
+
+    def mark_processing(self, run_id: UUID) -> str | None:
+        """Single UPDATE, no load: the worker has picked the run up. Returns the stage already reached."""
+        from app.models.models import BatchStatus
+        return self.db.execute(
+            update(ParseRun)
+            .where(ParseRun.id == run_id)
+            .values(task_state=BatchStatus.processing)
+            .returning(ParseRun.stage)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+
+    def set_stage(self, run_id: UUID, stage: str | None):
+        self.db.execute(
+            update(ParseRun)
+            .where(ParseRun.id == run_id)
+            .values(stage=stage)
+            .execution_options(synchronize_session=False)
+        )
+
+    def complete(self, run_id: UUID, raw_metadata: dict) -> bool:
+        """Store parsed metadata and mark the run completed in one UPDATE. Returns False if the run is gone."""
+        from app.models.models import BatchStatus, ParseStage
+        row = self.db.execute(
+            update(ParseRun)
+            .where(ParseRun.id == run_id)
+            .values(
+                raw_metadata=raw_metadata,
+                status=ParseStatus.draft,
+                task_state=BatchStatus.completed,
+                stage=ParseStage.persisted.value,
+            )
+            .returning(ParseRun.id)
+            .execution_options(synchronize_session=False)
+        ).first()
+        return row is not None
+
     def get(self, run_id: UUID) -> ParseRun | None:
         return self.db.get(ParseRun, run_id)
 
@@ -1,7 +1,9 @@
 from uuid import UUID
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from typing import List, BinaryIO
 
+from app.core.config import settings
 from app.core.deps import is_annotator, UserRole
 from app.controllers.batch_controller import BatchController
 from app.services.parse_service import ParseService
@@ -30,17 +32,14 @@ async def create_batch(files: List[UploadFile] = File(...), _role: UserRole = De
     start_time = time.time()
     logger.info(f"[PERF] Starting batch upload with {len(files)} files")
 
-    uploads: list[tuple[str, bytes]] = []
-    read_start = time.time()
-    for f in files:
-        uploads.append((f.filename, await f.read()))
-    read_time = time.time() - read_start
-    logger.info(f"[PERF] File read took {read_time:.2f}s")
+    # Starlette spools each UploadFile to a temp file; hand the file objects
+    # through so the service can stream them instead of reading into memory
+    uploads: list[tuple[str, BinaryIO]] = [(f.filename, f.file) for f in files]
 
-    # Use service to enqueue Celery tasks
+    # Use service to enqueue Celery tasks (blocking I/O, keep it off the event loop)
     service_start = time.time()
     service = ParseService()
-    batch_id = service.create_batch_and_schedule(uploads)
+    batch_id = await run_in_threadpool(service.create_batch_and_schedule, uploads)
     service_time = time.time() - service_start
     logger.info(f"[PERF] Service processing took {service_time:.2f}s")
 
@@ -50,13 +49,35 @@ async def create_batch(files: List[UploadFile] = File(...), _role: UserRole = De
     return BatchCreateResponse(batch_id=batch_id, total_count=len(uploads))
 
 
+@router.post("/batches/archive")
+async def create_batch_from_archive(
+    file: UploadFile | None = File(None),
+    object_key: str | None = Form(None),
+    _role: UserRole = Depends(is_annotator),
+):
+    """
+    Create a batch from a .zip / .tar(.gz) of PDFs, uploaded directly or already in MinIO.
+
+    The response reports, per archive member, whether it was stored, already
+    present (duplicate) or skipped, with a reason.
+    """
+    from app.services.archive_ingest_service import ArchiveIngestService
+
+    if (file is None) == (object_key is None):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Provide exactly one of file or object_key")
+    service = ArchiveIngestService()
+    if file is not None:
+        return await run_in_threadpool(service.ingest_upload, file.file, file.filename or "")
+    return await run_in_threadpool(service.ingest_object, object_key)
+
+
 @router.get("/batches/{batch_id}/runs")
 def list_batch_runs(batch_id: UUID, _role: UserRole = Depends(is_annotator)):
     with get_session() as db:
         from sqlalchemy import select
         from app.models.models import ParseRun, Paper
         rows = db.execute(
-            select(ParseRun.id, ParseRun.paper_id, ParseRun.status, ParseRun.task_state, ParseRun.error_msg, Paper.filename)
+            select(ParseRun.id, ParseRun.paper_id, ParseRun.status, ParseRun.task_state, ParseRun.error_msg, Paper.filename, ParseRun.stage)
             .join(Paper, Paper.id == ParseRun.paper_id)
             .where(ParseRun.batch_id == batch_id)
         ).all()
@@ -68,6 +89,7 @@ def list_batch_runs(batch_id: UUID, _role: UserRole = Depends(is_annotator)):
                 "task_state": r[3].value if hasattr(r[3], "value") else str(r[3]),
                 "error_msg": r[4],
                 "filename": r[5],
+                "stage": r[6],
             }
             for r in rows
         ]
@@ -81,14 +103,24 @@ def get_batch(batch_id: UUID, _role: UserRole = Depends(is_annotator)):
         if not batch:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Batch not found")
         processing = batch.total_count - (batch.success_count + batch.failed_count)
-        return BatchProgressResponse(
-            batch_id=batch.id,
-            status=batch.status.value,
-            total_count=batch.total_count,
-            success_count=batch.success_count,
-            failed_count=batch.failed_count,
-            processing_count=processing,
-        )
+
+    estimate = None
+    if processing > 0 and settings.scheduler_enabled:
+        from app.services.fair_scheduler import FairScheduler
+        try:
+            estimate = FairScheduler().estimate(str(batch_id), processing)
+        except Exception:
+            estimate = None  # progress must not depend on Redis
+    return BatchProgressResponse(
+        batch_id=batch.id,
+        status=batch.status.value,
+        total_count=batch.total_count,
+        success_count=batch.success_count,
+        failed_count=batch.failed_count,
+        processing_count=processing,
+        estimated_seconds_remaining=estimate["eta_seconds"] if estimate else None,
+        estimated_completion_at=estimate["estimated_completion_at"] if estimate else None,
+    )
 
 
 @router.get("/batches")
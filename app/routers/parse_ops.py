@@ -9,6 +9,8 @@ from app.schemas.api import BatchCreateResponse
 
 class ParseRequest(BaseModel):
     paper_ids: List[UUID]
+    # Call the PARSER API even if a cached response exists for these PDFs
+    force_reparse: bool = False
 
 
 router = APIRouter()
@@ -16,6 +18,21 @@ router = APIRouter()
 
 @router.post("/parse", response_model=BatchCreateResponse)
 def parse_papers(req: ParseRequest, _role: UserRole = Depends(is_annotator)):
-    batch_id = ParseService().create_batch_for_papers(req.paper_ids)
+    batch_id = ParseService().create_batch_for_papers(req.paper_ids, force_reparse=req.force_reparse)
     return BatchCreateResponse(batch_id=batch_id, total_count=len(req.paper_ids))
 
+
+
+@router.get("/parse/stats")
+def parser_stats(_role: UserRole = Depends(is_annotator)):
+    from app.services.external_parser_service import get_external_parser_service
+    from app.services.parser_metrics import Counter, LatencyHistogram
+    latency = LatencyHistogram("parser")
+    pool = get_external_parser_service().pool
+    return {
+        "endpoints": pool.snapshot() if pool else None,
+        "latency_p50_s": latency.quantile(0.5),
+        "latency_p95_s": latency.quantile(0.95),
+        "hedges_sent": Counter("parser:hedges_sent").value(),
+        "hedge_wins": Counter("parser:hedge_wins").value(),
+    }
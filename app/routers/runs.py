@@ -94,6 +94,7 @@ def get_run(run_id: UUID, _role: UserRole = Depends(is_staff)):
                 "batch_id": str(run.batch_id) if run.batch_id else None,
                 "status": run.status.value,
                 "task_state": run.task_state.value if run.task_state else None,
+                "stage": run.stage,
                 "error_msg": run.error_msg,
                 "created_at": run.created_at.isoformat() if run.created_at else None,
                 "result": {
@@ -198,6 +199,7 @@ def update_run_from_parser_json(run_id: UUID, payload: dict, _role: UserRole = D
         # Replace elements from tables + figures
         el_repo.delete_by_run(run.id)
 
+        elements = []
         order_index = 0
         for t in payload.get("tables", []) or []:
             content = {
@@ -207,14 +209,13 @@ def update_run_from_parser_json(run_id: UUID, payload: dict, _role: UserRole = D
                 "confidence": t.get("confidence"),
                 "is_manually_edited": True,
             }
-            el_repo.create(
-                run_id=run.id,
-                type_=MElementType.table,
-                label=f"Table {t.get('number') or order_index + 1}",
-                caption=t.get("caption"),
-                content=content,
-                order_index=order_index,
-            )
+            elements.append({
+                "type": MElementType.table,
+                "label": f"Table {t.get('number') or order_index + 1}",
+                "caption": t.get("caption"),
+                "content": content,
+                "order_index": order_index,
+            })
             order_index += 1
 
         for f in payload.get("figures", []) or []:
@@ -224,15 +225,15 @@ def update_run_from_parser_json(run_id: UUID, payload: dict, _role: UserRole = D
                 "image": f.get("image"),
                 "confidence": f.get("confidence"),
             }
-            el_repo.create(
-                run_id=run.id,
-                type_=MElementType.figure,
-                label=f"Figure {f.get('number') or order_index + 1}",
-                caption=f.get("caption"),
-                content=content,
-                order_index=order_index,
-            )
+            elements.append({
+                "type": MElementType.figure,
+                "label": f"Figure {f.get('number') or order_index + 1}",
+                "caption": f.get("caption"),
+                "content": content,
+                "order_index": order_index,
+            })
             order_index += 1
+        el_repo.bulk_create(run.id, elements)
 
         db.add(run)
         db.flush()
@@ -384,10 +385,11 @@ def get_run_version_content(run_id: UUID, version_id: UUID, _role: UserRole = De
 
 
 @router.post("/runs/{run_id}/retry")
-def retry_run(run_id: UUID, _role: UserRole = Depends(is_staff)):
-    """Retry a failed run by resetting status and re-queuing the task."""
+def retry_run(run_id: UUID, force: bool = False, _role: UserRole = Depends(is_staff)):
+    """Retry a failed run by resetting status and re-queuing the task (force=true bypasses the parse cache)."""
     from app.services.storage_service import StorageService
-    from app.workers.tasks import parse_pdf_task
+    from app.workers.tasks import dispatch_parse
+    from app.workers.celery_app import QUEUE_INTERACTIVE
     from app.models.models import BatchStatus
 
     with get_session() as db:
@@ -406,13 +408,16 @@ def retry_run(run_id: UUID, _role: UserRole = Depends(is_staff)):
         try:
             storage = StorageService()
             paper = run.paper
-            key = storage.object_key_for_pdf(paper.filename, paper.file_hash)
+            key = storage.object_key_for_pdf(paper.file_hash)
 
-            parse_pdf_task.delay(
+            # An annotator is waiting on this one: jump ahead of bulk batches
+            dispatch_parse(
                 str(run.batch_id) if run.batch_id else None,
                 str(run.id),
                 paper.filename,
-                key
+                key,
+                force,
+                queue=QUEUE_INTERACTIVE,
             )
         except Exception as e:
             # If dispatch fails, revert status (best effort)
@@ -426,10 +431,11 @@ def retry_run(run_id: UUID, _role: UserRole = Depends(is_staff)):
 
 
 @router.post("/runs/retry-failed")
-def retry_all_failed(_role: UserRole = Depends(is_staff)):
-    """Retry all failed runs by resetting their status and re-queuing tasks."""
+def retry_all_failed(force: bool = False, _role: UserRole = Depends(is_staff)):
+    """Retry all failed runs by resetting their status and re-queuing tasks (force=true bypasses the parse cache)."""
     from app.services.storage_service import StorageService
-    from app.workers.tasks import parse_pdf_task
+    from app.workers.tasks import dispatch_parse
+    from app.workers.celery_app import QUEUE_BACKFILL
     from app.models.models import BatchStatus
 
     with get_session() as db:
@@ -453,13 +459,15 @@ def retry_all_failed(_role: UserRole = Depends(is_staff)):
 
                 # Dispatch task
                 paper = run.paper
-                key = storage.object_key_for_pdf(paper.filename, paper.file_hash)
+                key = storage.object_key_for_pdf(paper.file_hash)
 
-                parse_pdf_task.delay(
+                dispatch_parse(
                     str(run.batch_id) if run.batch_id else None,
                     str(run.id),
                     paper.filename,
-                    key
+                    key,
+                    force,
+                    queue=QUEUE_BACKFILL,
                 )
                 retried_count += 1
             except Exception as e:
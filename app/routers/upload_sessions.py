@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, Request, Query
+from fastapi.concurrency import run_in_threadpool
+from app.core.deps import is_annotator, UserRole
+from app.schemas.api import UploadSessionCreateRequest, PresignRequest, PresignCompleteRequest
+from app.services.upload_session_service import UploadSessionService
+from app.services.presigned_upload_service import PresignedUploadService
+
+
+router = APIRouter()
+
+
+@router.post("/uploads/sessions")
+def create_upload_session(req: UploadSessionCreateRequest, _role: UserRole = Depends(is_annotator)):
+    """Open a resumable upload session; clients then PUT each file in `part_size` chunks."""
+    return UploadSessionService().create(req.files)
+
+
+@router.get("/uploads/sessions/{session_id}")
+def get_upload_session(session_id: str, _role: UserRole = Depends(is_annotator)):
+    """Session progress, including the chunk offsets still missing per file (for resume)."""
+    return UploadSessionService().describe(session_id)
+
+
+@router.put("/uploads/sessions/{session_id}/files/{index}")
+async def put_upload_chunk(
+    session_id: str,
+    index: int,
+    request: Request,
+    offset: int = Query(..., ge=0),
+    _role: UserRole = Depends(is_annotator),
+):
+    """Upload one chunk (raw request body) of file `index` starting at byte `offset`."""
+    data = await request.body()
+    return await run_in_threadpool(UploadSessionService().put_chunk, session_id, index, offset, data)
+
+
+@router.post("/uploads/sessions/{session_id}/complete")
+def complete_upload_session(session_id: str, _role: UserRole = Depends(is_annotator)):
+    """Assemble all files and register them as papers (same shape as POST /uploads)."""
+    return UploadSessionService().complete(session_id)
+
+
+@router.delete("/uploads/sessions/{session_id}")
+def abort_upload_session(session_id: str, _role: UserRole = Depends(is_annotator)):
+    UploadSessionService().abort(session_id)
+    return {"success": True}
+
+
+@router.post("/uploads/presign")
+def presign_uploads(req: PresignRequest, _role: UserRole = Depends(is_annotator)):
+    """Presigned PUT URLs for direct-to-MinIO upload; already-stored content gets no URL."""
+    return PresignedUploadService().presign(req.files)
+
+
+@router.post("/uploads/presign/complete")
+def complete_presigned_uploads(req: PresignCompleteRequest, _role: UserRole = Depends(is_annotator)):
+    """Check presigned uploads and register them as papers; sha256 is verified by a worker, so re-send `pending` files."""
+    return PresignedUploadService().complete(req.files)
@@ -1,5 +1,6 @@
-from typing import List
+from typing import List, BinaryIO
 from fastapi import APIRouter, UploadFile, File, Depends
+from fastapi.concurrency import run_in_threadpool
 from app.core.deps import is_annotator, UserRole
 from app.services.parse_service import ParseService
 
@@ -9,9 +10,7 @@ router = APIRouter()
 
 @router.post("/uploads")
 async def upload(files: List[UploadFile] = File(...), _role: UserRole = Depends(is_annotator)):
-    uploads: list[tuple[str, bytes]] = []
-    for f in files:
-        uploads.append((f.filename, await f.read()))
+    uploads: list[tuple[str, BinaryIO]] = [(f.filename, f.file) for f in files]
     service = ParseService()
-    return {"papers": service.upload_pdfs(uploads)}
+    return {"papers": await run_in_threadpool(service.upload_pdfs, uploads)}
 
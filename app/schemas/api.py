@@ -1,5 +1,5 @@
 from typing import Optional, List
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from uuid import UUID
 
 
@@ -26,3 +26,34 @@ class ApproveResponse(BaseModel):
     run_id: UUID
     status: str
 
+
+
+class UploadSessionFile(BaseModel):
+    filename: str
+    size: int = Field(gt=0)
+    # Optional client-side digest, verified on completion
+    sha256: Optional[str] = Field(default=None, pattern=r"^[0-9a-f]{64}$")
+
+
+class UploadSessionCreateRequest(BaseModel):
+    files: List[UploadSessionFile] = Field(min_length=1)
+
+
+class PresignFile(BaseModel):
+    filename: str
+    size: int = Field(gt=0)
+    sha256: str = Field(pattern=r"^[0-9a-f]{64}$")
+
+
+class PresignRequest(BaseModel):
+    files: List[PresignFile] = Field(min_length=1)
+
+
+class PresignCompleteFile(BaseModel):
+    upload_key: str
+    filename: str
+    size: int = Field(gt=0)
+
+
+class PresignCompleteRequest(BaseModel):
+    files: List[PresignCompleteFile] = Field(min_length=1)
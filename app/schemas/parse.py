@@ -1,5 +1,7 @@
+from datetime import datetime
 from typing import List, Optional, Union, Dict, Any
-from pydantic import BaseModel, ConfigDict, Field
+from typing_extensions import TypedDict
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from enum import Enum
 from uuid import UUID
 
@@ -72,15 +74,74 @@ class MetadataVersion(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ElementRow(TypedDict):
+    """An extracted element as inserted by ElementRepository.bulk_create; content is TableContent/FigureContent.model_dump()."""
+    type: ElementType
+    label: Optional[str]
+    caption: Optional[str]
+    content: Dict[str, Any]
+    order_index: int
+
+
 class ParsingResultPayload(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
     raw_metadata: PaperMetadata
-    elements: List[ExtractedElement]
+    elements: List[ExtractedElement] = Field(default_factory=list)
+    # Set instead of elements by PDFParserService.build_payload, which skips the model round trip
+    element_rows: Optional[List[ElementRow]] = None
     processing_time_ms: int
     error_msg: Optional[str] = None
 
 
+# Raw PARSER OMIP response. Plain dicts validated in one pass (pydantic-core),
+# with unknown keys kept so the response can still be stored verbatim.
+_RAW_CONFIG = ConfigDict(extra="allow")
+
+
+class ParserCell(TypedDict, total=False):
+    __pydantic_config__ = _RAW_CONFIG
+    text: Optional[str]
+    colspan: Optional[int]
+    rowspan: Optional[int]
+
+
+class ParserTable(TypedDict, total=False):
+    __pydantic_config__ = _RAW_CONFIG
+    number: Optional[str]
+    caption: Optional[str]
+    rows: List[List[ParserCell]]
+    confidence: Optional[float]
+
+
+class ParserImage(TypedDict, total=False):
+    __pydantic_config__ = _RAW_CONFIG
+    page: Optional[int]
+    bbox: Optional[List[float]]
+    path: Optional[str]
+
+
+class ParserFigure(TypedDict, total=False):
+    __pydantic_config__ = _RAW_CONFIG
+    number: Optional[str]
+    caption: Optional[str]
+    image: Optional[ParserImage]
+    confidence: Optional[float]
+
+
+class ParserResponse(TypedDict, total=False):
+    __pydantic_config__ = _RAW_CONFIG
+    omip_id: Optional[str]
+    title: Optional[str]
+    authors: List[str]
+    year: Optional[int]
+    tables: List[ParserTable]
+    figures: List[ParserFigure]
+
+
+PARSER_RESPONSE = TypeAdapter(ParserResponse)
+
+
 class BatchProgressResponse(BaseModel):
     batch_id: UUID
     status: str
@@ -88,3 +149,6 @@ class BatchProgressResponse(BaseModel):
     success_count: int
     failed_count: int
     processing_count: int
+    # Fair-share estimate while the batch is running (None once done or before any task finished)
+    estimated_seconds_remaining: Optional[float] = None
+    estimated_completion_at: Optional[datetime] = None
@@ -0,0 +1,196 @@
+"""
+Adaptive Concurrency Limiter - Cluster-wide AIMD limit on in-flight requests, kept in Redis
+"""
+import logging
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from app.core.config import settings
+from app.core.redis_client import get_redis
+
+
+logger = logging.getLogger(__name__)
+
+# Leases are a sorted set scored by expiry so slots held by a crashed worker free themselves.
+# Both scripts read Redis's clock so lease expiry and cooldowns agree across worker hosts.
+_ACQUIRE = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+local limit = tonumber(redis.call('HGET', KEYS[2], 'limit') or ARGV[3])
+if redis.call('ZCARD', KEYS[1]) < math.floor(limit) then
+  redis.call('ZADD', KEYS[1], now + tonumber(ARGV[2]), ARGV[1])
+  return 1
+end
+return 0
+"""
+
+# Additive increase (+1 per limit's worth of healthy completions), multiplicative decrease on
+# overload; decreases are spaced by a cooldown so one burst of 503s only cuts the limit once.
+_RELEASE = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+redis.call('ZREM', KEYS[1], ARGV[1])
+local limit = tonumber(redis.call('HGET', KEYS[2], 'limit') or ARGV[9])
+local min_limit = tonumber(ARGV[3])
+local max_limit = tonumber(ARGV[4])
+if ARGV[2] == 'overload' then
+  local last = tonumber(redis.call('HGET', KEYS[2], 'last_decrease') or '0')
+  if now - last >= tonumber(ARGV[6]) then
+    limit = math.max(min_limit, limit * tonumber(ARGV[5]))
+    redis.call('HSET', KEYS[2], 'last_decrease', now)
+  end
+elseif ARGV[2] == 'success' and tonumber(ARGV[7]) <= tonumber(ARGV[8]) then
+  limit = math.min(max_limit, limit + 1 / limit)
+end
+redis.call('HSET', KEYS[2], 'limit', limit)
+return tostring(limit)
+"""
+
+
+class LimiterTimeout(Exception):
+    pass
+
+
+class Slot:
+    """One acquired unit of concurrency; call record() with the request outcome."""
+
+    SUCCESS = "success"
+    OVERLOAD = "overload"  # 503/504/429/timeouts: back off
+    ERROR = "error"        # other failures: no signal about capacity
+
+    def __init__(self):
+        self.outcome = self.ERROR
+        self.started = time.time()
+
+    def record(self, outcome: str):
+        self.outcome = outcome
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Distributed AIMD concurrency limiter.
+
+    Every worker process acquires a lease before calling the upstream API. The
+    permitted number of leases grows by one per "window" of healthy responses
+    (success within the latency target) and is multiplied by ``decrease_factor``
+    on overload signals, so the cluster converges on whatever concurrency the
+    upstream can actually sustain. If Redis is unreachable the limiter fails
+    open rather than blocking parsing.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        min_limit: float,
+        max_limit: float,
+        initial_limit: float,
+        latency_target_s: float,
+        decrease_factor: float = 0.5,
+        decrease_cooldown_s: float = 5.0,
+        lease_ttl_s: float = 300.0,
+        wait_timeout_s: float = 300.0,
+    ):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.initial_limit = initial_limit
+        self.latency_target_s = latency_target_s
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown_s = decrease_cooldown_s
+        self.lease_ttl_s = lease_ttl_s
+        self.wait_timeout_s = wait_timeout_s
+        self.redis = get_redis()
+        self._acquire = self.redis.register_script(_ACQUIRE)
+        self._release = self.redis.register_script(_RELEASE)
+        self.inflight_key = f"limiter:{name}:inflight"
+        self.state_key = f"limiter:{name}:state"
+
+    @classmethod
+    def for_parser(cls) -> "AdaptiveConcurrencyLimiter":
+        return cls(
+            name="parser",
+            min_limit=settings.parser_min_concurrency,
+            max_limit=settings.parser_max_concurrency,
+            initial_limit=settings.parser_initial_concurrency,
+            latency_target_s=settings.parser_latency_target_s,
+            lease_ttl_s=settings.parser_timeout_s * 2,
+            wait_timeout_s=settings.parser_slot_wait_timeout_s,
+        )
+
+    @classmethod
+    def fixed(cls, name: str, limit: int, lease_ttl_s: float = 300.0) -> "AdaptiveConcurrencyLimiter":
+        """Plain distributed semaphore: the limit never moves."""
+        return cls(
+            name=name,
+            min_limit=limit,
+            max_limit=limit,
+            initial_limit=limit,
+            latency_target_s=0,
+            lease_ttl_s=lease_ttl_s,
+            wait_timeout_s=settings.rate_limit_wait_timeout_s,
+        )
+
+    def try_acquire(self) -> Optional[str]:
+        """Take a lease without waiting. Returns the lease token, or None if at the limit."""
+        token = uuid.uuid4().hex
+        got = self._acquire(
+            keys=[self.inflight_key, self.state_key],
+            args=[token, self.lease_ttl_s, self.initial_limit],
+        )
+        return token if got else None
+
+    def acquire(self) -> Optional[str]:
+        """Block until a lease is available. Returns None when Redis is unavailable (fail open)."""
+        deadline = time.time() + self.wait_timeout_s
+        delay = 0.1
+        while True:
+            try:
+                token = self.try_acquire()
+            except Exception as e:
+                logger.warning(f"[LIMITER] {self.name}: Redis unavailable, not limiting: {e}")
+                return None
+            if token:
+                return token
+            if time.time() >= deadline:
+                raise LimiterTimeout(f"timeout waiting {self.wait_timeout_s}s for a {self.name} concurrency slot")
+            time.sleep(delay + random.uniform(0, delay))
+            delay = min(delay * 2, 2.0)
+
+    def release(self, token: Optional[str], outcome: str, latency_s: float):
+        if token is None:
+            return
+        try:
+            limit = self._release(
+                keys=[self.inflight_key, self.state_key],
+                args=[
+                    token, outcome, self.min_limit, self.max_limit,
+                    self.decrease_factor, self.decrease_cooldown_s, latency_s,
+                    self.latency_target_s, self.initial_limit,
+                ],
+            )
+            if outcome == Slot.OVERLOAD:
+                logger.info(f"[LIMITER] {self.name}: overload after {latency_s:.1f}s, limit now {float(limit):.2f}")
+        except Exception as e:
+            logger.warning(f"[LIMITER] {self.name}: failed to release lease: {e}")
+
+    @contextmanager
+    def slot(self) -> Iterator[Slot]:
+        token = self.acquire()
+        slot = Slot()
+        try:
+            yield slot
+        finally:
+            self.release(token, slot.outcome, time.time() - slot.started)
+
+    def snapshot(self) -> dict:
+        state = self.redis.hgetall(self.state_key)
+        seconds, micros = self.redis.time()
+        return {
+            "name": self.name,
+            "limit": float(state.get("limit", self.initial_limit)),
+            "in_flight": self.redis.zcount(self.inflight_key, seconds + micros / 1e6, "+inf"),
+        }
@@ -0,0 +1,122 @@
+"""
+Archive Ingest Service - Create a batch from a ZIP/TAR archive of PDFs
+"""
+import logging
+import os
+import tarfile
+import zipfile
+from typing import Any, BinaryIO, Callable, Dict, Iterator, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.services.parse_service import ParseService
+from app.services.storage_service import StorageService
+
+
+logger = logging.getLogger(__name__)
+
+# (member name, uncompressed size, opener returning a readable stream for the member)
+Member = Tuple[str, int, Callable[[], BinaryIO]]
+
+
+class ArchiveIngestService:
+    """
+    Stream PDFs out of an archive one member at a time.
+
+    Nothing is unpacked to disk: ZIPs are read through their central directory
+    (ranged GETs when the archive is already in MinIO) and TARs are read in
+    stream mode. At most one member is held in memory while it is hashed and
+    stored.
+    """
+
+    def __init__(self):
+        self.storage = StorageService()
+        self.parse_service = ParseService()
+
+    def ingest_upload(self, stream: BinaryIO, archive_name: str = "") -> Dict[str, Any]:
+        if zipfile.is_zipfile(stream):
+            stream.seek(0)
+            return self._ingest_zip(stream)
+        stream.seek(0)
+        return self._ingest_tar(stream)
+
+    def ingest_object(self, object_key: str) -> Dict[str, Any]:
+        if not self.storage.object_exists(object_key):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Archive object not found")
+        if object_key.lower().endswith(".zip"):
+            return self._ingest_zip(self.storage.open_seekable(object_key))
+        response = self.storage.open_stream(object_key)
+        try:
+            return self._ingest_tar(response)
+        finally:
+            response.close()
+            response.release_conn()
+
+    def _ingest_zip(self, fileobj: BinaryIO) -> Dict[str, Any]:
+        try:
+            with zipfile.ZipFile(fileobj) as zf:
+                members: Iterator[Member] = (
+                    (info.filename, info.file_size, lambda info=info: zf.open(info))
+                    for info in zf.infolist()
+                    if not info.is_dir()
+                )
+                return self._ingest_members(members)
+        except zipfile.BadZipFile as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid ZIP archive: {e}")
+
+    def _ingest_tar(self, fileobj: BinaryIO) -> Dict[str, Any]:
+        try:
+            # "r|*": forward-only stream mode, transparently handles gz/bz2/xz
+            with tarfile.open(fileobj=fileobj, mode="r|*") as tar:
+                members: Iterator[Member] = (
+                    (member.name, member.size, lambda member=member: tar.extractfile(member))
+                    for member in tar
+                    if member.isfile()
+                )
+                return self._ingest_members(members)
+        except tarfile.TarError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid archive (expected .zip or .tar[.gz]): {e}")
+
+    def _ingest_members(self, members: Iterator[Member]) -> Dict[str, Any]:
+        results: list[Dict[str, Any]] = []
+        stored: list[tuple[str, str, str]] = []
+        seen: set[str] = set()
+
+        for name, size, opener in members:
+            result: Dict[str, Any] = {"member": name, "status": "skipped", "reason": None, "file_hash": None}
+            results.append(result)
+            if not name.lower().endswith(".pdf"):
+                result["reason"] = "not a PDF"
+                continue
+            if size > settings.archive_max_member_size:
+                result["reason"] = f"larger than {settings.archive_max_member_size} bytes"
+                continue
+
+            data = opener().read()
+            if not data.startswith(b"%PDF"):
+                result["reason"] = "missing %PDF header"
+                continue
+            file_hash = self.storage.compute_sha256(data)
+            result["file_hash"] = file_hash
+            if file_hash in seen:
+                result["reason"] = "same content as an earlier member"
+                continue
+            seen.add(file_hash)
+
+            key = self.storage.object_key_for_pdf(file_hash)
+            if self.storage.object_exists(key):
+                result["status"] = "duplicate"
+            else:
+                self.storage.put_object(key, data, content_type="application/pdf")
+                result["status"] = "stored"
+            stored.append((os.path.basename(name)[:255], file_hash, key))
+            logger.info(f"[PERF] Archive member {name}: {result['status']}")
+
+        batch_id: Optional[UUID] = self.parse_service.create_batch_for_stored(stored) if stored else None
+        return {
+            "batch_id": str(batch_id) if batch_id else None,
+            "total_count": len(stored),
+            "members": results,
+        }
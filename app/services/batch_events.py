@@ -0,0 +1,29 @@
+"""
+Batch Events - Publish batch lifecycle events on Redis pub/sub
+"""
+import json
+import logging
+
+from app.core.redis_client import get_redis
+
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "batch_events"
+
+
+def emit_batch_completed(row):
+    """Announce a batch's terminal state; called once, by the task that finished its last run."""
+    event = {
+        "event": "batch_completed",
+        "batch_id": str(row.id),
+        "status": row.status.value,
+        "total_count": row.total_count,
+        "success_count": row.success_count,
+        "failed_count": row.failed_count,
+    }
+    logger.info(f"[BATCH] {event['batch_id']} {event['status']}: {row.success_count}/{row.total_count} succeeded")
+    try:
+        get_redis().publish(CHANNEL, json.dumps(event))
+    except Exception as e:
+        logger.warning(f"[BATCH] Failed to publish completion of {event['batch_id']}: {e}")
@@ -0,0 +1,129 @@
+"""
+Circuit Breaker - Cluster-wide fast-fail for an unhealthy upstream, kept in Redis
+"""
+import json
+import logging
+import time
+from typing import Any, List, Optional
+
+from app.core.config import settings
+from app.core.redis_client import get_redis
+
+
+logger = logging.getLogger(__name__)
+
+# Count a failure and open the circuit once the threshold is reached.
+# Returns 1 only for the call that actually opened it.
+_RECORD_FAILURE = """
+local failures = redis.call('HINCRBY', KEYS[1], 'failures', 1)
+local state = redis.call('HGET', KEYS[1], 'state') or 'closed'
+if state == 'closed' and failures >= tonumber(ARGV[1]) then
+  redis.call('HSET', KEYS[1], 'state', 'open', 'opened_at', ARGV[2])
+  return 1
+end
+return 0
+"""
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker shared by every worker.
+
+    closed: requests flow; connection errors, timeouts and 5xx responses are
+    counted and any success resets the count. open: requests fail immediately
+    with CircuitOpenError and callers park their work. half_open: a single
+    probe (see ``probe_circuit_task``) is checking the upstream; requests still
+    fail fast until it closes the circuit. Redis errors fail open (closed).
+    """
+
+    def __init__(self, name: str, failure_threshold: int, probe_interval_s: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.probe_interval_s = probe_interval_s
+        self.key = f"circuit:{name}"
+        self.parked_key = f"circuit:{name}:parked"
+        self.probe_key = f"circuit:{name}:probe"
+        self.redis = get_redis()
+        self._record_failure = self.redis.register_script(_RECORD_FAILURE)
+
+    @classmethod
+    def for_parser(cls) -> "CircuitBreaker":
+        return cls(
+            name="parser",
+            failure_threshold=settings.parser_breaker_failure_threshold,
+            probe_interval_s=settings.parser_breaker_probe_interval_s,
+        )
+
+    def state(self) -> str:
+        try:
+            return self.redis.hget(self.key, "state") or "closed"
+        except Exception as e:
+            logger.warning(f"[CIRCUIT] {self.name}: Redis unavailable, assuming closed: {e}")
+            return "closed"
+
+    def is_open(self) -> bool:
+        return self.state() != "closed"
+
+    def check(self):
+        """Raise CircuitOpenError unless requests may go to the upstream."""
+        if self.is_open():
+            raise CircuitOpenError(f"{self.name} circuit is open; upstream unavailable")
+
+    def record_success(self):
+        try:
+            self.redis.hset(self.key, "failures", 0)
+        except Exception as e:
+            logger.warning(f"[CIRCUIT] {self.name}: failed to record success: {e}")
+
+    def record_failure(self):
+        try:
+            opened = self._record_failure(keys=[self.key], args=[self.failure_threshold, time.time()])
+        except Exception as e:
+            logger.warning(f"[CIRCUIT] {self.name}: failed to record failure: {e}")
+            return
+        if opened:
+            logger.warning(f"[CIRCUIT] {self.name}: opened after {self.failure_threshold} consecutive failures")
+            self.ensure_probe()
+
+    def half_open(self):
+        self.redis.hset(self.key, "state", "half_open")
+
+    def reopen(self):
+        self.redis.hset(self.key, "state", "open")
+
+    def close(self):
+        self.redis.hset(self.key, mapping={"state": "closed", "failures": 0})
+        self.redis.delete(self.probe_key)
+        logger.info(f"[CIRCUIT] {self.name}: closed")
+
+    def ensure_probe(self):
+        """Schedule a probe unless one is already pending (the key expires if its worker dies)."""
+        if self.redis.set(self.probe_key, "1", nx=True, ex=int(self.probe_interval_s * 3)):
+            self.schedule_probe()
+
+    def schedule_probe(self):
+        from app.workers.tasks import probe_circuit_task
+        self.redis.set(self.probe_key, "1", ex=int(self.probe_interval_s * 3))
+        probe_circuit_task.apply_async(args=[self.name], countdown=self.probe_interval_s)
+
+    def park(self, task_args: List[Any]):
+        """Hold a task's arguments until the circuit closes."""
+        self.redis.rpush(self.parked_key, json.dumps(task_args))
+        self.ensure_probe()
+
+    def pop_parked(self) -> Optional[List[Any]]:
+        raw = self.redis.lpop(self.parked_key)
+        return json.loads(raw) if raw else None
+
+    def snapshot(self) -> dict:
+        state = self.redis.hgetall(self.key)
+        return {
+            "name": self.name,
+            "state": state.get("state", "closed"),
+            "failures": int(state.get("failures", 0)),
+            "parked": self.redis.llen(self.parked_key),
+        }
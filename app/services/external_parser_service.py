@@ -1,26 +1,80 @@
 """
 PARSER API Client Service - Interfaces with the external PARSER server for PDF parsing
 """
+import logging
+import os
+import time
 import requests
-from typing import Dict, Any, Optional
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from functools import lru_cache
+from io import BytesIO
+from typing import BinaryIO, Callable, Dict, Any, List, Optional
 from app.core.config import settings
+from app.core.http_client import get_parser_session
+from app.services.adaptive_limiter import AdaptiveConcurrencyLimiter, LimiterTimeout, Slot
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.multipart_body import MultipartBody
+from app.schemas.parse import PARSER_RESPONSE
+from app.services.parser_metrics import Counter, LatencyHistogram
+from app.services.parser_pool import ParserEndpointPool
+from app.services.rate_limiter import RateLimitTimeout, TokenBucketRateLimiter
+
+
+logger = logging.getLogger(__name__)
 
 
 class ExternalParserService:
     """Client for PARSER API to parse PDF files into structured JSON."""
 
-    def __init__(self, base_url: str = None, timeout: float = 120.0):
+    # Upstream responses that mean "too much load", as opposed to a bad request
+    OVERLOAD_STATUS = (429, 503, 504)
+
+    def __init__(
+        self,
+        base_url: str = None,
+        timeout: float = None,
+        limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        endpoints: Optional[List[str]] = None,
+    ):
         """
         Initialize PARSER service client.
         
         Args:
             base_url: PARSER API base URL (default from settings or http://10.13.13.8:8000)
-            timeout: Request timeout in seconds
+            timeout: Request timeout in seconds (default from settings)
+            limiter: Concurrency limiter shared by all workers (default from settings)
+            breaker: Circuit breaker shared by all workers (default from settings)
+            endpoints: PARSER replicas to balance across (default from settings;
+                ignored when base_url is given)
         """
-        self.base_url = base_url or getattr(settings, 'parser_api_url', 'http://10.13.13.8:8000')
-        self.timeout = timeout
+        if endpoints is None and base_url is None:
+            endpoints = [u.strip().rstrip("/") for u in settings.parser_api_urls.split(",") if u.strip()]
+        self.endpoints = endpoints or [base_url or getattr(settings, 'parser_api_url', 'http://10.13.13.8:8000')]
+        # The first endpoint names the parser, e.g. in parse cache fingerprints
+        self.base_url = self.endpoints[0]
+        self.timeout = timeout or settings.parser_timeout_s
+        self.session = get_parser_session()
         self.parse_url = f"{self.base_url}/parse"
         self.schemas_url = f"{self.base_url}/schemas"
+        if limiter is None and settings.parser_limiter_enabled:
+            limiter = AdaptiveConcurrencyLimiter.for_parser()
+        self.limiter = limiter
+        self.rate_limiter = TokenBucketRateLimiter.for_endpoint("parser")
+        if breaker is None and settings.parser_breaker_enabled:
+            breaker = CircuitBreaker.for_parser()
+        self.breaker = breaker
+        self.pool = ParserEndpointPool(self.endpoints) if len(self.endpoints) > 1 else None
+        self.latency = LatencyHistogram("parser")
+        # Hedges go to parser_hedge_url if configured, else wherever the pool routes them
+        self.hedge_base_url = settings.parser_hedge_url
+        # Runs hedged requests for the life of the (per-process) client; threads start on demand.
+        # Room for a primary and a hedge per in-flight call plus losers still finishing.
+        self._hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="parser-hedge")
+
+    def _slot(self):
+        return self.limiter.slot() if self.limiter else nullcontext(Slot())
 
     def get_available_schemas(self) -> Dict[str, Any]:
         """
@@ -30,13 +84,164 @@ class ExternalParserService:
             Dictionary with available schemas
         """
         try:
-            response = requests.get(self.schemas_url, timeout=10.0)
+            response = self.session.get(self.schemas_url, timeout=(settings.parser_connect_timeout_s, 10.0))
             if response.ok:
                 return response.json()
         except Exception as e:
             print(f"Failed to get PARSER schemas: {e}")
         return {}
 
+    def check_health(self) -> bool:
+        """
+        Probe the PARSER API via /schemas, bypassing the circuit breaker.
+
+        Returns:
+            True if any endpoint answered successfully
+        """
+        for base_url in self.endpoints:
+            try:
+                if self.session.get(f"{base_url}/schemas", timeout=(settings.parser_connect_timeout_s, 10.0)).ok:
+                    return True
+            except requests.exceptions.RequestException:
+                continue
+        return False
+
+    def _record_outcome(self, failed: bool):
+        if not self.breaker:
+            return
+        if failed:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def _post(self, make_body: Callable[[], MultipartBody], params, base_url: str = None) -> requests.Response:
+        """
+        One POST to /parse on base_url, or on the endpoint the pool picks.
+        Feeds the circuit breaker, the pool's endpoint health and the latency
+        histogram; every answered request counts there, whatever its status,
+        and a timeout counts as taking the full timeout, so the hedge
+        threshold is not computed from the fast, successful calls alone.
+        """
+        lease = self.pool.acquire() if self.pool and base_url is None else None
+        url = f"{lease.url if lease else base_url or self.base_url}/parse"
+        start = time.time()
+        failed = True
+        body = None
+        try:
+            body = make_body()
+            response = self.session.post(
+                url,
+                data=body,
+                headers={"Content-Type": body.content_type},
+                params=params,
+                timeout=(settings.parser_connect_timeout_s, self.timeout),
+            )
+            failed = response.status_code >= 500
+        except requests.exceptions.Timeout:
+            self._record_outcome(failed=True)
+            self.latency.observe(self.timeout)
+            raise
+        except requests.exceptions.ConnectionError:
+            self._record_outcome(failed=True)
+            raise
+        finally:
+            if body is not None:
+                body.close()
+            if lease:
+                self.pool.release(lease, failed=failed)
+        self._record_outcome(failed=failed)
+        self.latency.observe(time.time() - start)
+        return response
+
+    def _slot_outcome(self, response: Optional[requests.Response], error: Optional[BaseException] = None) -> str:
+        """What a finished request tells the concurrency limiter."""
+        if isinstance(error, requests.exceptions.Timeout):
+            return Slot.OVERLOAD
+        if response is not None and response.status_code in self.OVERLOAD_STATUS:
+            return Slot.OVERLOAD
+        if response is not None and response.ok:
+            return Slot.SUCCESS
+        return Slot.ERROR
+
+    def _release_when_done(self, future: Future, token: Optional[str]):
+        """Hold a concurrency lease until the request in future finishes, whichever request wins."""
+        if not self.limiter:
+            return
+        started = time.time()
+
+        def release(f: Future):
+            error = f.exception()
+            outcome = self._slot_outcome(None if error else f.result(), error)
+            self.limiter.release(token, outcome, time.time() - started)
+
+        future.add_done_callback(release)
+
+    def _hedge_threshold(self) -> Optional[float]:
+        """Seconds after which to hedge, or None while there is no useful latency estimate."""
+        try:
+            threshold = self.latency.quantile(settings.parser_hedge_quantile, settings.parser_hedge_min_samples)
+        except Exception as e:
+            logger.warning(f"[HEDGE] Latency histogram unavailable, not hedging: {e}")
+            return None
+        if threshold is None or threshold >= self.timeout:
+            return None
+        return threshold
+
+    def _post_hedged(self, make_body: Callable[[], MultipartBody], params, threshold: float) -> requests.Response:
+        """
+        Send the request; if it is still outstanding after threshold seconds,
+        and the limiters have room right now, send a duplicate and return
+        whichever successful response arrives first.
+
+        Each request holds its own concurrency slot until it finishes, so a
+        request that lost the race still counts against the limit while it
+        runs on in the background.
+        """
+        token = self.limiter.acquire() if self.limiter else None
+        primary = self._hedge_executor.submit(self._post, make_body, params)
+        self._release_when_done(primary, token)
+        if wait([primary], timeout=threshold).done:
+            return primary.result()
+
+        # Only hedge if there is room without waiting; a limiter error means no hedge
+        hedge_token = None
+        try:
+            if self.limiter:
+                hedge_token = self.limiter.try_acquire()
+            has_room = (hedge_token is not None or not self.limiter) and (
+                not self.rate_limiter or self.rate_limiter.try_acquire()
+            )
+        except Exception as e:
+            logger.warning(f"[HEDGE] Limiters unavailable, not hedging: {e}")
+            has_room = False
+        if not has_room:
+            if self.limiter:
+                self.limiter.release(hedge_token, Slot.ERROR, 0.0)
+            return primary.result()
+
+        Counter("parser:hedges_sent").incr()
+        # The losing request cannot be cancelled; it finishes in the background
+        hedge = self._hedge_executor.submit(self._post, make_body, params, self.hedge_base_url)
+        self._release_when_done(hedge, hedge_token)
+
+        pending = {primary, hedge}
+        fallback, error = None, None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                response = future.result()
+                if response.ok:
+                    if future is hedge:
+                        Counter("parser:hedge_wins").incr()
+                    return response
+                fallback = fallback or response
+        if fallback is not None:
+            return fallback
+        raise error
+
     def parse_pdf(
         self,
         pdf_bytes: bytes,
@@ -59,30 +264,79 @@ class ExternalParserService:
             Parsed document as dictionary
             
         Raises:
+            CircuitOpenError: If the PARSER circuit is open
             Exception: If parsing fails
         """
+        return self.parse_pdf_stream(
+            open_pdf=lambda: BytesIO(pdf_bytes),
+            size=len(pdf_bytes),
+            filename=filename,
+            schema=schema,
+            include_conf=include_conf,
+            save_images=save_images,
+        )
+
+    def parse_pdf_stream(
+        self,
+        open_pdf: Callable[[], BinaryIO],
+        size: int,
+        filename: str = "document.pdf",
+        schema: str = "omip",
+        include_conf: bool = False,
+        save_images: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Parse a PDF read from a stream, e.g. straight from MinIO.
+
+        The PDF is never held in memory: the request body is read from the
+        stream as it is sent. open_pdf is called once per request attempt
+        (a hedged request opens a second stream).
+
+        Args:
+            open_pdf: Returns a fresh readable stream of the PDF
+            size: PDF size in bytes
+            filename: Original filename
+            schema: Output schema (omip, full, metadata, citations, tei)
+            include_conf: Include confidence scores
+            save_images: Save figure images to server
+
+        Returns:
+            Parsed document as dictionary
+
+        Raises:
+            CircuitOpenError: If the PARSER circuit is open
+            RateLimitTimeout, LimiterTimeout: If no rate token or concurrency
+                slot became free in time
+            Exception: If parsing fails
+        """
+        if self.breaker:
+            self.breaker.check()
         try:
-            # Prepare multipart form data
-            files = {
-                'file': (filename, pdf_bytes, 'application/pdf')
-            }
-            data = {
-                'schema': schema
-            }
+            # Multipart form data, built fresh for every attempt
+            def make_body():
+                return MultipartBody({'schema': schema}, filename, open_pdf, size, content_type='application/pdf')
+
             params = {}
             if include_conf:
                 params['include_conf'] = 'true'
             if save_images:
                 params['save_images'] = 'true'
 
-            # Make request to PARSER API
-            response = requests.post(
-                self.parse_url,
-                files=files,
-                data=data,
-                params=params,
-                timeout=self.timeout
-            )
+            # Make request to PARSER API: wait for a rate token first, then hold
+            # a cluster-wide concurrency slot for the duration of the call
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            threshold = self._hedge_threshold() if settings.parser_hedge_enabled else None
+            if threshold is not None:
+                response = self._post_hedged(make_body, params, threshold)
+            else:
+                with self._slot() as slot:
+                    try:
+                        response = self._post(make_body, params)
+                    except requests.exceptions.Timeout:
+                        slot.record(Slot.OVERLOAD)
+                        raise
+                    slot.record(self._slot_outcome(response))
 
             # Check response
             if not response.ok:
@@ -92,10 +346,16 @@ class ExternalParserService:
             # Parse JSON response
             content_type = response.headers.get('content-type', '')
             if 'application/json' in content_type:
+                if schema == "omip":
+                    # Decode and validate in one pass, without an intermediate json.loads
+                    return PARSER_RESPONSE.validate_json(response.content)
                 return response.json()
             else:
                 raise Exception(f"Unexpected content type: {content_type}")
 
+        except (CircuitOpenError, RateLimitTimeout, LimiterTimeout):
+            # PARSER was never called; callers wait and try again instead of counting a failure
+            raise
         except requests.exceptions.Timeout:
             raise Exception(f"PARSER API timeout after {self.timeout}s")
         except requests.exceptions.ConnectionError as e:
@@ -133,3 +393,13 @@ class ExternalParserService:
             include_conf=False,
             save_images=True
         )
+
+
+def get_external_parser_service() -> ExternalParserService:
+    """Process-wide PARSER client with default settings, shared by all tasks of a worker."""
+    return _external_parser_service(os.getpid())
+
+
+@lru_cache(maxsize=1)
+def _external_parser_service(pid: int) -> ExternalParserService:
+    return ExternalParserService()
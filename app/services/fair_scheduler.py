@@ -0,0 +1,155 @@
+"""
+Fair Scheduler - Round-robin release of parse tasks across concurrent batches, kept in Redis
+"""
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.redis_client import get_redis
+
+
+logger = logging.getLogger(__name__)
+
+# Append a batch's tasks; a batch joins the ring the first time it has work queued.
+_SUBMIT = """
+for i = 1, #ARGV - 1 do
+  redis.call('RPUSH', KEYS[1], ARGV[i + 1])
+end
+if redis.call('SADD', KEYS[3], ARGV[1]) == 1 then
+  redis.call('LPUSH', KEYS[2], ARGV[1])
+end
+return redis.call('LLEN', KEYS[1])
+"""
+
+# Take the next task from KEYS[4], the batch at the tail of the ring, if the
+# in-flight window has room. The caller peeks the batch first so that its list
+# is a declared key; a stale peek returns 0 and the caller looks again.
+# Batches with nothing left queued drop out of the ring (also 0).
+_NEXT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[1]) then
+  return false
+end
+if redis.call('LINDEX', KEYS[2], -1) ~= ARGV[3] then
+  return 0
+end
+redis.call('RPOPLPUSH', KEYS[2], KEYS[2])
+local item = redis.call('LPOP', KEYS[4])
+if item then
+  redis.call('ZADD', KEYS[1], now + tonumber(ARGV[2]), cjson.decode(item)[2])
+  return item
+end
+redis.call('LREM', KEYS[2], 0, ARGV[3])
+redis.call('SREM', KEYS[3], ARGV[3])
+return 0
+"""
+
+
+class FairScheduler:
+    """
+    Batch-aware gate in front of the bulk worker queue.
+
+    Tasks of each batch wait in their own Redis list. At most ``window`` tasks
+    are in the Celery queue or running at any time; whenever one finishes, the
+    next task is taken round-robin from the active batches. A 10-PDF batch
+    submitted behind a 1,000-PDF batch therefore gets an equal share of the
+    workers instead of waiting for the big one to drain. In-flight entries are
+    leases so a lost task frees its slot after ``lease_ttl_s``.
+    """
+
+    PREFIX = "sched"
+
+    def __init__(self, window: int = None, lease_ttl_s: float = None):
+        self.window = window or settings.scheduler_window
+        self.lease_ttl_s = lease_ttl_s or settings.scheduler_lease_ttl_s
+        self.redis = get_redis()
+        self._submit = self.redis.register_script(_SUBMIT)
+        self._next = self.redis.register_script(_NEXT)
+        self.inflight_key = f"{self.PREFIX}:inflight"
+        self.ring_key = f"{self.PREFIX}:ring"
+        self.active_key = f"{self.PREFIX}:active"
+        self.stats_key = f"{self.PREFIX}:stats"
+        self.batch_prefix = f"{self.PREFIX}:batch:"
+
+    def submit(self, batch_id: str, tasks: List[List[Any]]):
+        """Queue (batch_id, run_id, filename, object_key, force_reparse, queue) tasks for a batch and start releasing them."""
+        if tasks:
+            self._submit(
+                keys=[self.batch_prefix + batch_id, self.ring_key, self.active_key],
+                args=[batch_id] + [json.dumps(t) for t in tasks],
+            )
+        self.pump()
+
+    def pump(self) -> int:
+        """Move tasks into the worker queue until the window is full. Returns how many were released."""
+        from app.workers.tasks import dispatch_parse
+
+        released = 0
+        while True:
+            item = self._take_next()
+            if not item:
+                return released
+            batch_id, run_id, filename, object_key, force_reparse, queue = json.loads(item)
+            try:
+                dispatch_parse(batch_id, run_id, filename, object_key, force_reparse, queue=queue)
+            except Exception as e:
+                # Put it back at the head of its batch and retry on the next pump
+                self.redis.lpush(self.batch_prefix + batch_id, item)
+                self.redis.zrem(self.inflight_key, run_id)
+                logger.warning(f"[SCHED] Failed to dispatch run {run_id}: {e}")
+                return released
+            released += 1
+
+    def _take_next(self) -> Optional[str]:
+        """Next task round-robin across batches, or None if the window is full or nothing is queued."""
+        # Every 0 from the script dropped an empty batch or lost a race for the tail to another pump
+        for _ in range(self.redis.llen(self.ring_key) + 1):
+            batch_id = self.redis.lindex(self.ring_key, -1)
+            if batch_id is None:
+                return None
+            item = self._next(
+                keys=[self.inflight_key, self.ring_key, self.active_key, self.batch_prefix + batch_id],
+                args=[self.window, self.lease_ttl_s, batch_id],
+            )
+            if item != 0:
+                return item
+        return None
+
+    def release(self, run_id: str, duration_s: Optional[float] = None):
+        """Free a finished task's slot, fold its duration into the average and refill the window."""
+        try:
+            self.redis.zrem(self.inflight_key, run_id)
+            if duration_s is not None:
+                avg = self.redis.hget(self.stats_key, "avg_task_s")
+                avg = duration_s if avg is None else 0.8 * float(avg) + 0.2 * duration_s
+                self.redis.hset(self.stats_key, "avg_task_s", avg)
+            self.pump()
+        except Exception as e:
+            logger.warning(f"[SCHED] Failed to release run {run_id}: {e}")
+
+    def estimate(self, batch_id: str, remaining: int) -> Optional[Dict[str, Any]]:
+        """
+        Estimated completion of a batch at its current share of the window.
+
+        Returns:
+            Dictionary with share, eta_seconds and estimated_completion_at, or
+            None when no task duration has been observed yet
+        """
+        avg = self.redis.hget(self.stats_key, "avg_task_s")
+        if avg is None or remaining <= 0:
+            return None
+        if self.redis.sismember(self.active_key, batch_id):
+            share = self.window / max(1, self.redis.scard(self.active_key))
+        else:
+            share = self.window  # everything left is already in flight
+        share = max(1.0, min(float(remaining), share))
+        eta_seconds = remaining / share * float(avg)
+        return {
+            "share": share,
+            "eta_seconds": round(eta_seconds, 1),
+            "estimated_completion_at": datetime.now(timezone.utc) + timedelta(seconds=eta_seconds),
+        }
@@ -7,6 +7,8 @@ from typing import Any, Dict, Optional, List
 from pydantic import BaseModel, Field, ValidationError
 from app.core.config import settings
 from app.schemas.parse import PaperMetadata
+from app.services.adaptive_limiter import AdaptiveConcurrencyLimiter
+from app.services.rate_limiter import TokenBucketRateLimiter
 
 try:
     import openai
@@ -44,6 +46,24 @@ class LLMService:
         elif self.provider == "anthropic" and ANTHROPIC_AVAILABLE and self.api_key:
             self.anthropic_client = anthropic.Anthropic(api_key=self.api_key)
 
+        # Cluster-wide throttling, only needed once a provider is configured
+        self.rate_limiter = None
+        self.concurrency = None
+        if self.is_available():
+            self.rate_limiter = TokenBucketRateLimiter.for_endpoint("llm")
+            self.concurrency = AdaptiveConcurrencyLimiter.fixed("llm", settings.llm_max_concurrency)
+
+    def _throttled(self, call, **kwargs):
+        """Run a provider call after taking a rate token and a concurrency slot."""
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        if not self.concurrency:
+            return call(**kwargs)
+        with self.concurrency.slot() as slot:
+            response = call(**kwargs)
+            slot.record(slot.SUCCESS)
+            return response
+
     def is_available(self) -> bool:
         """Check if LLM service is properly configured."""
         return (self.openai_client is not None) or (self.anthropic_client is not None)
@@ -203,7 +223,8 @@ Return ONLY the JSON object."""
 
         model = self.model or "gpt-4o-mini"
 
-        response = self.openai_client.chat.completions.create(
+        response = self._throttled(
+            self.openai_client.chat.completions.create,
             model=model,
             messages=[
                 {"role": "system", "content": "You are a scientific paper metadata extraction assistant. Always return valid JSON."},
@@ -222,7 +243,8 @@ Return ONLY the JSON object."""
 
         model = self.model or "claude-3-5-sonnet-20241022"
 
-        response = self.anthropic_client.messages.create(
+        response = self._throttled(
+            self.anthropic_client.messages.create,
             model=model,
             max_tokens=1000,
             temperature=0.1,
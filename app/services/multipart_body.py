@@ -0,0 +1,82 @@
+"""
+Multipart Body - multipart/form-data request body that streams its file part
+"""
+import uuid
+from typing import BinaryIO, Callable, Dict, Iterator
+
+from urllib3.fields import RequestField
+
+
+class MultipartBody:
+    """
+    One-file multipart/form-data body read incrementally.
+
+    ``open_file`` is called when the body is created and must return a
+    readable stream of exactly ``size`` bytes (a MinIO response, a BytesIO).
+    requests sends file-like bodies with a Content-Length taken from
+    ``__len__`` and reads them in small blocks, so only one block of the file
+    is in memory at a time. A body can be sent once; build a new one for a
+    retry or a hedged duplicate. ``close`` releases the underlying stream.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(
+        self,
+        fields: Dict[str, str],
+        filename: str,
+        open_file: Callable[[], BinaryIO],
+        size: int,
+        content_type: str = "application/octet-stream",
+        file_field: str = "file",
+    ):
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        head = b""
+        for name, value in fields.items():
+            head += self._part_headers(boundary, RequestField(name=name, data=value)) + value.encode() + b"\r\n"
+        file_part = RequestField(name=file_field, data=b"", filename=filename)
+        head += self._part_headers(boundary, file_part, content_type)
+        tail = f"\r\n--{boundary}--\r\n".encode()
+        self._length = len(head) + size + len(tail)
+        self._file = open_file()
+        self._parts = [_BytesPart(head), self._file, _BytesPart(tail)]
+
+    @staticmethod
+    def _part_headers(boundary: str, field: RequestField, content_type: str = None) -> bytes:
+        field.make_multipart(content_type=content_type)
+        return f"--{boundary}\r\n".encode() + field.render_headers().encode()
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return b"".join(iter(lambda: self.read(self.CHUNK_SIZE), b""))
+        while self._parts:
+            data = self._parts[0].read(size)
+            if data:
+                return data
+            self._parts.pop(0)
+        return b""
+
+    def __iter__(self) -> Iterator[bytes]:
+        return iter(lambda: self.read(self.CHUNK_SIZE), b"")
+
+    def close(self):
+        self._parts = []
+        close = getattr(self._file, "close", None)
+        if close:
+            close()
+        release_conn = getattr(self._file, "release_conn", None)
+        if release_conn:
+            release_conn()
+
+
+class _BytesPart:
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+
+    def read(self, size: int) -> bytes:
+        chunk, self.data = self.data[:size], self.data[size:]
+        return bytes(chunk)
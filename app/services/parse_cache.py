@@ -0,0 +1,110 @@
+"""
+Parse Cache - Raw PARSER responses in MinIO, keyed by file hash and parser configuration
+"""
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from minio.error import S3Error
+
+from app.core.config import settings
+from app.schemas.parse import PARSER_RESPONSE
+from app.services.storage_service import StorageService
+
+
+logger = logging.getLogger(__name__)
+
+
+class ParseCache:
+    """
+    Cache of raw PARSER responses.
+
+    ``Paper.file_hash`` identifies the PDF bytes exactly, so a response can be
+    reused whenever the same bytes are parsed with the same configuration.
+    Objects live under ``parser-cache/{file_hash}/{fingerprint}.json`` where
+    the fingerprint covers the schema, the request options, the PARSER URL and
+    ``parser_version`` (bump it to invalidate everything after a PARSER
+    upgrade). Entries older than ``parse_cache_max_age_days`` are treated as
+    misses; ``prune`` trims the cache to a size budget, oldest first.
+    """
+
+    PREFIX = "parser-cache/"
+
+    def __init__(self, parser_url: str = None, storage: StorageService = None):
+        self.parser_url = parser_url or settings.parser_api_url
+        self.storage = storage or StorageService()
+
+    def fingerprint(self, schema: str, options: Dict[str, Any]) -> str:
+        config = {
+            "schema": schema,
+            "options": options,
+            "parser_url": self.parser_url,
+            "parser_version": settings.parser_version,
+        }
+        return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+
+    def key(self, file_hash: str, schema: str, options: Dict[str, Any]) -> str:
+        return f"{self.PREFIX}{file_hash}/{self.fingerprint(schema, options)}.json"
+
+    def get(
+        self,
+        file_hash: str,
+        schema: str,
+        options: Dict[str, Any],
+        newer_than: Optional[datetime] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Cached response, or None on a miss, an expired entry or one not newer than newer_than."""
+        key = self.key(file_hash, schema, options)
+        try:
+            stat = self.storage.client.stat_object(self.storage.bucket, key)
+            if datetime.now(timezone.utc) - stat.last_modified > timedelta(days=settings.parse_cache_max_age_days):
+                self.storage.remove_object(key)
+                return None
+            if newer_than is not None and stat.last_modified < newer_than:
+                return None
+            data = self.storage.get_object(key)
+            return PARSER_RESPONSE.validate_json(data) if schema == "omip" else json.loads(data)
+        except S3Error as e:
+            if e.code not in ("NoSuchKey", "NoSuchObject", "NotFound", "NoSuchBucket"):
+                logger.warning(f"[CACHE] Lookup of {key} failed: {e}")
+            return None
+        except Exception as e:
+            # A broken cache must never fail a parse
+            logger.warning(f"[CACHE] Lookup of {key} failed: {e}")
+            return None
+
+    def put(self, file_hash: str, schema: str, options: Dict[str, Any], result: Dict[str, Any]):
+        key = self.key(file_hash, schema, options)
+        try:
+            self.storage.put_object(key, json.dumps(result).encode(), content_type="application/json")
+        except Exception as e:
+            logger.warning(f"[CACHE] Failed to store {key}: {e}")
+
+    def prune(self, max_bytes: int = None, dry_run: bool = False) -> dict:
+        """Delete expired entries, then the oldest ones until the cache fits in max_bytes."""
+        max_bytes = settings.parse_cache_max_bytes if max_bytes is None else max_bytes
+        cutoff = datetime.now(timezone.utc) - timedelta(days=settings.parse_cache_max_age_days)
+        entries = []
+        stats = {"scanned": 0, "expired": 0, "evicted": 0, "bytes_before": 0, "bytes_after": 0}
+        for obj in self.storage.client.list_objects(self.storage.bucket, prefix=self.PREFIX, recursive=True):
+            stats["scanned"] += 1
+            stats["bytes_before"] += obj.size
+            if obj.last_modified < cutoff:
+                stats["expired"] += 1
+                if not dry_run:
+                    self.storage.remove_object(obj.object_name)
+                continue
+            entries.append(obj)
+
+        total = sum(obj.size for obj in entries)
+        for obj in sorted(entries, key=lambda o: o.last_modified):
+            if total <= max_bytes:
+                break
+            if not dry_run:
+                self.storage.remove_object(obj.object_name)
+            total -= obj.size
+            stats["evicted"] += 1
+        stats["bytes_after"] = total
+        return stats
@@ -1,5 +1,5 @@
 from uuid import UUID
-from typing import Iterable
+from typing import Iterable, BinaryIO
 import os
 from app.db.session import get_session
 from app.repositories.batch_repo import BatchRepository
@@ -9,101 +9,54 @@ from app.repositories.element_repo import ElementRepository
 from app.services.storage_service import StorageService
 from app.schemas.parse import ParsingResultPayload, ElementType
 from app.models.models import ParseRun, ParseStatus
+from app.workers.celery_app import QUEUE_INTERACTIVE, QUEUE_BULK
+
+
+def _is_eager() -> bool:
+    from app.core.config import settings
+    return (
+        bool(settings.celery_eager)
+        or str(os.getenv("CELERY_EAGER", "")).lower() in ("1", "true", "yes")
+        or "PYTEST_CURRENT_TEST" in os.environ
+    )
+
+
+def _queue_for(batch_size: int) -> str:
+    """A single paper is somebody waiting on it; anything larger is bulk work."""
+    return QUEUE_INTERACTIVE if batch_size == 1 else QUEUE_BULK
 
 
 class ParseService:
     def __init__(self):
         self.storage = StorageService()
 
-    def create_batch_and_schedule(self, uploads: list[tuple[str, bytes]]) -> UUID:
+    def create_batch_and_schedule(self, uploads: list[tuple[str, BinaryIO]]) -> UUID:
         import time
         import logging
         logger = logging.getLogger(__name__)
 
-        from app.core.config import settings
-        EAGER = (
-            bool(settings.celery_eager)
-            or str(os.getenv("CELERY_EAGER", "")).lower() in ("1", "true", "yes")
-            or "PYTEST_CURRENT_TEST" in os.environ
-        )
+        EAGER = _is_eager()
         logger.info(f"[PERF] EAGER mode: {EAGER}")
         # In eager mode (tests), create runs synchronously with mock elements
         if EAGER:
-            from app.schemas.parse import (
-                PaperMetadata,
-                TableContent,
-                TableCell,
-            )
-            from app.repositories.element_repo import ElementRepository
-            from app.models.models import ElementType as MElementType, BatchStatus
-            with get_session() as db:
-                batch_repo = BatchRepository(db)
-                paper_repo = PaperRepository(db)
-                run_repo = RunRepository(db)
-                el_repo = ElementRepository(db)
-
-                batch = batch_repo.create(total_count=len(uploads))
-                for filename, content in uploads:
-                    file_hash = self.storage.compute_sha256(content)
-                    paper = paper_repo.get_by_hash(file_hash)
-                    if not paper:
-                        paper = paper_repo.create(filename=filename, file_hash=file_hash)
-                    run = run_repo.create(paper_id=paper.id, batch_id=batch.id)
-                    # Minimal deterministic metadata
-                    meta = PaperMetadata(
-                        omip_id="OMIP-001",
-                        title=f"Parsed {filename}",
-                        authors=["Doe, J."],
-                        year=2024,
-                        confidence_score=0.7,
-                    )
-                    run.raw_metadata = meta.model_dump()
-                    run.status = ParseStatus.draft
-                    run.task_state = BatchStatus.completed
-                    # Create one table element (handle simulated failure)
-                    try:
-                        el_repo.create(
-                            run_id=run.id,
-                            type_=MElementType.table,
-                            label="Table 1",
-                            caption="Mock caption",
-                            content=TableContent(
-                                number="1",
-                                caption="Mock caption",
-                                rows=[
-                                    [TableCell(text="A"), TableCell(text="B")],
-                                    [TableCell(text="1"), TableCell(text="2")],
-                                    [TableCell(text="3"), TableCell(text="4")]
-                                ]
-                            ).model_dump(),
-                            order_index=0,
-                        )
-                        batch_repo.increment_success(batch.id)
-                    except Exception as e:
-                        from app.repositories.run_repo import RunRepository as RR
-                        RR(db).set_failed(run.id, str(e))
-                        batch_repo.increment_failed(batch.id)
-                batch_id = batch.id
-                BatchRepository(db).finalize_if_done(batch.id)
-                return batch_id
+            items = [(filename, self.storage.compute_sha256_stream(stream)[0]) for filename, stream in uploads]
+            return self._create_eager_batch(items)
 
         # Non-eager: enqueue Celery tasks
-        # First, prepare uploads outside of DB transaction for speed
-        prep_start = time.time()
-        prepared_uploads: list[tuple[str, bytes, str, str]] = []
-        for filename, content in uploads:
-            file_hash = self.storage.compute_sha256(content)
-            key = self.storage.object_key_for_pdf(filename, file_hash)
-            prepared_uploads.append((filename, content, file_hash, key))
-        logger.info(f"[PERF] Hash computation took {time.time() - prep_start:.2f}s")
-
-        # Upload to MinIO before DB transaction to avoid long locks
+        # Hash + upload to MinIO before DB transaction to avoid long locks
         minio_start = time.time()
-        for filename, content, file_hash, key in prepared_uploads:
-            upload_start = time.time()
-            self.storage.put_object(key, content, content_type="application/pdf")
-            logger.info(f"[PERF] MinIO upload {filename} took {time.time() - upload_start:.2f}s")
-        logger.info(f"[PERF] Total MinIO uploads took {time.time() - minio_start:.2f}s")
+        prepared_uploads = self._store_uploads(uploads)
+        logger.info(f"[PERF] Total hash + MinIO uploads took {time.time() - minio_start:.2f}s")
+        return self.create_batch_for_stored(prepared_uploads)
+
+    def create_batch_for_stored(self, prepared_uploads: list[tuple[str, str, str]]) -> UUID:
+        """Create a batch for PDFs already in MinIO, given (filename, file_hash, key) tuples."""
+        import time
+        import logging
+        logger = logging.getLogger(__name__)
+
+        if _is_eager():
+            return self._create_eager_batch([(f, h) for f, h, _ in prepared_uploads])
 
         # Now do DB operations quickly
         db_start = time.time()
@@ -112,56 +65,134 @@ class ParseService:
             paper_repo = PaperRepository(db)
             run_repo = RunRepository(db)
 
-            batch = batch_repo.create(total_count=len(uploads))
+            batch = batch_repo.create(total_count=len(prepared_uploads))
 
-            scheduled: list[tuple[str, str, str, str]] = []
-            for filename, content, file_hash, key in prepared_uploads:
-                paper = paper_repo.get_by_hash(file_hash)
-                if not paper:
-                    paper = paper_repo.create(filename=filename, file_hash=file_hash)
-                run = run_repo.create(paper_id=paper.id, batch_id=batch.id)
-                scheduled.append((str(batch.id), str(run.id), filename, key))
+            # Set-based: one lookup, one insert for new papers, one insert for runs
+            papers = paper_repo.get_or_create_many([(f, h) for f, h, _ in prepared_uploads])
+            run_ids = run_repo.bulk_create([papers[h].id for _, h, _ in prepared_uploads], batch.id)
+
+            scheduled: list[tuple[str, str, str]] = [
+                (str(run_id), filename, key)
+                for run_id, (filename, _h, key) in zip(run_ids, prepared_uploads)
+            ]
 
             batch_id = batch.id
         logger.info(f"[PERF] DB operations took {time.time() - db_start:.2f}s")
 
         # Schedule tasks outside the transaction
         celery_start = time.time()
-        from app.workers.tasks import parse_pdf_task
-        for (b_id, r_id, fname, key) in scheduled:
-            parse_pdf_task.delay(b_id, r_id, fname, key)
+        self._dispatch(str(batch_id), scheduled)
         logger.info(f"[PERF] Celery task scheduling took {time.time() - celery_start:.2f}s")
 
         return batch_id
 
-    def upload_pdfs(self, uploads: list[tuple[str, bytes]]):
+    def _create_eager_batch(self, items: list[tuple[str, str]]) -> UUID:
+        """Test mode: create runs synchronously with mock elements for (filename, file_hash) pairs."""
+        from app.schemas.parse import (
+            PaperMetadata,
+            TableContent,
+            TableCell,
+        )
+        from app.repositories.element_repo import ElementRepository
+        from app.models.models import ElementType as MElementType, BatchStatus
+        with get_session() as db:
+            batch_repo = BatchRepository(db)
+            paper_repo = PaperRepository(db)
+            run_repo = RunRepository(db)
+            el_repo = ElementRepository(db)
+
+            batch = batch_repo.create(total_count=len(items))
+            for filename, file_hash in items:
+                paper = paper_repo.get_by_hash(file_hash)
+                if not paper:
+                    paper = paper_repo.create(filename=filename, file_hash=file_hash)
+                run = run_repo.create(paper_id=paper.id, batch_id=batch.id)
+                # Minimal deterministic metadata
+                meta = PaperMetadata(
+                    omip_id="OMIP-001",
+                    title=f"Parsed {filename}",
+                    authors=["Doe, J."],
+                    year=2024,
+                    confidence_score=0.7,
+                )
+                run.raw_metadata = meta.model_dump()
+                run.status = ParseStatus.draft
+                run.task_state = BatchStatus.completed
+                # Create one table element (handle simulated failure)
+                try:
+                    el_repo.create(
+                        run_id=run.id,
+                        type_=MElementType.table,
+                        label="Table 1",
+                        caption="Mock caption",
+                        content=TableContent(
+                            number="1",
+                            caption="Mock caption",
+                            rows=[
+                                [TableCell(text="A"), TableCell(text="B")],
+                                [TableCell(text="1"), TableCell(text="2")],
+                                [TableCell(text="3"), TableCell(text="4")]
+                            ]
+                        ).model_dump(),
+                        order_index=0,
+                    )
+                    batch_repo.record_result(batch.id, success=True)
+                except Exception as e:
+                    from app.repositories.run_repo import RunRepository as RR
+                    RR(db).set_failed(run.id, str(e))
+                    batch_repo.record_result(batch.id, success=False)
+            return batch.id
+
+    def _store_uploads(self, uploads: list[tuple[str, BinaryIO]]) -> list[tuple[str, str, str]]:
+        """
+        Hash and upload each stream to MinIO on a bounded thread pool.
+
+        hashlib and the MinIO socket writes both release the GIL, so hashing one
+        file overlaps with uploading others. Returns (filename, file_hash, key)
+        in input order.
+        """
+        import time
+        import logging
+        from concurrent.futures import ThreadPoolExecutor
+        from app.core.config import settings
+        logger = logging.getLogger(__name__)
+
+        def store(item: tuple[str, BinaryIO]) -> tuple[str, str, str]:
+            filename, stream = item
+            start = time.time()
+            file_hash, size = self.storage.compute_sha256_stream(stream)
+            key = self.storage.object_key_for_pdf(file_hash)
+            # Content-addressed key: if the bytes are already stored, skip the upload
+            if self.storage.object_exists(key):
+                logger.info(f"[PERF] {filename} already stored as {key}, skipping upload")
+            else:
+                self.storage.put_stream(key, stream, size, content_type="application/pdf")
+                logger.info(f"[PERF] Hash + MinIO upload {filename} took {time.time() - start:.2f}s")
+            return filename, file_hash, key
+
+        if not uploads:
+            return []
+        workers = max(1, min(settings.upload_concurrency, len(uploads)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="upload") as pool:
+            return list(pool.map(store, uploads))
+
+    def upload_pdfs(self, uploads: list[tuple[str, BinaryIO]]):
         # Prepare and upload to MinIO first (outside DB transaction)
-        prepared_uploads: list[tuple[str, bytes, str, str]] = []
-        for filename, content in uploads:
-            file_hash = self.storage.compute_sha256(content)
-            key = self.storage.object_key_for_pdf(filename, file_hash)
-            self.storage.put_object(key, content, content_type="application/pdf")
-            prepared_uploads.append((filename, content, file_hash, key))
+        prepared_uploads = self._store_uploads(uploads)
 
         # Then do DB operations quickly
         created = []
         with get_session() as db:
             paper_repo = PaperRepository(db)
-            for filename, content, file_hash, key in prepared_uploads:
-                paper = paper_repo.get_by_hash(file_hash)
-                if not paper:
-                    paper = paper_repo.create(filename=filename, file_hash=file_hash)
+            papers = paper_repo.get_or_create_many([(f, h) for f, h, _ in prepared_uploads])
+            for filename, file_hash, key in prepared_uploads:
+                paper = papers[file_hash]
                 created.append({"paper_id": str(paper.id), "filename": paper.filename, "file_hash": paper.file_hash})
         return created
 
-    def create_batch_for_papers(self, paper_ids: list[UUID]) -> UUID:
-        from app.core.config import settings
+    def create_batch_for_papers(self, paper_ids: list[UUID], force_reparse: bool = False) -> UUID:
         from app.models.models import BatchStatus
-        EAGER = (
-            bool(settings.celery_eager)
-            or str(os.getenv("CELERY_EAGER", "")).lower() in ("1", "true", "yes")
-            or "PYTEST_CURRENT_TEST" in os.environ
-        )
+        EAGER = _is_eager()
         # In eager mode (tests), create runs synchronously with mock elements
         if EAGER:
             from app.schemas.parse import (
@@ -204,59 +235,104 @@ class ParseService:
                         ).model_dump(),
                         order_index=0,
                     )
-                    batch_repo.increment_success(batch.id)
-                batch_id = batch.id
-                BatchRepository(db).finalize_if_done(batch.id)
-                return batch_id
+                    batch_repo.record_result(batch.id, success=True)
+                return batch.id
 
+        from sqlalchemy import select
+        from app.models.models import Paper
         with get_session() as db:
             batch_repo = BatchRepository(db)
             run_repo = RunRepository(db)
             batch = batch_repo.create(total_count=len(paper_ids))
-            for pid in paper_ids:
-                run = run_repo.create(paper_id=pid, batch_id=batch.id)
-                run.task_state = BatchStatus.pending
+            run_ids = run_repo.bulk_create(list(paper_ids), batch.id)
+            papers = {
+                pid: (filename, file_hash)
+                for pid, filename, file_hash in db.execute(
+                    select(Paper.id, Paper.filename, Paper.file_hash).where(Paper.id.in_(set(paper_ids)))
+                ).all()
+            }
             batch_id = batch.id
 
-        # Schedule tasks outside the transaction (works for both eager and non-eager)
-        from app.workers.tasks import parse_pdf_task
-        with get_session() as db:
-            from sqlalchemy import select
-            from app.models.models import ParseRun, Paper
-            rows = db.execute(
-                select(ParseRun, Paper.filename, Paper.file_hash)
-                .join(Paper, Paper.id == ParseRun.paper_id)
-                .where(ParseRun.batch_id == batch_id)
-            ).all()
-            for (run, filename, file_hash) in rows:
-                key = self.storage.object_key_for_pdf(filename, file_hash)
-                parse_pdf_task.delay(str(batch_id), str(run.id), filename, key)
+        # Schedule tasks outside the transaction
+        tasks = []
+        for pid, run_id in zip(paper_ids, run_ids):
+            filename, file_hash = papers[pid]
+            tasks.append((str(run_id), filename, self.storage.object_key_for_pdf(file_hash)))
+        self._dispatch(str(batch_id), tasks, force_reparse=force_reparse)
         return batch_id
 
+    def _dispatch(self, batch_id: str, tasks: list[tuple[str, str, str]], force_reparse: bool = False):
+        """
+        Enqueue (run_id, filename, key) parse tasks of one batch.
+
+        Bulk batches go through the fair scheduler so concurrent batches share
+        the workers (or, in pipeline mode, are sent as chunks); a single paper
+        goes straight to the interactive queue.
+        """
+        from app.core.config import settings
+        from app.workers.tasks import dispatch_parse, dispatch_parse_chunk
+        queue = _queue_for(len(tasks))
+        if settings.pipeline_enabled and queue != QUEUE_INTERACTIVE:
+            # Pipelined workers: one task per chunk keeps each worker's parser slot busy
+            size = settings.pipeline_chunk_size
+            for i in range(0, len(tasks), size):
+                dispatch_parse_chunk([[batch_id, r, f, k, force_reparse] for r, f, k in tasks[i:i + size]], queue=queue)
+            return
+        if settings.scheduler_enabled and queue != QUEUE_INTERACTIVE:
+            from app.services.fair_scheduler import FairScheduler
+            FairScheduler().submit(batch_id, [[batch_id, r, f, k, force_reparse, queue] for r, f, k in tasks])
+            return
+        for run_id, filename, key in tasks:
+            dispatch_parse(batch_id, run_id, filename, key, force_reparse, queue=queue)
+
     def apply_parsing_result(self, run_id: UUID, payload: ParsingResultPayload):
         with get_session() as db:
-            run_repo = RunRepository(db)
-            el_repo = ElementRepository(db)
-            run = run_repo.get(run_id)
-            if not run:
-                return
-            # update metadata
-            run.raw_metadata = payload.raw_metadata.model_dump()
-            run.status = ParseStatus.draft
-            
-            # Save new version of metadata
-            from app.repositories.metadata_repo import MetadataRepository
-            meta_repo = MetadataRepository(db)
-            meta_data = payload.raw_metadata
-            meta_repo.add_version(
-                run_id=run.id,
-                omip_id=meta_data.omip_id,
-                title=meta_data.title,
-                authors=meta_data.authors,
-                year=meta_data.year
-            )
+            self._write_result(db, run_id, payload)
+
+    def persist_parse_result(self, run_id: UUID, batch_id: UUID | None, payload: ParsingResultPayload):
+        """
+        Write a finished parse in one transaction: run metadata and state, the
+        metadata version, all elements and the batch counters.
+
+        Returns:
+            The batch row from BatchRepository.record_result, or None without a batch
+        """
+        with get_session() as db:
+            self._write_result(db, run_id, payload)
+            if batch_id is None:
+                return None
+            return BatchRepository(db).record_result(batch_id, success=True)
+
+    def _write_result(self, db, run_id: UUID, payload: ParsingResultPayload):
+        # update metadata and mark completed, without loading the run
+        # parser_raw is a plain dict already; dumping it would copy every cell
+        raw_metadata = payload.raw_metadata.model_dump(exclude={"parser_raw"})
+        raw_metadata["parser_raw"] = payload.raw_metadata.parser_raw
+        if not RunRepository(db).complete(run_id, raw_metadata):
+            return
+
+        # Save new version of metadata
+        from app.repositories.metadata_repo import MetadataRepository
+        meta_data = payload.raw_metadata
+        MetadataRepository(db).add_version(
+            run_id=run_id,
+            omip_id=meta_data.omip_id,
+            title=meta_data.title,
+            authors=meta_data.authors,
+            year=meta_data.year
+        )
 
-            # write elements
-            for el in payload.elements:
-                content = el.content.model_dump()
-                el_repo.create(run_id=run_id, type_=ElementType(el.type.value), label=el.label, caption=el.caption, content=content, order_index=el.order_index)
+        # write elements, one INSERT for the whole paper
+        rows = payload.element_rows
+        if rows is None:
+            rows = [
+                {
+                    "type": ElementType(el.type.value),
+                    "label": el.label,
+                    "caption": el.caption,
+                    "content": el.content.model_dump(),
+                    "order_index": el.order_index,
+                }
+                for el in payload.elements
+            ]
+        ElementRepository(db).bulk_create(run_id, rows)
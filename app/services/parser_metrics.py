@@ -0,0 +1,82 @@
+"""
+Parser Metrics - Cluster-wide latency histograms and counters for upstream calls, kept in Redis
+"""
+import logging
+import time
+from typing import Dict, Optional
+
+from app.core.redis_client import get_redis
+
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds; the last bucket catches everything slower
+LATENCY_BUCKETS = (1, 2, 5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 300, float("inf"))
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram shared by all workers.
+
+    Observations go into one Redis hash per hour; quantiles are read from the
+    current and previous hour so the threshold follows recent behaviour of
+    the upstream rather than its whole history.
+    """
+
+    WINDOW_S = 3600
+
+    def __init__(self, name: str):
+        self.name = name
+        self.redis = get_redis()
+
+    def _key(self, window: int) -> str:
+        return f"metrics:{self.name}:latency:{window}"
+
+    def observe(self, seconds: float):
+        bucket = next(b for b in LATENCY_BUCKETS if seconds <= b)
+        key = self._key(int(time.time() // self.WINDOW_S))
+        try:
+            pipe = self.redis.pipeline()
+            pipe.hincrby(key, str(bucket), 1)
+            pipe.expire(key, self.WINDOW_S * 2)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"[METRICS] {self.name}: failed to record latency: {e}")
+
+    def counts(self) -> Dict[float, int]:
+        window = int(time.time() // self.WINDOW_S)
+        merged: Dict[float, int] = {b: 0 for b in LATENCY_BUCKETS}
+        for key in (self._key(window), self._key(window - 1)):
+            for bucket, count in self.redis.hgetall(key).items():
+                merged[float(bucket)] += int(count)
+        return merged
+
+    def quantile(self, q: float, min_samples: int = 1) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile, or None with fewer than min_samples observations."""
+        counts = self.counts()
+        total = sum(counts.values())
+        if total < max(1, min_samples):
+            return None
+        seen = 0
+        for bucket in LATENCY_BUCKETS:
+            seen += counts[bucket]
+            if seen >= q * total:
+                return bucket
+        return LATENCY_BUCKETS[-1]
+
+
+class Counter:
+    """Monotonic cluster-wide counter."""
+
+    def __init__(self, name: str):
+        self.key = f"metrics:{name}"
+        self.redis = get_redis()
+
+    def incr(self, amount: int = 1):
+        try:
+            self.redis.incrby(self.key, amount)
+        except Exception as e:
+            logger.warning(f"[METRICS] failed to increment {self.key}: {e}")
+
+    def value(self) -> int:
+        return int(self.redis.get(self.key) or 0)
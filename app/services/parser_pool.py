@@ -0,0 +1,178 @@
+"""
+Parser Pool - Least-loaded routing across PARSER replicas, with health state kept in Redis
+"""
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.redis_client import get_redis
+
+
+logger = logging.getLogger(__name__)
+
+# Pick the healthy endpoint with the lowest (in-flight + 1) x latency EWMA and
+# take an in-flight lease on it. An endpoint not measured yet is tried first
+# while idle, otherwise scored with the mean EWMA of the others. If every
+# endpoint is evicted, the one due back first is used so requests keep
+# flowing. KEYS[1..n] are the state hashes, KEYS[n+1..2n] the lease sets.
+# Lease expiry and eviction deadlines use Redis's clock, shared by every worker.
+_ACQUIRE = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local n = tonumber(ARGV[3])
+local inflight, ewma, evicted = {}, {}, {}
+local known_sum, known = 0, 0
+for i = 1, n do
+  redis.call('ZREMRANGEBYSCORE', KEYS[n + i], '-inf', now)
+  inflight[i] = redis.call('ZCARD', KEYS[n + i])
+  local state = redis.call('HMGET', KEYS[i], 'ewma_s', 'evicted_until')
+  ewma[i] = tonumber(state[1])
+  evicted[i] = tonumber(state[2]) or 0
+  if ewma[i] then
+    known_sum = known_sum + ewma[i]
+    known = known + 1
+  end
+end
+local default = 1
+if known > 0 then default = known_sum / known end
+local best, best_score, fallback = nil, nil, nil
+for i = 1, n do
+  if evicted[i] > now then
+    if fallback == nil or evicted[i] < evicted[fallback] then fallback = i end
+  else
+    local score = (inflight[i] + 1) * (ewma[i] or default)
+    if ewma[i] == nil and inflight[i] == 0 then score = -1 end
+    if best == nil or score < best_score then
+      best, best_score = i, score
+    end
+  end
+end
+best = best or fallback
+redis.call('ZADD', KEYS[n + best], now + tonumber(ARGV[1]), ARGV[2])
+return best
+"""
+
+# Drop the lease and fold in the outcome. Returns 1 if the endpoint was evicted.
+_RELEASE = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+redis.call('ZREM', KEYS[2], ARGV[1])
+if ARGV[2] == '1' then
+  local failures = redis.call('HINCRBY', KEYS[1], 'failures', 1)
+  if failures >= tonumber(ARGV[4]) then
+    redis.call('HSET', KEYS[1], 'evicted_until', now + tonumber(ARGV[5]))
+    return 1
+  end
+  return 0
+end
+local latency = tonumber(ARGV[3])
+local ewma = tonumber(redis.call('HGET', KEYS[1], 'ewma_s'))
+if ewma then
+  ewma = ewma + tonumber(ARGV[6]) * (latency - ewma)
+else
+  ewma = latency
+end
+redis.call('HSET', KEYS[1], 'ewma_s', ewma, 'failures', 0, 'evicted_until', 0)
+return 0
+"""
+
+
+@dataclass
+class EndpointLease:
+    url: str
+    token: Optional[str] = None
+    started: float = 0.0
+
+
+class ParserEndpointPool:
+    """
+    Pool of interchangeable PARSER replicas shared by all workers.
+
+    Each endpoint has a Redis hash with its latency EWMA, consecutive failure
+    count and eviction deadline, plus a set of in-flight leases (expiring, so
+    a crashed worker does not inflate the count forever). ``acquire`` routes
+    to the least-loaded healthy endpoint. ``failure_threshold`` consecutive
+    failures evict an endpoint for ``readmit_after_s``; after that it gets
+    traffic again, and one more failure evicts it again while one success
+    clears its record. If Redis is unreachable the pool falls back to
+    rotating through the endpoints locally.
+    """
+
+    PREFIX = "parserpool"
+    EWMA_ALPHA = 0.2
+
+    def __init__(
+        self,
+        urls: List[str],
+        failure_threshold: int = None,
+        readmit_after_s: float = None,
+        lease_ttl_s: float = None,
+    ):
+        self.urls = list(urls)
+        self.failure_threshold = failure_threshold or settings.parser_pool_failure_threshold
+        self.readmit_after_s = readmit_after_s or settings.parser_pool_readmit_after_s
+        self.lease_ttl_s = lease_ttl_s or settings.parser_timeout_s * 2
+        self.redis = get_redis()
+        self._acquire = self.redis.register_script(_ACQUIRE)
+        self._release = self.redis.register_script(_RELEASE)
+        self._next_local = 0
+
+    def _state_key(self, url: str) -> str:
+        return f"{self.PREFIX}:{url}"
+
+    def _inflight_key(self, url: str) -> str:
+        return f"{self.PREFIX}:{url}:inflight"
+
+    def acquire(self) -> EndpointLease:
+        token = uuid.uuid4().hex
+        now = time.time()
+        try:
+            index = self._acquire(
+                keys=[self._state_key(u) for u in self.urls] + [self._inflight_key(u) for u in self.urls],
+                args=[self.lease_ttl_s, token, len(self.urls)],
+            )
+            return EndpointLease(self.urls[int(index) - 1], token, now)
+        except Exception as e:
+            logger.warning(f"[POOL] Redis unavailable, routing round-robin: {e}")
+            url = self.urls[self._next_local % len(self.urls)]
+            self._next_local += 1
+            return EndpointLease(url, None, now)
+
+    def release(self, lease: EndpointLease, failed: bool):
+        if lease.token is None:
+            return
+        try:
+            evicted = self._release(
+                keys=[self._state_key(lease.url), self._inflight_key(lease.url)],
+                args=[
+                    lease.token,
+                    1 if failed else 0,
+                    time.time() - lease.started,
+                    self.failure_threshold,
+                    self.readmit_after_s,
+                    self.EWMA_ALPHA,
+                ],
+            )
+            if evicted:
+                logger.warning(f"[POOL] Evicted {lease.url} for {self.readmit_after_s:.0f}s after repeated failures")
+        except Exception as e:
+            logger.warning(f"[POOL] Failed to release lease on {lease.url}: {e}")
+
+    def snapshot(self) -> List[Dict]:
+        seconds, micros = self.redis.time()
+        now = seconds + micros / 1e6
+        endpoints = []
+        for url in self.urls:
+            state = self.redis.hgetall(self._state_key(url))
+            evicted_until = float(state.get("evicted_until", 0))
+            endpoints.append({
+                "url": url,
+                "healthy": evicted_until <= now,
+                "in_flight": self.redis.zcount(self._inflight_key(url), now, "+inf"),
+                "latency_ewma_s": float(state["ewma_s"]) if "ewma_s" in state else None,
+                "consecutive_failures": int(state.get("failures", 0)),
+            })
+        return endpoints
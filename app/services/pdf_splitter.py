@@ -0,0 +1,107 @@
+"""
+PDF Splitter - Cut large PDFs into page ranges and merge the per-range PARSER responses
+"""
+import io
+from typing import Any, Dict, List, Tuple
+
+from app.core.config import settings
+
+try:
+    import PyPDF2
+    PDF_AVAILABLE = True
+except ImportError:
+    PDF_AVAILABLE = False
+
+
+class PDFSplitter:
+    """
+    Split-and-merge for long papers.
+
+    Page ranges are half-open and zero-based: ``(0, 15)`` is pages 1-15.
+    Each range is parsed as its own PDF, so page numbers in its response are
+    relative to the range; ``shift_pages`` makes them absolute again before
+    ``merge`` stitches the ranges back together in page order.
+    """
+
+    def __init__(self, min_pages: int = None, pages_per_chunk: int = None):
+        if not PDF_AVAILABLE:
+            raise ImportError("PDF libraries not available. Install PyPDF2.")
+        self.min_pages = min_pages or settings.parse_split_min_pages
+        self.pages_per_chunk = pages_per_chunk or settings.parse_split_pages_per_chunk
+
+    def ranges(self, pdf_bytes: bytes) -> List[Tuple[int, int]]:
+        """Page ranges to parse separately; a single range if the PDF is below min_pages."""
+        n_pages = len(PyPDF2.PdfReader(io.BytesIO(pdf_bytes)).pages)
+        if n_pages < self.min_pages:
+            return [(0, n_pages)]
+        return [(start, min(start + self.pages_per_chunk, n_pages)) for start in range(0, n_pages, self.pages_per_chunk)]
+
+    @staticmethod
+    def split(pdf_bytes: bytes, ranges: List[Tuple[int, int]]) -> List[bytes]:
+        """One new PDF per page range, reading the page tree of pdf_bytes once."""
+        reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+        slices = []
+        for start, end in ranges:
+            writer = PyPDF2.PdfWriter()
+            for page in reader.pages[start:end]:
+                writer.add_page(page)
+            out = io.BytesIO()
+            writer.write(out)
+            slices.append(out.getvalue())
+        return slices
+
+    @staticmethod
+    def extract(pdf_bytes: bytes, start: int, end: int) -> bytes:
+        """A new PDF holding pages [start, end) of pdf_bytes."""
+        return PDFSplitter.split(pdf_bytes, [(start, end)])[0]
+
+    @staticmethod
+    def shift_pages(parser_result: Dict[str, Any], offset: int) -> Dict[str, Any]:
+        """Make range-relative page numbers of tables and figures absolute (in place)."""
+        for table in parser_result.get("tables", []):
+            if isinstance(table.get("page"), int):
+                table["page"] += offset
+        for figure in parser_result.get("figures", []):
+            image = figure.get("image") or {}
+            if isinstance(image.get("page"), int):
+                image["page"] += offset
+        return parser_result
+
+    @staticmethod
+    def merge(parts: List[Dict[str, Any]], ranges: List[Tuple[int, int]]) -> Dict[str, Any]:
+        """
+        Combine per-range responses, given in page order, into one response.
+
+        Paper metadata comes from the first range that has it. Tables and
+        figures are concatenated in page order; their numbers are kept when
+        they are unique across the paper (PARSER read them from captions) and
+        otherwise reassigned 1..n, the original kept as ``range_number``.
+
+        Args:
+            parts: PARSER responses, one per range, in page order
+            ranges: The (start, end) page range of each response
+
+        Returns:
+            Merged PARSER response
+        """
+        merged = dict(parts[0])
+        for key in ("omip_id", "title", "authors", "year"):
+            if not merged.get(key):
+                merged[key] = next((p[key] for p in parts if p.get(key)), merged.get(key))
+        merged["tables"] = PDFSplitter._renumber([t for p in parts for t in p.get("tables", [])])
+        merged["figures"] = PDFSplitter._renumber([f for p in parts for f in p.get("figures", [])])
+        merged["page_ranges"] = [[start + 1, end] for start, end in ranges]
+        return merged
+
+    @staticmethod
+    def _renumber(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        numbers = [item.get("number") for item in items]
+        if all(numbers) and len(set(map(str, numbers))) == len(numbers):
+            return items
+        renumbered = []
+        for i, item in enumerate(items):
+            item = dict(item, number=str(i + 1))
+            if numbers[i]:
+                item["range_number"] = numbers[i]
+            renumbered.append(item)
+        return renumbered
@@ -0,0 +1,128 @@
+"""
+Presigned Upload Service - Direct-to-MinIO uploads that bypass the API tier
+"""
+import uuid
+from typing import Any, Dict, List
+
+from app.core.config import settings
+from app.core.redis_client import get_redis
+from app.db.session import get_session
+from app.repositories.paper_repo import PaperRepository
+from app.schemas.api import PresignFile, PresignCompleteFile
+from app.services.storage_service import StorageService
+
+
+class PresignedUploadService:
+    """
+    Issue presigned PUT URLs and register the uploaded objects as papers.
+
+    Clients PUT straight to MinIO under a staging key, then call complete.
+    Completion only checks each object's size with a HEAD and hands staged
+    objects to a worker, which re-hashes them before copying them server-side
+    to their content-addressed key: ``pdfs/{sha256}`` is trusted by upload
+    dedup and the parse cache, so a declared hash is never taken on faith, but
+    the bytes never pass through the API tier. Such files come back as
+    ``pending``; calling complete again for them returns the paper (or the
+    mismatch) once the worker is done. Objects already under ``pdfs/`` were
+    verified when they got there.
+    """
+
+    STAGING_PREFIX = "uploads/presigned/"
+    VERIFIED_PREFIX = "presign:verified:"
+    STORED, DUPLICATE, MISMATCH = "stored", "duplicate", "sha256 mismatch"
+
+    def __init__(self):
+        self.storage = StorageService()
+
+    def presign(self, files: List[PresignFile]) -> Dict[str, Any]:
+        items = []
+        for f in files:
+            key = self.storage.object_key_for_pdf(f.sha256)
+            if self.storage.object_exists(key):
+                # Content already stored: nothing to upload, just complete it
+                items.append({"filename": f.filename, "sha256": f.sha256, "exists": True, "upload_key": key, "url": None})
+                continue
+            upload_key = f"{self.STAGING_PREFIX}{uuid.uuid4()}/{f.sha256}"
+            items.append({
+                "filename": f.filename,
+                "sha256": f.sha256,
+                "exists": False,
+                "upload_key": upload_key,
+                "url": self.storage.presigned_put_url(upload_key),
+            })
+        return {"files": items}
+
+    def complete(self, files: List[PresignCompleteFile]) -> Dict[str, Any]:
+        from app.workers.tasks import verify_presigned_upload_task
+
+        registered: list[tuple[str, str]] = []
+        results: list[Dict[str, Any]] = []
+        for f in files:
+            result: Dict[str, Any] = {"upload_key": f.upload_key, "filename": f.filename, "ok": False, "error": None}
+            results.append(result)
+            staged = f.upload_key.startswith(self.STAGING_PREFIX)
+            if not staged and not f.upload_key.startswith("pdfs/"):
+                result["error"] = "upload_key was not issued by /uploads/presign"
+                continue
+            sha256 = f.upload_key.rsplit("/", 1)[-1][:64]
+
+            verified = get_redis().get(self.VERIFIED_PREFIX + f.upload_key) if staged else None
+            if verified == self.MISMATCH:
+                result["error"] = self.MISMATCH
+                continue
+            if verified is None:
+                size = self.storage.object_size(f.upload_key)
+                if size is None:
+                    result["error"] = "object not found; upload it before completing"
+                    continue
+                if size != f.size:
+                    result["error"] = f"size mismatch: expected {f.size}, stored {size}"
+                    if staged:
+                        self.storage.remove_object(f.upload_key)
+                    continue
+                if staged:
+                    verify_presigned_upload_task.delay(f.upload_key, sha256)
+                    result["pending"] = True
+                    continue
+
+            result["duplicate"] = verified != self.STORED
+            result["ok"] = True
+            result["file_hash"] = sha256
+            registered.append((f.filename, sha256))
+
+        if registered:
+            with get_session() as db:
+                papers = PaperRepository(db).get_or_create_many(registered)
+                for result in results:
+                    if result["ok"]:
+                        paper = papers[result["file_hash"]]
+                        result["paper_id"] = str(paper.id)
+                        result["filename"] = paper.filename
+        pending = [{"upload_key": r["upload_key"], "filename": r["filename"]} for r in results if r.get("pending")]
+        return {
+            "papers": [r for r in results if r["ok"]],
+            "pending": pending,
+            "errors": [r for r in results if not r["ok"] and not r.get("pending")],
+        }
+
+    def verify(self, upload_key: str, sha256: str) -> str | None:
+        """
+        Re-hash a staged upload and promote it to its content-addressed key if it matches.
+
+        Runs on a worker. The outcome is kept in Redis for complete() to report.
+
+        Returns:
+            STORED, DUPLICATE or MISMATCH, or None if the staged object is gone
+            (already verified by an earlier call)
+        """
+        if self.storage.object_size(upload_key) is None:
+            return None
+        actual, _ = self.storage.compute_sha256_object(upload_key)
+        if actual != sha256:
+            self.storage.remove_object(upload_key)
+            outcome = self.MISMATCH
+        else:
+            _key, duplicate = self.storage.promote_to_pdf_key(upload_key, sha256)
+            outcome = self.DUPLICATE if duplicate else self.STORED
+        get_redis().set(self.VERIFIED_PREFIX + upload_key, outcome, ex=settings.upload_session_ttl_seconds)
+        return outcome
@@ -0,0 +1,92 @@
+"""
+Rate Limiter - Cluster-wide token buckets for upstream APIs, kept in Redis
+"""
+import logging
+import time
+from typing import Optional
+
+from app.core.config import settings
+from app.core.redis_client import get_redis
+
+
+logger = logging.getLogger(__name__)
+
+# Refill lazily from the elapsed time, then take one token if available.
+# Returns "0" when a token was taken, otherwise the seconds until one will be.
+# The clock is Redis's own, so skew between worker hosts cannot mint or lose tokens.
+_TAKE = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens') or burst)
+local ts = tonumber(redis.call('HGET', KEYS[1], 'ts') or now)
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 60)
+return tostring(wait)
+"""
+
+
+class RateLimitTimeout(Exception):
+    pass
+
+
+class TokenBucketRateLimiter:
+    """
+    Requests-per-second limit shared by every worker container.
+
+    Callers block until a token is available instead of failing, so adding
+    workers raises throughput up to ``rate`` and no further. A rate of 0
+    disables the limiter; Redis errors fail open.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int, wait_timeout_s: float = 300.0):
+        self.name = name
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.wait_timeout_s = wait_timeout_s
+        self.key = f"ratelimit:{name}"
+        self.redis = get_redis()
+        self._take = self.redis.register_script(_TAKE)
+
+    @classmethod
+    def for_endpoint(cls, name: str) -> Optional["TokenBucketRateLimiter"]:
+        """Limiter configured from ``{name}_rate_limit_rps`` / ``{name}_rate_limit_burst``, or None if disabled."""
+        rate = getattr(settings, f"{name}_rate_limit_rps")
+        if not rate:
+            return None
+        return cls(
+            name=name,
+            rate=rate,
+            burst=getattr(settings, f"{name}_rate_limit_burst"),
+            wait_timeout_s=settings.rate_limit_wait_timeout_s,
+        )
+
+    def try_acquire(self) -> bool:
+        """Take a token only if one is available now (fails open on Redis errors)."""
+        try:
+            return float(self._take(keys=[self.key], args=[self.rate, self.burst])) <= 0
+        except Exception as e:
+            logger.warning(f"[RATELIMIT] {self.name}: Redis unavailable, not limiting: {e}")
+            return True
+
+    def acquire(self):
+        deadline = time.time() + self.wait_timeout_s
+        while True:
+            try:
+                wait = float(self._take(keys=[self.key], args=[self.rate, self.burst]))
+            except Exception as e:
+                logger.warning(f"[RATELIMIT] {self.name}: Redis unavailable, not limiting: {e}")
+                return
+            if wait <= 0:
+                return
+            if time.time() + wait > deadline:
+                raise RateLimitTimeout(f"timeout waiting {self.wait_timeout_s}s for a {self.name} rate-limit token")
+            time.sleep(wait)
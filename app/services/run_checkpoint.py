@@ -0,0 +1,74 @@
+"""
+Run Checkpoint - Per-run copies of intermediate parse results in MinIO
+"""
+import json
+import logging
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from app.schemas.parse import PARSER_RESPONSE
+from app.services.storage_service import StorageService
+
+
+logger = logging.getLogger(__name__)
+
+
+class RunCheckpoint:
+    """
+    Stage outputs of a single run, stored under ``runs/{run_id}/``.
+
+    The raw PARSER response is written as soon as it arrives, so a retry
+    after a conversion or database failure resumes from it instead of calling
+    PARSER again. The checkpoint is dropped once the run is persisted.
+    Split parses also keep each page range, as its own PDF, and its response
+    here until the ranges are merged.
+    """
+
+    def __init__(self, storage: StorageService = None):
+        self.storage = storage or StorageService()
+
+    def raw_key(self, run_id: UUID) -> str:
+        return f"runs/{run_id}/parser_raw.json"
+
+    def save_raw(self, run_id: UUID, parser_result: Dict[str, Any]):
+        self.storage.put_object(self.raw_key(run_id), json.dumps(parser_result).encode(), content_type="application/json")
+
+    def load_raw(self, run_id: UUID) -> Optional[Dict[str, Any]]:
+        try:
+            return PARSER_RESPONSE.validate_json(self.storage.get_object(self.raw_key(run_id)))
+        except Exception as e:
+            logger.warning(f"[CHECKPOINT] No usable raw response for run {run_id}: {e}")
+            return None
+
+    def part_key(self, run_id: UUID, start: int) -> str:
+        return f"runs/{run_id}/parts/{start:05d}.json"
+
+    def save_part(self, run_id: UUID, start: int, parser_result: Dict[str, Any]):
+        self.storage.put_object(self.part_key(run_id, start), json.dumps(parser_result).encode(), content_type="application/json")
+
+    def load_part(self, run_id: UUID, start: int) -> Dict[str, Any]:
+        return PARSER_RESPONSE.validate_json(self.storage.get_object(self.part_key(run_id, start)))
+
+    def slice_key(self, run_id: UUID, start: int) -> str:
+        return f"runs/{run_id}/pages/{start:05d}.pdf"
+
+    def save_slice(self, run_id: UUID, start: int, pdf_bytes: bytes):
+        self.storage.put_object(self.slice_key(run_id, start), pdf_bytes, content_type="application/pdf")
+
+    def load_slice(self, run_id: UUID, start: int) -> bytes:
+        return self.storage.get_object(self.slice_key(run_id, start))
+
+    def clear_parts(self, run_id: UUID, starts: List[int]):
+        """Drop the page-range PDFs and responses of a split parse."""
+        for start in starts:
+            for key in (self.slice_key(run_id, start), self.part_key(run_id, start)):
+                try:
+                    self.storage.remove_object(key)
+                except Exception as e:
+                    logger.warning(f"[CHECKPOINT] Failed to remove page range {start} of run {run_id}: {e}")
+
+    def clear(self, run_id: UUID):
+        try:
+            self.storage.remove_object(self.raw_key(run_id))
+        except Exception as e:
+            logger.warning(f"[CHECKPOINT] Failed to remove checkpoint of run {run_id}: {e}")
@@ -0,0 +1,52 @@
+"""
+Single Flight - Redis leases so only one worker does a given piece of work at a time
+"""
+import logging
+import uuid
+from typing import Optional
+
+from app.core.redis_client import get_redis
+
+
+logger = logging.getLogger(__name__)
+
+# Delete the lease only if we still own it (it may have expired and been re-taken)
+_RELEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """
+    Leader election per key.
+
+    The first caller to ``try_acquire`` a key becomes the leader and does the
+    work; others see None and are expected to wait for the leader's result
+    (wherever the caller publishes it) or for the lease to disappear. Leases
+    expire after ``lease_ttl_s`` so a crashed leader does not block followers.
+    """
+
+    def __init__(self, name: str, lease_ttl_s: float):
+        self.name = name
+        self.lease_ttl_s = lease_ttl_s
+        self.redis = get_redis()
+        self._release = self.redis.register_script(_RELEASE)
+
+    def _key(self, key: str) -> str:
+        return f"singleflight:{self.name}:{key}"
+
+    def try_acquire(self, key: str) -> Optional[str]:
+        """Become leader for key. Returns a lease token, or None if another caller holds it."""
+        token = uuid.uuid4().hex
+        if self.redis.set(self._key(key), token, nx=True, ex=max(1, int(self.lease_ttl_s))):
+            return token
+        return None
+
+    def release(self, key: str, token: str):
+        try:
+            self._release(keys=[self._key(key)], args=[token])
+        except Exception as e:
+            logger.warning(f"[SINGLEFLIGHT] {self.name}: failed to release {key}: {e}")
@@ -1,27 +1,115 @@
 import hashlib
+import io
+from datetime import timedelta
+from functools import lru_cache
 from io import BytesIO
-from typing import Optional
+from typing import Optional, BinaryIO
+import urllib3
+from urllib3.util import Retry, Timeout
 from minio import Minio
+from minio.commonconfig import ComposeSource, CopySource
+from minio.datatypes import Part
 from minio.error import S3Error
 
 from app.core.config import settings
 
 
+class _RangeReader(io.RawIOBase):
+    """Seekable read-only view of a MinIO object, served by ranged GETs."""
+
+    def __init__(self, client: Minio, bucket: str, key: str, size: int):
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.size = size
+        self.pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self.pos
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self.pos = max(0, offset)
+        return self.pos
+
+    def readinto(self, buffer) -> int:
+        length = min(len(buffer), self.size - self.pos)
+        if length <= 0:
+            return 0
+        response = self.client.get_object(self.bucket, self.key, offset=self.pos, length=length)
+        try:
+            data = response.read()
+        finally:
+            response.close()
+            response.release_conn()
+        buffer[:len(data)] = data
+        self.pos += len(data)
+        return len(data)
+
+
+@lru_cache(maxsize=1)
+def get_minio_client() -> Minio:
+    """Process-wide Minio client backed by one keep-alive connection pool."""
+    http_client = urllib3.PoolManager(
+        timeout=Timeout(connect=10, read=300),
+        maxsize=settings.minio_pool_size,
+        block=True,  # wait for a free connection instead of opening throwaway ones
+        retries=Retry(total=5, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]),
+    )
+    return Minio(
+        settings.minio_endpoint,
+        access_key=settings.minio_root_user,
+        secret_key=settings.minio_root_password,
+        secure=False,
+        http_client=http_client,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_presign_client() -> Minio:
+    """Client used only to sign URLs for the public endpoint; region is fixed so signing needs no network call."""
+    return Minio(
+        settings.minio_public_endpoint or settings.minio_endpoint,
+        access_key=settings.minio_root_user,
+        secret_key=settings.minio_root_password,
+        secure=settings.minio_public_secure,
+        region=settings.minio_region,
+    )
+
+
 class StorageService:
     def __init__(self):
-        self.client = Minio(
-            settings.minio_endpoint,
-            access_key=settings.minio_root_user,
-            secret_key=settings.minio_root_password,
-            secure=False,
-        )
+        self.client = get_minio_client()
         self.bucket = settings.minio_bucket
         self._bucket_ensured = False
 
     def compute_sha256(self, data: bytes) -> str:
         return hashlib.sha256(data).hexdigest()
 
-    def put_object(self, key: str, data: bytes, content_type: str = "application/octet-stream") -> str:
+    def compute_sha256_stream(self, stream: BinaryIO) -> tuple[str, int]:
+        """Hash a file-like object chunk by chunk and rewind it. Returns (sha256, size)."""
+        digest = hashlib.sha256()
+        size = 0
+        stream.seek(0)
+        while True:
+            chunk = stream.read(settings.upload_chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+        stream.seek(0)
+        return digest.hexdigest(), size
+
+    def _ensure_bucket(self):
         # Ensure bucket exists (only check once per instance)
         if not self._bucket_ensured:
             try:
@@ -31,10 +119,33 @@ class StorageService:
             except S3Error:
                 # In docker compose, bucket is created by a helper container; ignore errors here
                 self._bucket_ensured = True
+
+    def put_object(self, key: str, data: bytes, content_type: str = "application/octet-stream") -> str:
+        self._ensure_bucket()
         stream = BytesIO(data)
         self.client.put_object(self.bucket, key, stream, length=len(data), content_type=content_type)
         return key
 
+    def put_stream(self, key: str, stream: BinaryIO, length: int, content_type: str = "application/octet-stream") -> str:
+        """
+        Pipe a file-like object into MinIO without loading it into memory.
+
+        Objects larger than ``minio_part_size`` are sent as a multipart upload,
+        so at most one part is buffered at a time.
+        """
+        self._ensure_bucket()
+        self.client.put_object(
+            self.bucket,
+            key,
+            stream,
+            length=length,
+            content_type=content_type,
+            part_size=settings.minio_part_size,
+            # Parallelism comes from ParseService's upload pool; keep one part in flight per file
+            num_parallel_uploads=1,
+        )
+        return key
+
     def get_object(self, key: str) -> bytes:
         """Download object from MinIO and return as bytes."""
         try:
@@ -46,6 +157,112 @@ class StorageService:
         except S3Error as e:
             raise Exception(f"Failed to get object from MinIO: {e}")
 
-    def object_key_for_pdf(self, filename: str, sha256: str) -> str:
+    def object_exists(self, key: str) -> bool:
+        """HEAD the object; False only when MinIO reports it missing."""
+        return self.object_size(key) is not None
+
+    def open_seekable(self, key: str) -> BinaryIO:
+        """Random-access reader over an object (e.g. a ZIP's central directory) without downloading it."""
+        size = self.client.stat_object(self.bucket, key).size
+        return io.BufferedReader(_RangeReader(self.client, self.bucket, key, size), buffer_size=settings.minio_part_size)
+
+    def presigned_put_url(self, key: str) -> str:
+        self._ensure_bucket()
+        return get_presign_client().presigned_put_object(
+            self.bucket, key, expires=timedelta(seconds=settings.presigned_url_expiry_seconds)
+        )
+
+    def object_size(self, key: str) -> int | None:
+        """Size from a HEAD request, or None if the object is missing."""
+        try:
+            return self.client.stat_object(self.bucket, key).size
+        except S3Error as e:
+            if e.code in ("NoSuchKey", "NoSuchObject", "NotFound", "NoSuchBucket"):
+                return None
+            raise
+
+    def open_stream(self, key: str):
+        """Sequential streaming response for an object; caller must close() and release_conn()."""
+        return self.client.get_object(self.bucket, key)
+
+    def object_key_for_pdf(self, sha256: str) -> str:
+        # Content-addressed: identical bytes map to one object whatever the filename
+        return f"pdfs/{sha256}.pdf"
+
+    def legacy_object_key_for_pdf(self, filename: str, sha256: str) -> str:
+        # Pre content-addressing layout, still present in older buckets
         return f"pdfs/{sha256}_{filename}"
 
+    def hash_from_pdf_key(self, key: str) -> str:
+        """Extract the SHA-256 from either the current or the legacy PDF key layout."""
+        return key[len("pdfs/"):len("pdfs/") + 64]
+
+    def ensure_pdf_key(self, filename: str, sha256: str) -> str:
+        """
+        Return the content-addressed key for a PDF, migrating lazily.
+
+        If only the legacy ``pdfs/{sha256}_{filename}`` object exists it is
+        copied server-side to the new key. The legacy object is left in place;
+        ``python -m app.utils.backfill_pdf_keys --delete-legacy`` removes it.
+        """
+        key = self.object_key_for_pdf(sha256)
+        if self.object_exists(key):
+            return key
+        legacy = self.legacy_object_key_for_pdf(filename, sha256)
+        if self.object_exists(legacy):
+            self.client.copy_object(self.bucket, key, CopySource(self.bucket, legacy))
+        return key
+
+    def compute_sha256_object(self, key: str) -> tuple[str, int]:
+        """Hash a stored object by streaming it back in chunks. Returns (sha256, size)."""
+        digest = hashlib.sha256()
+        size = 0
+        response = self.client.get_object(self.bucket, key)
+        try:
+            for chunk in response.stream(settings.upload_chunk_size):
+                digest.update(chunk)
+                size += len(chunk)
+        finally:
+            response.close()
+            response.release_conn()
+        return digest.hexdigest(), size
+
+    def promote_to_pdf_key(self, staging_key: str, sha256: str) -> tuple[str, bool]:
+        """
+        Move a staged upload to its content-addressed key.
+
+        Returns (key, duplicate); when the bytes were already stored the
+        staged copy is simply dropped.
+        """
+        key = self.object_key_for_pdf(sha256)
+        duplicate = self.object_exists(key)
+        if not duplicate:
+            # compose_object falls back to multipart copy for sources over 5 GiB
+            self.client.compose_object(self.bucket, key, [ComposeSource(self.bucket, staging_key)])
+        self.remove_object(staging_key)
+        return key, duplicate
+
+    def remove_object(self, key: str):
+        self.client.remove_object(self.bucket, key)
+
+    # --- Multipart uploads driven by the client (resumable upload sessions) ---
+
+    def create_multipart_upload(self, key: str, content_type: str = "application/octet-stream") -> str:
+        self._ensure_bucket()
+        return self.client._create_multipart_upload(self.bucket, key, {"Content-Type": content_type})
+
+    def upload_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        return self.client._upload_part(self.bucket, key, data, None, upload_id, part_number)
+
+    def complete_multipart_upload(self, key: str, upload_id: str, parts: list[tuple[int, str]]):
+        self.client._complete_multipart_upload(
+            self.bucket, key, upload_id, [Part(number, etag) for number, etag in sorted(parts)]
+        )
+
+    def abort_multipart_upload(self, key: str, upload_id: str):
+        try:
+            self.client._abort_multipart_upload(self.bucket, key, upload_id)
+        except S3Error:
+            # Already completed/aborted or expired by a lifecycle rule
+            pass
+
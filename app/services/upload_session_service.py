@@ -0,0 +1,196 @@
+"""
+Upload Session Service - Resumable, chunked uploads for very large batches
+"""
+import json
+import time
+import uuid
+from typing import Any, Dict, List
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.redis_client import get_redis
+from app.db.session import get_session
+from app.repositories.paper_repo import PaperRepository
+from app.schemas.api import UploadSessionFile
+from app.services.storage_service import StorageService
+
+
+class UploadSessionService:
+    """
+    Track client-driven chunked uploads.
+
+    Each file of a session is a MinIO multipart upload; every chunk the client
+    PUTs becomes one part. Session metadata and received part ETags live in
+    Redis, so any API replica can accept the next chunk and a client can ask
+    which parts are still missing after a dropped connection.
+    """
+
+    KEY_PREFIX = "upload_session"
+
+    def __init__(self):
+        self.redis = get_redis()
+        self.storage = StorageService()
+        self.part_size = settings.upload_session_part_size
+        self.ttl = settings.upload_session_ttl_seconds
+
+    def _meta_key(self, session_id: str) -> str:
+        return f"{self.KEY_PREFIX}:{session_id}"
+
+    def _parts_key(self, session_id: str, index: int) -> str:
+        return f"{self.KEY_PREFIX}:{session_id}:parts:{index}"
+
+    def _load(self, session_id: str) -> Dict[str, Any]:
+        raw = self.redis.get(self._meta_key(session_id))
+        if not raw:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found or expired")
+        return json.loads(raw)
+
+    def _save(self, session: Dict[str, Any]):
+        self.redis.set(self._meta_key(session["session_id"]), json.dumps(session), ex=self.ttl)
+
+    def _touch(self, session: Dict[str, Any]):
+        # Keep an active session (and its part maps) alive while chunks keep arriving
+        sid = session["session_id"]
+        pipe = self.redis.pipeline()
+        pipe.expire(self._meta_key(sid), self.ttl)
+        for index in range(len(session["files"])):
+            pipe.expire(self._parts_key(sid, index), self.ttl)
+        pipe.execute()
+
+    def create(self, files: List[UploadSessionFile]) -> Dict[str, Any]:
+        session_id = str(uuid.uuid4())
+        entries = []
+        for index, f in enumerate(files):
+            staging_key = f"uploads/sessions/{session_id}/{index}"
+            upload_id = self.storage.create_multipart_upload(staging_key, content_type="application/pdf")
+            entries.append({
+                "filename": f.filename,
+                "size": f.size,
+                "sha256": f.sha256,
+                "staging_key": staging_key,
+                "upload_id": upload_id,
+                "part_count": (f.size + self.part_size - 1) // self.part_size,
+            })
+        session = {
+            "session_id": session_id,
+            "status": "open",
+            "part_size": self.part_size,
+            "created_at": time.time(),
+            "files": entries,
+        }
+        self._save(session)
+        return self.describe(session_id)
+
+    def describe(self, session_id: str) -> Dict[str, Any]:
+        """Session state including, per file, which chunk offsets are still missing."""
+        session = self._load(session_id)
+        files = []
+        for index, f in enumerate(session["files"]):
+            received = {int(n) for n in self.redis.hkeys(self._parts_key(session_id, index))}
+            missing = [(n - 1) * session["part_size"] for n in range(1, f["part_count"] + 1) if n not in received]
+            files.append({
+                "index": index,
+                "filename": f["filename"],
+                "size": f["size"],
+                "part_count": f["part_count"],
+                "received_parts": len(received),
+                "missing_offsets": missing,
+            })
+        return {
+            "session_id": session_id,
+            "status": session["status"],
+            "part_size": session["part_size"],
+            "files": files,
+            "result": session.get("result"),
+        }
+
+    def put_chunk(self, session_id: str, index: int, offset: int, data: bytes) -> Dict[str, Any]:
+        session = self._load(session_id)
+        if session["status"] != "open":
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Session is {session['status']}")
+        if index < 0 or index >= len(session["files"]):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File index not in session")
+        f = session["files"][index]
+        part_size = session["part_size"]
+        if offset < 0 or offset >= f["size"] or offset % part_size != 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Offset must be a multiple of {part_size} within the file")
+        expected = min(part_size, f["size"] - offset)
+        if len(data) != expected:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Chunk at offset {offset} must be {expected} bytes, got {len(data)}")
+
+        # Re-sending a part simply overwrites it, which makes retries idempotent
+        part_number = offset // part_size + 1
+        etag = self.storage.upload_part(f["staging_key"], f["upload_id"], part_number, data)
+        self.redis.hset(self._parts_key(session_id, index), str(part_number), etag)
+        self._touch(session)
+        return {"index": index, "offset": offset, "part_number": part_number, "etag": etag}
+
+    def complete(self, session_id: str) -> Dict[str, Any]:
+        """Assemble every file, move it to its content-addressed key and register papers."""
+        session = self._load(session_id)
+        if session["status"] == "completed":
+            # Idempotent: a client that lost the first response can ask again
+            return session["result"]
+        if session["status"] != "open":
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Session is {session['status']}")
+
+        lock = self.redis.set(f"{self._meta_key(session_id)}:lock", "1", nx=True, ex=600)
+        if not lock:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Session is already being completed")
+        try:
+            pending = self.describe(session_id)
+            incomplete = [f["index"] for f in pending["files"] if f["missing_offsets"]]
+            if incomplete:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Files still missing chunks: {incomplete}")
+
+            for index, f in enumerate(session["files"]):
+                if f.get("file_hash"):
+                    continue  # assembled by an earlier, interrupted completion
+                parts = [(int(n), etag) for n, etag in self.redis.hgetall(self._parts_key(session_id, index)).items()]
+                if not self.storage.object_exists(f["staging_key"]):
+                    self.storage.complete_multipart_upload(f["staging_key"], f["upload_id"], parts)
+                file_hash, size = self.storage.compute_sha256_object(f["staging_key"])
+                if size != f["size"] or (f["sha256"] and f["sha256"] != file_hash):
+                    self.storage.remove_object(f["staging_key"])
+                    session["status"] = "failed"
+                    self._save(session)
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"{f['filename']}: assembled object does not match declared size/sha256",
+                    )
+                _key, f["duplicate"] = self.storage.promote_to_pdf_key(f["staging_key"], file_hash)
+                f["file_hash"] = file_hash
+                self._save(session)
+
+            with get_session() as db:
+                papers = PaperRepository(db).get_or_create_many(
+                    [(f["filename"], f["file_hash"]) for f in session["files"]]
+                )
+                result = {
+                    "papers": [
+                        {
+                            "paper_id": str(papers[f["file_hash"]].id),
+                            "filename": papers[f["file_hash"]].filename,
+                            "file_hash": f["file_hash"],
+                            "duplicate": f["duplicate"],
+                        }
+                        for f in session["files"]
+                    ]
+                }
+
+            session["status"] = "completed"
+            session["result"] = result
+            self._save(session)
+            return result
+        finally:
+            self.redis.delete(f"{self._meta_key(session_id)}:lock")
+
+    def abort(self, session_id: str):
+        session = self._load(session_id)
+        if session["status"] != "completed":
+            for f in session["files"]:
+                if not f.get("file_hash"):
+                    self.storage.abort_multipart_upload(f["staging_key"], f["upload_id"])
+        keys = [self._meta_key(session_id)] + [self._parts_key(session_id, i) for i in range(len(session["files"]))]
+        self.redis.delete(*keys)
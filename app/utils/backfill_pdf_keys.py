@@ -0,0 +1,47 @@
+import argparse
+import re
+
+from minio.commonconfig import CopySource
+
+from app.services.storage_service import StorageService
+
+
+LEGACY_KEY = re.compile(r"^pdfs/([0-9a-f]{64})_(.+)$")
+
+
+def backfill(delete_legacy: bool = False, dry_run: bool = False) -> dict:
+    """Copy every legacy ``pdfs/{sha256}_{filename}`` object to ``pdfs/{sha256}.pdf``."""
+    storage = StorageService()
+    stats = {"scanned": 0, "copied": 0, "already_present": 0, "deleted": 0}
+    for obj in storage.client.list_objects(storage.bucket, prefix="pdfs/", recursive=True):
+        match = LEGACY_KEY.match(obj.object_name)
+        if not match:
+            continue
+        stats["scanned"] += 1
+        legacy = obj.object_name
+        key = storage.object_key_for_pdf(match.group(1))
+        if storage.object_exists(key):
+            stats["already_present"] += 1
+        else:
+            if not dry_run:
+                storage.client.copy_object(storage.bucket, key, CopySource(storage.bucket, legacy))
+            stats["copied"] += 1
+        if delete_legacy:
+            if not dry_run:
+                storage.client.remove_object(storage.bucket, legacy)
+            stats["deleted"] += 1
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate PDFs to content-addressed MinIO keys")
+    parser.add_argument("--delete-legacy", action="store_true", help="remove legacy objects after copying")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    stats = backfill(delete_legacy=args.delete_legacy, dry_run=args.dry_run)
+    print(stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+import argparse
+
+from app.services.parse_cache import ParseCache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evict expired and oldest entries from the PARSER response cache")
+    parser.add_argument("--max-bytes", type=int, default=None, help="size budget (default: settings.parse_cache_max_bytes)")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    stats = ParseCache().prune(max_bytes=args.max_bytes, dry_run=args.dry_run)
+    print(stats)
+
+
+if __name__ == "__main__":
+    main()
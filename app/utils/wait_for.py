@@ -38,6 +38,8 @@ def wait_for_db(timeout: int = 60):
                 # ensure latest schema columns (idempotent)
                 try:
                     conn.execute(text("ALTER TABLE parse_runs ADD COLUMN IF NOT EXISTS task_state batch_status NOT NULL DEFAULT 'pending'"))
+                    conn.execute(text("ALTER TABLE parse_runs ADD COLUMN IF NOT EXISTS stage VARCHAR(20)"))
+                    conn.commit()
                 except Exception:
                     pass
                 return
@@ -1,7 +1,20 @@
 from celery import Celery
+from kombu import Queue
 from app.core.config import settings
 
 
+# Named queues, highest priority first. Workers consume them in this order
+# (strict priority): a worker only takes bulk work when no interactive work is
+# waiting, and backfill only when both are empty.
+QUEUE_INTERACTIVE = "interactive"  # single-paper actions by an annotator
+QUEUE_BULK = "bulk"                # uploaded batches
+QUEUE_BACKFILL = "backfill"        # mass re-runs and maintenance
+QUEUES = (QUEUE_INTERACTIVE, QUEUE_BULK, QUEUE_BACKFILL)
+
+# Default message priority per queue (Redis transport: 0 is highest)
+QUEUE_PRIORITY = {QUEUE_INTERACTIVE: 0, QUEUE_BULK: 5, QUEUE_BACKFILL: 9}
+
+
 celery = Celery(
     "omip_tasks",
     broker=settings.celery_broker_url,
@@ -17,14 +30,36 @@ celery.conf.update(
     task_soft_time_limit=540,  # 9 minutes soft limit (raise SoftTimeLimitExceeded)
     # Task acknowledgement - only acknowledge after completion (success or failure)
     task_acks_late=True,
-    # Critical: Ensure only ONE task is processed at a time
-    worker_prefetch_multiplier=1,  # Worker fetches only 1 task at a time
-    worker_concurrency=1,  # Only 1 worker process (ensures sequential processing)
+    # Fetch one task per process at a time; long parses should not hoard queued work
+    worker_prefetch_multiplier=1,
+    # Real concurrency: PARSER load is bounded by the adaptive limiter, not by serializing tasks
+    worker_concurrency=settings.worker_concurrency,
     # Retry configuration
     task_reject_on_worker_lost=True,  # Reject task if worker crashes
     task_acks_on_failure_or_timeout=True,  # Acknowledge failed/timed-out tasks
     # Task routing
     task_create_missing_queues=True,  # Auto-create queues if missing
+    task_queues=[Queue(name) for name in QUEUES],
+    task_default_queue=QUEUE_BULK,
+    task_default_priority=QUEUE_PRIORITY[QUEUE_BULK],
+    task_routes={
+        "probe_circuit_task": {"queue": QUEUE_INTERACTIVE},
+        "prune_parse_cache_task": {"queue": QUEUE_BACKFILL},
+        "pump_scheduler_task": {"queue": QUEUE_INTERACTIVE},
+        "verify_presigned_upload_task": {"queue": QUEUE_INTERACTIVE},
+    },
+    # Periodic maintenance (run `celery beat`, see the beat service in docker-compose.yml)
+    beat_schedule={
+        "pump-scheduler": {"task": "pump_scheduler_task", "schedule": settings.scheduler_reap_interval_s},
+        "prune-parse-cache": {"task": "prune_parse_cache_task", "schedule": settings.parse_cache_prune_interval_s},
+    },
+    broker_transport_options={
+        # Poll queues in the order listed instead of round-robin
+        "queue_order_strategy": "priority",
+        # Honour per-message priority within a queue
+        "priority_steps": list(range(10)),
+        "sep": ":",
+    },
     # Result backend settings
     result_expires=3600,  # Results expire after 1 hour
     result_persistent=True,  # Persist results to backend
@@ -0,0 +1,238 @@
+"""
+Parse Pipeline - Overlap MinIO download, the PARSER call and the DB write inside one worker
+"""
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.db.session import get_session
+from app.models.models import ParseStage
+from app.repositories.run_repo import RunRepository
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.parse_service import ParseService
+from app.services.pdf_parser_service import PDFParserService, ParseInFlight
+from app.services.run_checkpoint import RunCheckpoint
+
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+@dataclass
+class PipelineItem:
+    batch_id: Optional[str]
+    run_id: str
+    filename: str
+    object_key: str
+    force_reparse: bool = False
+    started: float = field(default_factory=time.time)
+    pdf_bytes: Optional[bytes] = None
+    parser_result: Optional[Dict[str, Any]] = None
+    fresh: bool = False  # parser_result came from PARSER in this run, not a checkpoint or the cache
+    error: Optional[Exception] = None
+
+
+class ParsePipeline:
+    """
+    Three stages joined by bounded queues, one thread each:
+
+    fetch    mark the run processing, then load its raw checkpoint, a cached
+             PARSER response or, failing both, the PDF bytes from MinIO
+    parse    call PARSER (this thread only ever waits on PARSER)
+    persist  checkpoint, convert and write the result in one transaction
+
+    While PDF n is at the parser, PDF n+1 is being downloaded and the result
+    of PDF n-1 is being written, so the parser never waits on MinIO or
+    Postgres. Queue depth (``pipeline_prefetch``) bounds how many PDFs are
+    held in memory. Failures are handled per PDF exactly like parse_pdf_task:
+    retryable errors are re-queued as single tasks, others fail the run. A
+    PDF that no stage managed to hand off is re-queued when the run ends.
+    """
+
+    def __init__(self, prefetch: int = None):
+        self.parser_service = PDFParserService()
+        self.checkpoint = RunCheckpoint(self.parser_service.storage_service)
+        self.breaker = CircuitBreaker.for_parser() if settings.parser_breaker_enabled else None
+        depth = prefetch or settings.pipeline_prefetch
+        self.fetched: queue.Queue = queue.Queue(maxsize=depth)
+        self.parsed: queue.Queue = queue.Queue(maxsize=depth)
+        self.stats = {"persisted": 0, "failed": 0, "requeued": 0, "parked": 0}
+        self.settled: set = set()  # run ids handed off by some stage
+
+    def run(self, items: List[PipelineItem]) -> Dict[str, int]:
+        fetcher = threading.Thread(target=self._fetch_stage, args=(items,), name="pipeline-fetch", daemon=True)
+        persister = threading.Thread(target=self._persist_stage, name="pipeline-persist", daemon=True)
+        fetcher.start()
+        persister.start()
+        try:
+            self._parse_stage()
+        finally:
+            fetcher.join()
+            persister.join()
+            self._recover(items)
+        logger.info(f"[PERF] Pipeline finished {len(items)} PDFs: {self.stats}")
+        return self.stats
+
+    # Each stage handles every item in its own try/except and always forwards
+    # _DONE, so one bad item (e.g. _park failing while Redis is down) cannot
+    # stop a stage and leave the others blocked on its queue. An item whose
+    # handling raised is left unsettled and re-queued by _recover.
+
+    def _fetch_stage(self, items: List[PipelineItem]):
+        try:
+            for item in items:
+                try:
+                    if self.breaker and self.breaker.is_open():
+                        self._park(item)
+                        continue
+                    self._fetch(item)
+                except Exception as e:
+                    logger.error(f"[PIPELINE] Fetch stage dropped run {item.run_id}: {e}")
+                    continue
+                self.fetched.put(item)
+        finally:
+            self.fetched.put(_DONE)
+
+    def _parse_stage(self):
+        try:
+            while True:
+                item = self.fetched.get()
+                if item is _DONE:
+                    return
+                try:
+                    if self._parse(item):
+                        self.parsed.put(item)
+                except Exception as e:
+                    logger.error(f"[PIPELINE] Parse stage dropped run {item.run_id}: {e}")
+        finally:
+            self.parsed.put(_DONE)
+
+    def _persist_stage(self):
+        while True:
+            item = self.parsed.get()
+            if item is _DONE:
+                return
+            try:
+                self._persist(item)
+            except Exception as e:
+                logger.error(f"[PIPELINE] Persist stage dropped run {item.run_id}: {e}")
+
+    def _fetch(self, item: PipelineItem):
+        try:
+            with get_session() as db:
+                stage = RunRepository(db).mark_processing(UUID(item.run_id))
+            if stage == ParseStage.parsed and not item.force_reparse:
+                item.parser_result = self.checkpoint.load_raw(UUID(item.run_id))
+            if item.parser_result is None and not item.force_reparse:
+                item.parser_result = self.parser_service.cached_parser_result(item.object_key)
+            if item.parser_result is None:
+                item.pdf_bytes = self.parser_service.download_pdf(item.object_key, item.filename)
+        except Exception as e:
+            item.error = e
+
+    def _parse(self, item: PipelineItem) -> bool:
+        """Call PARSER if the item still needs it. False if the item was parked or re-queued instead."""
+        if item.error is None and item.parser_result is None:
+            try:
+                item.parser_result, item.fresh = self.parser_service.fetch_parser_result(
+                    object_key=item.object_key,
+                    filename=item.filename,
+                    force_reparse=item.force_reparse,
+                    pdf_bytes=item.pdf_bytes,
+                )
+            except CircuitOpenError:
+                self._park(item)
+                return False
+            except ParseInFlight:
+                self._follow(item)
+                return False
+            except Exception as e:
+                item.error = e
+            item.pdf_bytes = None  # free memory before it waits in the next queue
+        return True
+
+    def _persist(self, item: PipelineItem):
+        if item.error is not None:
+            self._fail(item, item.error)
+            return
+        try:
+            run_id = UUID(item.run_id)
+            if item.fresh:
+                self.checkpoint.save_raw(run_id, item.parser_result)
+                with get_session() as db:
+                    RunRepository(db).set_stage(run_id, ParseStage.parsed.value)
+            payload = self.parser_service.build_payload(item.parser_result, item.started)
+            row = ParseService().persist_parse_result(run_id, UUID(item.batch_id) if item.batch_id else None, payload)
+            from app.workers.tasks import _announce_if_completed
+            _announce_if_completed(row)
+            self.checkpoint.clear(run_id)
+            self._settle(item, "persisted")
+        except Exception as e:
+            self._fail(item, e)
+
+    def _settle(self, item: PipelineItem, outcome: str):
+        """Record that an item was handed off (persisted, failed, re-queued or parked)."""
+        self.stats[outcome] += 1
+        self.settled.add(item.run_id)
+
+    def _recover(self, items: List[PipelineItem]):
+        """Re-queue items no stage handed off as single-PDF tasks, or fail them if that is impossible too."""
+        from app.workers.tasks import _record_batch_result, dispatch_parse
+        for item in items:
+            if item.run_id in self.settled:
+                continue
+            try:
+                dispatch_parse(item.batch_id, item.run_id, item.filename, item.object_key, item.force_reparse, countdown=60)
+                self._settle(item, "requeued")
+            except Exception as e:
+                logger.error(f"[PIPELINE] Could not re-queue run {item.run_id}, failing it: {e}")
+                try:
+                    _record_batch_result(item.batch_id, success=False, failed_run_id=item.run_id, error=str(e))
+                    self._settle(item, "failed")
+                except Exception as e:
+                    logger.error(f"[PIPELINE] Run {item.run_id} left in processing: {e}")
+
+    def _park(self, item: PipelineItem):
+        from app.workers.tasks import _park
+        _park(self.breaker, [item.batch_id, item.run_id, item.filename, item.object_key, item.force_reparse])
+        self._settle(item, "parked")
+
+    def _follow(self, item: PipelineItem):
+        """Another worker is parsing this PDF: let a single-PDF task pick up its response later."""
+        from app.workers.tasks import dispatch_parse
+        dispatch_parse(
+            item.batch_id, item.run_id, item.filename, item.object_key, item.force_reparse,
+            countdown=settings.parse_single_flight_poll_s,
+        )
+        self._settle(item, "requeued")
+
+    def _fail(self, item: PipelineItem, error: Exception):
+        from app.workers.tasks import LIMITER_TIMEOUTS, _is_retryable, _record_batch_result, dispatch_parse
+        if isinstance(error, LIMITER_TIMEOUTS):
+            # PARSER was never called: queue it up again as a single task, without using a retry
+            dispatch_parse(
+                item.batch_id, item.run_id, item.filename, item.object_key, item.force_reparse,
+                countdown=settings.parser_limiter_requeue_s,
+            )
+            self._settle(item, "requeued")
+            return
+        error_msg = str(error)
+        is_retryable = _is_retryable(error)
+        if is_retryable and self.breaker and self.breaker.is_open():
+            self._park(item)
+            return
+        if is_retryable:
+            # Hand it to the single-PDF task, which owns the retry/backoff policy
+            dispatch_parse(item.batch_id, item.run_id, item.filename, item.object_key, item.force_reparse, countdown=60)
+            self._settle(item, "requeued")
+            return
+        logger.warning(f"[PIPELINE] Run {item.run_id} failed: {error_msg}")
+        _record_batch_result(item.batch_id, success=False, failed_run_id=item.run_id, error=error_msg)
+        self.checkpoint.clear(UUID(item.run_id))
+        self._settle(item, "failed")
@@ -1,16 +1,28 @@
+import logging
+import time
 from uuid import UUID
-from app.workers.celery_app import celery
+from app.workers.celery_app import celery, QUEUE_BULK, QUEUE_PRIORITY
 from app.schemas.parse import ParsingResultPayload, PaperMetadata, ExtractedElement, ElementType, TableContent, TableCell
 from app.services.parse_service import ParseService
-from app.services.pdf_parser_service import PDFParserService
+from app.services.pdf_parser_service import PDFParserService, ParseInFlight
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.adaptive_limiter import LimiterTimeout
+from app.services.rate_limiter import RateLimitTimeout
 from app.db.session import get_session
 from app.repositories.batch_repo import BatchRepository
 from app.repositories.run_repo import RunRepository
-from app.models.models import BatchStatus
+from app.models.models import BatchStatus, ParseStage
+from app.services.run_checkpoint import RunCheckpoint
 import os
+from celery.exceptions import Ignore
 from app.core.config import settings
 
 
+logger = logging.getLogger(__name__)
+
+# Waited too long for a PARSER rate token or concurrency slot: PARSER was never called
+LIMITER_TIMEOUTS = (RateLimitTimeout, LimiterTimeout)
+
 @celery.task(
     name="parse_pdf_task",
     bind=True,
@@ -20,7 +32,15 @@ from app.core.config import settings
     retry_backoff_max=600,  # Maximum retry delay (10 minutes)
     retry_jitter=True,  # Add random jitter to prevent thundering herd
 )
-def parse_pdf_task(self, batch_id: str, run_id: str, filename: str, object_key: str):
+def parse_pdf_task(
+    self,
+    batch_id: str,
+    run_id: str,
+    filename: str,
+    object_key: str,
+    force_reparse: bool = False,
+    following_since: float | None = None,
+):
     """
     Parse PDF file using real extraction and AI services.
     Falls back to mock data if services are not available.
@@ -30,21 +50,36 @@ def parse_pdf_task(self, batch_id: str, run_id: str, filename: str, object_key:
     - 2nd retry: after ~120 seconds (with jitter)
     - 3rd retry: after ~240 seconds (with jitter)
     - Maximum retry delay capped at 600 seconds
+
+    While the PARSER circuit is open the task is parked instead of retried and
+    re-dispatched by probe_circuit_task once the circuit closes.
+
+    A cached PARSER response for the same PDF is reused unless force_reparse.
+    If another worker is already calling PARSER for the same PDF, the task is
+    re-queued every parse_single_flight_poll_s (following_since carries when
+    it started following) until the leader's response is cached.
+
+    With parse_split_enabled, a long PDF is handed to a chord of page-range
+    tasks instead (see dispatch_split_parse); its merge task finishes the run.
     """
+    EAGER = (
+        bool(settings.celery_eager)
+        or str(os.getenv("CELERY_EAGER", "")).lower() in ("1", "true", "yes")
+        or "PYTEST_CURRENT_TEST" in os.environ
+    )
+    breaker = CircuitBreaker.for_parser() if settings.parser_breaker_enabled and not EAGER else None
+    task_args = [batch_id, run_id, filename, object_key, force_reparse]
+    queue, priority = _delivery(self.request)
+    started = time.time()
+    if breaker and breaker.is_open():
+        _park(breaker, task_args, queue, priority)
+        return
+
     try:
-        # Mark processing state
+        # Mark processing state (and learn how far an earlier attempt got)
         with get_session() as db:
-            repo = RunRepository(db)
-            run = repo.get(UUID(run_id))
-            if run:
-                run.task_state = BatchStatus.processing
-                db.add(run)
-
-        EAGER = (
-            bool(settings.celery_eager)
-            or str(os.getenv("CELERY_EAGER", "")).lower() in ("1", "true", "yes")
-            or "PYTEST_CURRENT_TEST" in os.environ
-        )
+            stage = RunRepository(db).mark_processing(UUID(run_id))
+
         if EAGER:
             # Test mode: synthesize deterministic mock so tests don't depend on PARSER/MinIO
             meta = PaperMetadata(
@@ -75,46 +110,357 @@ def parse_pdf_task(self, batch_id: str, run_id: str, filename: str, object_key:
         else:
             # Production: use real PDF parser service (no fallback)
             parser_service = PDFParserService()
-            payload = parser_service.parse_pdf_from_storage(
-                object_key=object_key,
-                filename=filename
-            )
+            checkpoint = RunCheckpoint(parser_service.storage_service)
+            parser_result = None
+            if stage == ParseStage.parsed and not force_reparse:
+                # An earlier attempt got the PARSER response but failed afterwards
+                parser_result = checkpoint.load_raw(UUID(run_id))
+            if parser_result is None:
+                pdf_bytes = None
+                if settings.parse_split_enabled and (
+                    force_reparse or parser_service.cached_parser_result(object_key) is None
+                ):
+                    from app.services.pdf_splitter import PDFSplitter
+                    pdf_bytes = parser_service.download_pdf(object_key, filename)
+                    try:
+                        ranges = PDFSplitter().ranges(pdf_bytes)
+                    except Exception as e:
+                        # An unreadable page tree (or no PyPDF2) is no reason to fail: PARSER may cope
+                        logger.warning(f"[SPLIT] Cannot split {filename}, parsing it whole: {e}")
+                        ranges = []
+                    if len(ranges) > 1:
+                        dispatch_split_parse(task_args, ranges, started, pdf_bytes, queue=queue)
+                        return
+                parser_result, fresh = parser_service.fetch_parser_result(
+                    object_key=object_key,
+                    filename=filename,
+                    force_reparse=force_reparse,
+                    pdf_bytes=pdf_bytes,
+                    following_since=following_since,
+                )
+                if fresh:
+                    # Only a new PARSER response is worth keeping; a cached one can be read again
+                    checkpoint.save_raw(UUID(run_id), parser_result)
+                    with get_session() as db:
+                        RunRepository(db).set_stage(UUID(run_id), ParseStage.parsed.value)
+            payload = parser_service.build_payload(parser_result, started)
 
-        # Apply parsing result
-        ParseService().apply_parsing_result(UUID(run_id), payload)
+        # Persist result, run state and batch counters in one transaction
+        row = ParseService().persist_parse_result(UUID(run_id), UUID(batch_id) if batch_id else None, payload)
+        _announce_if_completed(row)
+        if not EAGER:
+            checkpoint.clear(UUID(run_id))
+            _release_slot(run_id, time.time() - started)
 
-        # Mark completed state
-        with get_session() as db:
-            repo = RunRepository(db)
-            run = repo.get(UUID(run_id))
-            if run:
-                run.task_state = BatchStatus.completed
-                db.add(run)
+    except CircuitOpenError:
+        # The circuit opened while this task was in flight
+        _park(breaker, task_args, queue, priority)
+        return
 
-        # Update batch status
-        with get_session() as db:
-            BatchRepository(db).increment_success(UUID(batch_id))
-            BatchRepository(db).finalize_if_done(UUID(batch_id))
+    except ParseInFlight as e:
+        # Come back for the leader's response instead of waiting in a worker slot.
+        # Not a retry: it must not use up the retries kept for PARSER errors.
+        parse_pdf_task.apply_async(
+            args=task_args,
+            kwargs={"following_since": e.since},
+            queue=queue,
+            priority=priority,
+            countdown=settings.parse_single_flight_poll_s,
+        )
+        return
+
+    except LIMITER_TIMEOUTS as e:
+        # The limiters are saturated: queue up again rather than use a retry meant for PARSER errors
+        logger.info(f"[PERF] Re-queued {filename}: {e}")
+        parse_pdf_task.apply_async(
+            args=task_args,
+            kwargs={"following_since": following_since},
+            queue=queue,
+            priority=priority,
+            countdown=settings.parser_limiter_requeue_s,
+        )
+        return
 
     except Exception as e:
         # Check if this is a retryable error (e.g., 503 Service Unavailable)
-        error_msg = str(e)
-        is_retryable = any(code in error_msg for code in ["503", "502", "504", "timeout", "connection"])
+        is_retryable = _is_retryable(e)
+
+        # If this failure tripped the circuit, wait for recovery rather than burning retries
+        if is_retryable and breaker and breaker.is_open():
+            _park(breaker, task_args, queue, priority)
+            return
 
         # If this is a retryable error and we haven't exceeded max retries, retry the task
         if is_retryable and self.request.retries < self.max_retries:
             raise self.retry(exc=e, countdown=60 * (2 ** self.request.retries))
 
-        # Otherwise, fail permanently
-        # Mark run failed and increment failed count
-        with get_session() as db:
-            RunRepository(db).set_failed(UUID(run_id), str(e))
-            BatchRepository(db).increment_failed(UUID(batch_id))
-            # Commit the failure increment before finalizing to ensure correct counts
-            db.commit() 
-            # Re-open session or just start new transaction for finalization check is safest
-            # But here we can just continue using the repo helpers with commit
-            BatchRepository(db).finalize_if_done(UUID(batch_id))
-            db.commit()
+        # Otherwise, fail permanently: mark the run failed and count it, in one transaction
+        _record_batch_result(batch_id, success=False, failed_run_id=run_id, error=str(e))
+        if not EAGER:
+            RunCheckpoint().clear(UUID(run_id))
+            _release_slot(run_id, None)
 
         raise
+
+
+def dispatch_parse(
+    batch_id: str | None,
+    run_id: str,
+    filename: str,
+    object_key: str,
+    force_reparse: bool = False,
+    queue: str = QUEUE_BULK,
+    priority: int | None = None,
+    countdown: float | None = None,
+):
+    """Enqueue parse_pdf_task on a named queue; priority defaults to the queue's."""
+    return parse_pdf_task.apply_async(
+        args=[batch_id, run_id, filename, object_key, force_reparse],
+        queue=queue,
+        priority=QUEUE_PRIORITY[queue] if priority is None else priority,
+        countdown=countdown,
+    )
+
+
+@celery.task(name="parse_pdf_chunk_task")
+def parse_pdf_chunk_task(items: list):
+    """
+    Parse several PDFs in one worker process through the prefetching pipeline
+    (app/workers/pipeline.py). Items are parse_pdf_task argument lists.
+    """
+    from app.workers.pipeline import ParsePipeline, PipelineItem
+    return ParsePipeline().run([PipelineItem(*args) for args in items])
+
+
+def dispatch_parse_chunk(items: list, queue: str = QUEUE_BULK):
+    """Enqueue parse_pdf_chunk_task; its time limit scales with the chunk size."""
+    return parse_pdf_chunk_task.apply_async(
+        args=[items],
+        queue=queue,
+        priority=QUEUE_PRIORITY[queue],
+        soft_time_limit=540 * len(items),
+        time_limit=600 * len(items),
+    )
+
+
+@celery.task(name="parse_page_range_task", bind=True, max_retries=3)
+def parse_page_range_task(self, run_id: str, filename: str, start: int, end: int):
+    """
+    Parse pages [start, end) of a run's PDF, from the slice dispatch_split_parse stored, and checkpoint the response.
+
+    Never raises once retries are exhausted, so the chord's merge task always
+    runs; it gets {"start": start}, {"start": start, "error": message} or,
+    if the PARSER circuit is open, {"start": start, "parked": True} and then
+    parks the whole run.
+    """
+    from app.services.pdf_splitter import PDFSplitter
+
+    breaker = CircuitBreaker.for_parser() if settings.parser_breaker_enabled else None
+    if breaker and breaker.is_open():
+        return {"start": start, "parked": True}
+    try:
+        parser_service = PDFParserService()
+        checkpoint = RunCheckpoint(parser_service.storage_service)
+        pdf_bytes = checkpoint.load_slice(UUID(run_id), start)
+        stem = filename.rsplit(".", 1)[0] or "document"
+        parser_result = parser_service.external_parser_service.parse_pdf_omip(
+            pdf_bytes=pdf_bytes,
+            filename=f"{stem}_p{start + 1}-{end}.pdf",
+        )
+        PDFSplitter.shift_pages(parser_result, start)
+        checkpoint.save_part(UUID(run_id), start, parser_result)
+        return {"start": start}
+    except CircuitOpenError:
+        return {"start": start, "parked": True}
+    except LIMITER_TIMEOUTS:
+        # Send the same task again (same id, so it stays part of the chord) with
+        # the retry count unchanged: waiting for the limiters is not a failure
+        self.signature_from_request(
+            self.request, countdown=settings.parser_limiter_requeue_s, retries=self.request.retries
+        ).apply_async()
+        raise Ignore()
+    except Exception as e:
+        if _is_retryable(e) and self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=60 * (2 ** self.request.retries))
+        return {"start": start, "error": str(e)}
+
+
+@celery.task(name="merge_page_ranges_task", bind=True)
+def merge_page_ranges_task(self, parts: list, task_args: list, ranges: list, started: float):
+    """
+    Chord callback: merge the page-range responses of a run and persist it like parse_pdf_task would.
+    If the PARSER circuit opened under any range, the run is parked instead and parsed again when it closes.
+    """
+    from app.services.pdf_splitter import PDFSplitter
+
+    batch_id, run_id, filename, object_key, force_reparse = task_args
+    parser_service = PDFParserService()
+    checkpoint = RunCheckpoint(parser_service.storage_service)
+    starts = [start for start, _ in ranges]
+    try:
+        if any(part.get("parked") for part in parts):
+            queue, priority = _delivery(self.request)
+            _park(CircuitBreaker.for_parser(), task_args, queue, priority)
+            return
+        errors = [part["error"] for part in parts if part.get("error")]
+        if errors:
+            raise Exception(f"{len(errors)} of {len(ranges)} page ranges failed: {errors[0]}")
+        parser_result = PDFSplitter.merge([checkpoint.load_part(UUID(run_id), start) for start in starts], ranges)
+        checkpoint.save_raw(UUID(run_id), parser_result)
+        with get_session() as db:
+            RunRepository(db).set_stage(UUID(run_id), ParseStage.parsed.value)
+        parser_service.cache_parser_result(object_key, parser_result)
+        payload = parser_service.build_payload(parser_result, started)
+        row = ParseService().persist_parse_result(UUID(run_id), UUID(batch_id) if batch_id else None, payload)
+        _announce_if_completed(row)
+        checkpoint.clear(UUID(run_id))
+        logger.info(f"[PERF] Parsed {filename} as {len(ranges)} page ranges in {time.time() - started:.1f}s")
+        _release_slot(run_id, time.time() - started)
+    except Exception as e:
+        _record_batch_result(batch_id, success=False, failed_run_id=run_id, error=str(e))
+        checkpoint.clear(UUID(run_id))
+        _release_slot(run_id, None)
+        raise
+    finally:
+        checkpoint.clear_parts(UUID(run_id), starts)
+
+
+def dispatch_split_parse(task_args: list, ranges: list, started: float, pdf_bytes: bytes, queue: str = QUEUE_BULK):
+    """
+    Parse the page ranges of one run in parallel and merge them when all are done.
+    The ranges are cut once, here, and stored next to the run's checkpoint, so each
+    range task reads only its own pages.
+    """
+    from celery import chord
+    from app.services.pdf_splitter import PDFSplitter
+
+    batch_id, run_id, filename, object_key, force_reparse = task_args
+    checkpoint = RunCheckpoint()
+    for (start, _end), pdf_slice in zip(ranges, PDFSplitter.split(pdf_bytes, ranges)):
+        checkpoint.save_slice(UUID(run_id), start, pdf_slice)
+    priority = QUEUE_PRIORITY[queue]
+    header = [
+        parse_page_range_task.signature(args=[run_id, filename, start, end], queue=queue, priority=priority)
+        for start, end in ranges
+    ]
+    body = merge_page_ranges_task.signature(args=[task_args, ranges, started], queue=queue, priority=priority)
+    return chord(header)(body)
+
+
+def _is_retryable(exc: Exception) -> bool:
+    """Transient PARSER or network failure (5xx, timeout, dropped connection) worth another attempt."""
+    error_msg = str(exc)
+    return any(code in error_msg for code in ["503", "502", "504", "timeout", "connection"])
+
+
+def _record_batch_result(batch_id: str | None, success: bool, failed_run_id: str | None = None, error: str = ""):
+    """Count a finished run against its batch; the run that finishes the batch announces it."""
+    row = None
+    with get_session() as db:
+        if failed_run_id:
+            RunRepository(db).set_failed(UUID(failed_run_id), error)
+        if batch_id:
+            row = BatchRepository(db).record_result(UUID(batch_id), success=success)
+    _announce_if_completed(row)
+
+
+def _announce_if_completed(row):
+    # Only after commit, so listeners see the final counts
+    if BatchRepository.just_completed(row):
+        from app.services.batch_events import emit_batch_completed
+        emit_batch_completed(row)
+
+
+def _release_slot(run_id: str, duration_s: float | None):
+    """Let the fair scheduler release the next queued task of any batch."""
+    if settings.scheduler_enabled:
+        from app.services.fair_scheduler import FairScheduler
+        FairScheduler().release(run_id, duration_s)
+
+
+@celery.task(name="pump_scheduler_task")
+def pump_scheduler_task():
+    """
+    Periodic (celery beat): refill the fair scheduler's window. Pumping drops
+    expired leases first, so slots of tasks lost with a dead worker are
+    reclaimed even when no other task of their batch finishes.
+    """
+    if not settings.scheduler_enabled:
+        return 0
+    from app.services.fair_scheduler import FairScheduler
+    released = FairScheduler().pump()
+    if released:
+        logger.info(f"[SCHED] Periodic pump released {released} tasks")
+    return released
+
+
+@celery.task(name="verify_presigned_upload_task")
+def verify_presigned_upload_task(upload_key: str, sha256: str):
+    """Hash a presigned upload on a worker and store it under pdfs/{sha256} if it matches."""
+    from app.services.presigned_upload_service import PresignedUploadService
+    outcome = PresignedUploadService().verify(upload_key, sha256)
+    if outcome == PresignedUploadService.MISMATCH:
+        logger.warning(f"[UPLOAD] Rejected {upload_key}: content does not match its declared sha256")
+    return outcome
+
+
+@celery.task(name="prune_parse_cache_task")
+def prune_parse_cache_task():
+    """Periodic (celery beat): expire old parse cache entries and trim it to parse_cache_max_bytes."""
+    from app.services.parse_cache import ParseCache
+    stats = ParseCache().prune()
+    logger.info(f"[CACHE] Pruned parse cache: {stats}")
+    return stats
+
+
+def _delivery(request) -> tuple[str, int | None]:
+    """Queue and message priority a task was delivered with, so a re-dispatch keeps them."""
+    info = request.delivery_info or {}
+    queue = info.get("routing_key")
+    if queue not in QUEUE_PRIORITY:
+        queue = QUEUE_BULK
+    return queue, info.get("priority")
+
+
+def _park(breaker: CircuitBreaker, task_args: list, queue: str = QUEUE_BULK, priority: int | None = None):
+    """
+    Put a run back to pending and hold it until the PARSER circuit closes.
+    Parked entries are dispatch_parse arguments, queue and priority included.
+    The run's scheduler slot is freed: the probe re-dispatches it directly.
+    """
+    with get_session() as db:
+        run = RunRepository(db).get(UUID(task_args[1]))
+        if run:
+            run.task_state = BatchStatus.pending
+            db.add(run)
+    breaker.park(list(task_args) + [queue, priority])
+    _release_slot(task_args[1], None)
+
+
+@celery.task(name="probe_circuit_task")
+def probe_circuit_task(name: str = "parser"):
+    """
+    Half-open probe: check the upstream and either close the circuit and
+    release parked tasks, or reopen it and probe again after the interval.
+    """
+    from app.services.external_parser_service import ExternalParserService
+
+    breaker = CircuitBreaker.for_parser()
+    if breaker.is_open():
+        breaker.half_open()
+        if not ExternalParserService(breaker=breaker).check_health():
+            breaker.reopen()
+            breaker.schedule_probe()
+            return
+        breaker.close()
+
+    # Also reached when a task parked just as the circuit closed. Entries are
+    # dispatch_parse arguments, so each run goes back to its original queue.
+    released = 0
+    while True:
+        task_args = breaker.pop_parked()
+        if task_args is None:
+            break
+        dispatch_parse(*task_args)
+        released += 1
+    logger.info(f"[CIRCUIT] {name}: released {released} parked tasks")
@@ -45,6 +45,7 @@ CREATE TABLE IF NOT EXISTS parse_runs (
     task_state batch_status NOT NULL DEFAULT 'pending',
     raw_metadata JSONB NOT NULL DEFAULT '{}',
     error_msg TEXT,
+    stage VARCHAR(20),
     created_at TIMESTAMPTZ DEFAULT NOW(),
     updated_at TIMESTAMPTZ DEFAULT NOW(),
     annotated_at TIMESTAMPTZ,
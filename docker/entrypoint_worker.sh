@@ -1,7 +1,10 @@
 #!/bin/sh
 set -e
 python -m app.utils.wait_for --db --redis --minio --timeout 120
-# IMPORTANT: --concurrency=1 ensures only ONE task is processed at a time
-# This prevents 503 errors from the parsing API which can't handle concurrent requests
-exec celery -A app.workers.celery_app:celery worker --loglevel=INFO --concurrency=1
+# Concurrent PARSER requests are capped cluster-wide by the adaptive limiter
+# (app/services/adaptive_limiter.py), which backs off on 503/504/timeouts
+# Queues are listed highest priority first and consumed in that order
+# (set WORKER_QUEUES=interactive for a worker reserved for single-paper actions)
+exec celery -A app.workers.celery_app:celery worker --loglevel=INFO --concurrency=${WORKER_CONCURRENCY:-4} \
+  -Q ${WORKER_QUEUES:-interactive,bulk,backfill}
 
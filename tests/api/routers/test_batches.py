@@ -18,3 +18,25 @@ def test_batch_progress(client: TestClient):
     assert data["total_count"] == 3
     assert data["success_count"] >= 0
 
+
+
+def test_batch_from_zip_archive(client: TestClient):
+    import io
+    import zipfile
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr("omip/z1.pdf", b"%PDF-zip-1")
+        zf.writestr("omip/z1-copy.pdf", b"%PDF-zip-1")
+        zf.writestr("readme.txt", b"not a pdf")
+    files = {"file": ("corpus.zip", buf.getvalue(), "application/zip")}
+    r = client.post("/api/batches/archive", files=files, headers={"X-Role": "annotator"})
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["total_count"] == 1
+    statuses = {m["member"]: m["status"] for m in data["members"]}
+    assert statuses["omip/z1.pdf"] in ("stored", "duplicate")
+    assert statuses["omip/z1-copy.pdf"] == "skipped"
+    assert statuses["readme.txt"] == "skipped"
+    gr = client.get(f"/api/batches/{data['batch_id']}", headers={"X-Role": "annotator"})
+    assert gr.json()["total_count"] == 1
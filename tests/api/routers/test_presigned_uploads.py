@@ -0,0 +1,75 @@
+import hashlib
+import time
+import httpx
+from fastapi.testclient import TestClient
+
+
+def _complete_until_verified(client: TestClient, file: dict, attempts: int = 20):
+    """Staged uploads are hashed by a worker: re-send complete while they are pending."""
+    for _ in range(attempts):
+        done = client.post("/api/uploads/presign/complete", json={"files": [file]}, headers={"X-Role": "annotator"})
+        if done.status_code != 200 or not done.json()["pending"]:
+            return done
+        time.sleep(0.1)
+    return done
+
+
+def test_presigned_upload_then_complete(client: TestClient):
+    data = b"%PDF-presigned"
+    sha = hashlib.sha256(data).hexdigest()
+    r = client.post(
+        "/api/uploads/presign",
+        json={"files": [{"filename": "p1.pdf", "size": len(data), "sha256": sha}]},
+        headers={"X-Role": "annotator"},
+    )
+    assert r.status_code == 200, r.text
+    item = r.json()["files"][0]
+    if not item["exists"]:
+        put = httpx.put(item["url"], content=data)
+        assert put.status_code == 200, put.text
+
+    done = _complete_until_verified(client, {"upload_key": item["upload_key"], "filename": "p1.pdf", "size": len(data)})
+    assert done.status_code == 200, done.text
+    body = done.json()
+    assert body["errors"] == [] and body["pending"] == []
+    assert body["papers"][0]["file_hash"] == sha
+
+
+def test_presigned_complete_rejects_foreign_keys(client: TestClient):
+    r = client.post(
+        "/api/uploads/presign/complete",
+        json={"files": [{"upload_key": "elsewhere/x", "filename": "x.pdf", "size": 1}]},
+        headers={"X-Role": "annotator"},
+    )
+    assert r.status_code == 200
+    assert r.json()["papers"] == []
+    assert len(r.json()["errors"]) == 1
+
+
+def test_presigned_complete_rejects_bytes_not_matching_declared_sha(client: TestClient):
+    real = b"%PDF-real-content"
+    sha = hashlib.sha256(real).hexdigest()
+    forged = b"%PDF-forged-bytes"  # same length, different content
+    r = client.post(
+        "/api/uploads/presign",
+        json={"files": [{"filename": "forged.pdf", "size": len(forged), "sha256": sha}]},
+        headers={"X-Role": "annotator"},
+    )
+    assert r.status_code == 200, r.text
+    item = r.json()["files"][0]
+    assert not item["exists"]
+    put = httpx.put(item["url"], content=forged)
+    assert put.status_code == 200, put.text
+
+    done = _complete_until_verified(client, {"upload_key": item["upload_key"], "filename": "forged.pdf", "size": len(forged)})
+    assert done.status_code == 200, done.text
+    assert done.json()["papers"] == []
+    assert done.json()["errors"][0]["error"] == "sha256 mismatch"
+
+    # The content-addressed key for the real hash was not poisoned
+    again = client.post(
+        "/api/uploads/presign",
+        json={"files": [{"filename": "real.pdf", "size": len(real), "sha256": sha}]},
+        headers={"X-Role": "annotator"},
+    )
+    assert again.json()["files"][0]["exists"] is False
@@ -0,0 +1,32 @@
+import hashlib
+from fastapi.testclient import TestClient
+
+
+def test_chunked_upload_session_resume_and_complete(client: TestClient):
+    data = b"%PDF-session-bytes"
+    r = client.post(
+        "/api/uploads/sessions",
+        json={"files": [{"filename": "s1.pdf", "size": len(data), "sha256": hashlib.sha256(data).hexdigest()}]},
+        headers={"X-Role": "annotator"},
+    )
+    assert r.status_code == 200, r.text
+    session = r.json()
+    sid = session["session_id"]
+    assert session["files"][0]["missing_offsets"] == [0]
+
+    # completing before all chunks arrived is rejected
+    early = client.post(f"/api/uploads/sessions/{sid}/complete", headers={"X-Role": "annotator"})
+    assert early.status_code == 400
+
+    put = client.put(f"/api/uploads/sessions/{sid}/files/0?offset=0", content=data, headers={"X-Role": "annotator"})
+    assert put.status_code == 200, put.text
+    assert client.get(f"/api/uploads/sessions/{sid}", headers={"X-Role": "annotator"}).json()["files"][0]["missing_offsets"] == []
+
+    done = client.post(f"/api/uploads/sessions/{sid}/complete", headers={"X-Role": "annotator"})
+    assert done.status_code == 200, done.text
+    papers = done.json()["papers"]
+    assert papers[0]["file_hash"] == hashlib.sha256(data).hexdigest()
+
+    # completion is idempotent
+    again = client.post(f"/api/uploads/sessions/{sid}/complete", headers={"X-Role": "annotator"})
+    assert again.json()["papers"][0]["paper_id"] == papers[0]["paper_id"]
@@ -19,3 +19,20 @@ def test_upload_then_parse_by_ids(client: TestClient):
     data = r2.json()
     assert data["total_count"] == 2
 
+
+
+def test_upload_dedupes_same_bytes(client: TestClient):
+    # same content under two names (plus a repeat upload) resolves to one paper
+    files = [
+        ("files", ("dup-a.pdf", b"dup-bytes", "application/pdf")),
+        ("files", ("dup-b.pdf", b"dup-bytes", "application/pdf")),
+    ]
+    r = client.post("/api/uploads", files=files, headers={"X-Role": "annotator"})
+    assert r.status_code == 200
+    papers = r.json()["papers"]
+    assert len(papers) == 2
+    assert papers[0]["paper_id"] == papers[1]["paper_id"]
+
+    r2 = client.post("/api/uploads", files=files[:1], headers={"X-Role": "annotator"})
+    assert r2.status_code == 200
+    assert r2.json()["papers"][0]["paper_id"] == papers[0]["paper_id"]
@@ -33,6 +33,7 @@ def _ready():
         # ensure latest schema diffs (idempotent)
         try:
             s.execute(text("ALTER TABLE parse_runs ADD COLUMN IF NOT EXISTS task_state batch_status NOT NULL DEFAULT 'pending'"))
+            s.execute(text("ALTER TABLE parse_runs ADD COLUMN IF NOT EXISTS stage VARCHAR(20)"))
         except Exception:
             pass
         try:
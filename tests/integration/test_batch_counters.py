@@ -0,0 +1,50 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from app.db.session import get_session
+from app.models.models import BatchStatus
+from app.repositories.batch_repo import BatchRepository
+
+
+def _new_batch(total: int):
+    with get_session() as db:
+        return BatchRepository(db).create(total).id
+
+
+def _record(batch_id, success: bool):
+    with get_session() as db:
+        row = BatchRepository(db).record_result(batch_id, success=success)
+    return row, BatchRepository.just_completed(row)
+
+
+def test_record_result_counts_and_sets_terminal_status():
+    batch_id = _new_batch(2)
+    row, done = _record(batch_id, True)
+    assert (row.success_count, row.failed_count, row.status, done) == (1, 0, BatchStatus.processing, False)
+    row, done = _record(batch_id, True)
+    assert (row.success_count, row.status, done) == (2, BatchStatus.completed, True)
+
+
+def test_any_failure_makes_the_finished_batch_failed():
+    batch_id = _new_batch(2)
+    _record(batch_id, False)
+    row, done = _record(batch_id, True)
+    assert (row.success_count, row.failed_count, row.status, done) == (1, 1, BatchStatus.failed, True)
+
+
+def test_concurrent_results_announce_completion_exactly_once():
+    total = 20
+    batch_id = _new_batch(total)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda i: _record(batch_id, i % 5 != 0), range(total)))
+
+    assert sum(done for _, done in results) == 1
+    with get_session() as db:
+        batch = BatchRepository(db).get(batch_id)
+        assert (batch.success_count, batch.failed_count) == (16, 4)
+        assert batch.status == BatchStatus.failed
+
+
+def test_record_result_on_missing_batch_returns_none():
+    import uuid
+    row, done = _record(uuid.uuid4(), True)
+    assert row is None and done is False
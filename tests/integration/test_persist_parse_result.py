@@ -0,0 +1,108 @@
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from app.db.session import get_session
+from app.models.models import BatchStatus, ExtractedElement, ParsedMetadata, ParseStage
+from app.repositories.batch_repo import BatchRepository
+from app.repositories.element_repo import ElementRepository
+from app.repositories.paper_repo import PaperRepository
+from app.repositories.run_repo import RunRepository
+from app.schemas.parse import ElementType, PaperMetadata, ParsingResultPayload
+from app.services.parse_service import ParseService
+
+
+def _new_run(total: int = 1):
+    with get_session() as db:
+        batch = BatchRepository(db).create(total)
+        paper = PaperRepository(db).create("persist.pdf", uuid.uuid4().hex)
+        run = RunRepository(db).create(paper_id=paper.id, batch_id=batch.id)
+        return run.id, batch.id
+
+
+def _payload(n_elements: int = 3) -> ParsingResultPayload:
+    rows = [
+        {
+            "type": ElementType.table,
+            "label": f"Table {i + 1}",
+            "caption": f"caption {i + 1}",
+            "content": {"number": str(i + 1), "rows": [[{"text": "a"}]]},
+            "order_index": i,
+        }
+        for i in range(n_elements)
+    ]
+    return ParsingResultPayload(
+        raw_metadata=PaperMetadata(omip_id="OMIP-042", title="Persisted", authors=["A"], year=2024, parser_raw={"tables": []}),
+        element_rows=rows,
+        processing_time_ms=5,
+    )
+
+
+def _state(run_id, batch_id):
+    with get_session() as db:
+        run = RunRepository(db).get(run_id)
+        batch = BatchRepository(db).get(batch_id)
+        n_elements = len(db.execute(select(ExtractedElement).where(ExtractedElement.run_id == run_id)).scalars().all())
+        n_versions = len(db.execute(select(ParsedMetadata).where(ParsedMetadata.run_id == run_id)).scalars().all())
+        return {
+            "task_state": run.task_state,
+            "stage": run.stage,
+            "omip_id": run.raw_metadata.get("omip_id"),
+            "elements": n_elements,
+            "versions": n_versions,
+            "success_count": batch.success_count,
+            "batch_status": batch.status,
+        }
+
+
+def test_persist_writes_run_metadata_elements_and_counters():
+    run_id, batch_id = _new_run()
+    row = ParseService().persist_parse_result(run_id, batch_id, _payload(3))
+
+    assert BatchRepository.just_completed(row)
+    assert _state(run_id, batch_id) == {
+        "task_state": BatchStatus.completed,
+        "stage": ParseStage.persisted.value,
+        "omip_id": "OMIP-042",
+        "elements": 3,
+        "versions": 1,
+        "success_count": 1,
+        "batch_status": BatchStatus.completed,
+    }
+
+
+@pytest.mark.parametrize("target", ["app.repositories.element_repo.ElementRepository.bulk_create",
+                                    "app.repositories.batch_repo.BatchRepository.record_result"])
+def test_persist_rolls_back_everything_on_failure(monkeypatch, target):
+    run_id, batch_id = _new_run()
+    before = _state(run_id, batch_id)
+
+    def boom(*args, **kwargs):
+        raise RuntimeError("write failed")
+
+    monkeypatch.setattr(target, boom)
+    with pytest.raises(RuntimeError):
+        ParseService().persist_parse_result(run_id, batch_id, _payload(3))
+
+    assert _state(run_id, batch_id) == before
+
+
+def test_persist_without_batch_returns_none():
+    run_id, batch_id = _new_run()
+    assert ParseService().persist_parse_result(run_id, None, _payload(1)) is None
+    assert _state(run_id, batch_id)["elements"] == 1
+
+
+def test_bulk_create_inserts_all_rows_in_order():
+    run_id, _ = _new_run()
+    with get_session() as db:
+        assert ElementRepository(db).bulk_create(run_id, _payload(5).element_rows) == 5
+        assert ElementRepository(db).bulk_create(run_id, []) == 0
+    with get_session() as db:
+        elements = db.execute(
+            select(ExtractedElement).where(ExtractedElement.run_id == run_id).order_by(ExtractedElement.order_index)
+        ).scalars().all()
+        assert [e.label for e in elements] == [f"Table {i + 1}" for i in range(5)]
+        assert all(e.type.value == "table" for e in elements)
+        assert elements[0].content["rows"] == [[{"text": "a"}]]
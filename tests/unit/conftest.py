@@ -0,0 +1,201 @@
+"""
+Unit tests for the Redis coordination services and the MinIO-backed caches.
+They run against fakeredis (with Lua scripting) and an in-memory storage
+stand-in, and need neither Postgres, MinIO nor a Redis server.
+"""
+import hashlib
+import importlib
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import fakeredis
+import pytest
+from minio.error import S3Error
+
+from app.core.config import settings
+from app.services.pdf_parser_service import PDFParserService
+from app.services.run_checkpoint import RunCheckpoint
+from app.services.storage_service import StorageService
+from app.workers import tasks
+
+
+# Modules that bind get_redis at import time
+REDIS_MODULES = [
+    "app.services.adaptive_limiter",
+    "app.services.rate_limiter",
+    "app.services.circuit_breaker",
+    "app.services.fair_scheduler",
+    "app.services.single_flight",
+    "app.services.parser_metrics",
+    "app.services.parser_pool",
+    "app.services.batch_events",
+    "app.services.presigned_upload_service",
+]
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _ready():
+    """Override the root conftest's database wait: nothing here touches Postgres."""
+    yield
+
+
+def _patch_redis(monkeypatch, client):
+    for name in REDIS_MODULES:
+        module = importlib.import_module(name)
+        if hasattr(module, "get_redis"):
+            monkeypatch.setattr(module, "get_redis", lambda: client)
+    return client
+
+
+@pytest.fixture()
+def redis(monkeypatch):
+    """Fresh in-memory Redis shared by every service module for one test."""
+    return _patch_redis(monkeypatch, fakeredis.FakeRedis(decode_responses=True))
+
+
+@pytest.fixture()
+def redis_down(monkeypatch):
+    """A Redis client whose every command fails with ConnectionError."""
+    server = fakeredis.FakeServer()
+    server.connected = False
+    return _patch_redis(monkeypatch, fakeredis.FakeRedis(server=server, decode_responses=True))
+
+
+class FakeStorage:
+    """In-memory StorageService: the calls ParseCache, RunCheckpoint and presigned uploads make, with settable mtimes."""
+
+    bucket = "test"
+    hash_from_pdf_key = StorageService.hash_from_pdf_key
+
+    def __init__(self):
+        self.objects = {}
+        self.client = SimpleNamespace(stat_object=self._stat, list_objects=self._list)
+
+    def put_object(self, key, data, content_type="application/octet-stream"):
+        self.objects[key] = (bytes(data), datetime.now(timezone.utc))
+        return key
+
+    def get_object(self, key):
+        if key not in self.objects:
+            raise Exception(f"Failed to get object from MinIO: NoSuchKey {key}")
+        return self.objects[key][0]
+
+    def remove_object(self, key):
+        self.objects.pop(key, None)
+
+    def object_size(self, key):
+        return len(self.objects[key][0]) if key in self.objects else None
+
+    def object_exists(self, key):
+        return key in self.objects
+
+    def object_key_for_pdf(self, sha256):
+        return StorageService.object_key_for_pdf(self, sha256)
+
+    def compute_sha256_object(self, key):
+        data = self.get_object(key)
+        return hashlib.sha256(data).hexdigest(), len(data)
+
+    def promote_to_pdf_key(self, staging_key, sha256):
+        key = self.object_key_for_pdf(sha256)
+        duplicate = key in self.objects
+        if not duplicate:
+            self.objects[key] = self.objects[staging_key]
+        self.remove_object(staging_key)
+        return key, duplicate
+
+    def touch(self, key, last_modified):
+        self.objects[key] = (self.objects[key][0], last_modified)
+
+    def _stat(self, bucket, key):
+        if key not in self.objects:
+            raise S3Error("NoSuchKey", "missing", key, "", "", None)
+        return SimpleNamespace(last_modified=self.objects[key][1], size=len(self.objects[key][0]))
+
+    def _list(self, bucket, prefix="", recursive=False):
+        return [
+            SimpleNamespace(object_name=key, size=len(data), last_modified=modified)
+            for key, (data, modified) in sorted(self.objects.items())
+            if key.startswith(prefix)
+        ]
+
+
+@pytest.fixture()
+def storage():
+    return FakeStorage()
+
+
+class FakeParserService(PDFParserService):
+    """PDFParserService with a scripted fetch_parser_result; build_payload is the real one."""
+
+    def __init__(self, storage, outcome, pdf_bytes=b"%PDF"):
+        self.storage_service = storage
+        self.outcome = outcome
+        self.pdf_bytes = pdf_bytes
+        self.fetches = 0
+        self.cache = None
+
+    def cached_parser_result(self, object_key):
+        return None
+
+    def download_pdf(self, object_key, filename=""):
+        return self.pdf_bytes
+
+    def fetch_parser_result(self, **kwargs):
+        self.fetches += 1
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+class FakeRuns:
+    def __init__(self, stage):
+        self.stage = stage
+        self.stages = []
+
+    def __call__(self, db):
+        return self
+
+    def mark_processing(self, run_id):
+        return self.stage
+
+    def set_stage(self, run_id, stage):
+        self.stages.append(stage)
+
+
+@pytest.fixture()
+def task_env(redis, storage, monkeypatch):
+    """Run parse_pdf_task in production mode against in-memory stand-ins; call it from the test body."""
+    @contextmanager
+    def null_session():
+        yield None
+
+    env = {"persisted": [], "failed": [], "released": [], "storage": storage}
+
+    class FakeParseService:
+        def persist_parse_result(self, run_id, batch_id, payload):
+            env["persisted"].append(payload)
+
+    def setup(outcome, stage=None, pdf_bytes=b"%PDF"):
+        """outcome: what fetch_parser_result returns, (response, fresh), or an exception it raises."""
+        # Any of these makes the task synthesize a mock result (eager test mode);
+        # pytest sets PYTEST_CURRENT_TEST per phase, so this must run in the test body
+        monkeypatch.setattr(settings, "celery_eager", False)
+        monkeypatch.delenv("CELERY_EAGER", raising=False)
+        monkeypatch.delenv("PYTEST_CURRENT_TEST", raising=False)
+        env["runs"] = FakeRuns(stage)
+        env["parser"] = FakeParserService(storage, outcome, pdf_bytes)
+        monkeypatch.setattr(tasks, "RunRepository", env["runs"])
+        monkeypatch.setattr(tasks, "PDFParserService", lambda: env["parser"])
+        return env
+
+    monkeypatch.setattr(tasks, "get_session", null_session)
+    monkeypatch.setattr(tasks, "ParseService", FakeParseService)
+    monkeypatch.setattr(tasks, "RunCheckpoint", lambda storage_service=None: RunCheckpoint(storage))
+    monkeypatch.setattr(tasks, "_release_slot", lambda run_id, duration: env["released"].append(duration))
+    monkeypatch.setattr(
+        tasks, "_record_batch_result",
+        lambda batch_id, success, failed_run_id=None, error="": env["failed"].append(error),
+    )
+    return setup
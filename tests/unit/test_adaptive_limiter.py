@@ -0,0 +1,111 @@
+import time
+
+import pytest
+
+from app.services.adaptive_limiter import AdaptiveConcurrencyLimiter, LimiterTimeout, Slot
+
+
+def make_limiter(**overrides):
+    kwargs = dict(
+        name="test",
+        min_limit=1,
+        max_limit=4,
+        initial_limit=2,
+        latency_target_s=10.0,
+        decrease_cooldown_s=0,
+        lease_ttl_s=60,
+        wait_timeout_s=0.3,
+    )
+    kwargs.update(overrides)
+    return AdaptiveConcurrencyLimiter(**kwargs)
+
+
+def limit_of(limiter):
+    return limiter.snapshot()["limit"]
+
+
+def test_leases_are_capped_at_the_limit(redis):
+    limiter = make_limiter()
+    a, b = limiter.try_acquire(), limiter.try_acquire()
+    assert a and b
+    assert limiter.try_acquire() is None
+    limiter.release(a, Slot.ERROR, 1.0)
+    assert limiter.try_acquire() is not None
+
+
+def test_additive_increase_after_a_window_of_fast_successes(redis):
+    limiter = make_limiter()
+    for _ in range(2):  # +1/limit per success: 2 -> 2.5 -> 2.9
+        limiter.release(limiter.try_acquire(), Slot.SUCCESS, 1.0)
+    assert limit_of(limiter) == pytest.approx(2.9)
+
+
+def test_slow_successes_and_errors_do_not_raise_the_limit(redis):
+    limiter = make_limiter()
+    limiter.release(limiter.try_acquire(), Slot.SUCCESS, 30.0)  # above latency target
+    limiter.release(limiter.try_acquire(), Slot.ERROR, 1.0)
+    assert limit_of(limiter) == 2
+
+
+def test_increase_stops_at_max_limit(redis):
+    limiter = make_limiter(max_limit=3)
+    for _ in range(50):
+        limiter.release(limiter.try_acquire(), Slot.SUCCESS, 1.0)
+    assert limit_of(limiter) == 3
+
+
+def test_multiplicative_decrease_on_overload_down_to_min(redis):
+    limiter = make_limiter(initial_limit=4)
+    limiter.release(limiter.try_acquire(), Slot.OVERLOAD, 1.0)
+    assert limit_of(limiter) == 2
+    for _ in range(5):
+        limiter.release(limiter.try_acquire(), Slot.OVERLOAD, 1.0)
+    assert limit_of(limiter) == 1
+
+
+def test_overload_burst_only_decreases_once_per_cooldown(redis):
+    limiter = make_limiter(initial_limit=4, decrease_cooldown_s=60)
+    tokens = [limiter.try_acquire() for _ in range(4)]
+    for token in tokens:
+        limiter.release(token, Slot.OVERLOAD, 1.0)
+    assert limit_of(limiter) == 2
+
+
+def test_expired_leases_free_their_slot(redis):
+    limiter = make_limiter(initial_limit=1, lease_ttl_s=0.1)
+    assert limiter.try_acquire() is not None
+    assert limiter.try_acquire() is None
+    time.sleep(0.15)  # holder "crashed" without releasing
+    assert limiter.try_acquire() is not None
+
+
+def test_acquire_times_out_when_no_slot_frees(redis):
+    limiter = make_limiter(initial_limit=1)
+    limiter.try_acquire()
+    with pytest.raises(LimiterTimeout):
+        limiter.acquire()
+
+
+def test_slot_context_releases_with_recorded_outcome(redis):
+    limiter = make_limiter(initial_limit=4)
+    with limiter.slot() as slot:
+        assert limiter.snapshot()["in_flight"] == 1
+        slot.record(Slot.OVERLOAD)
+    assert limiter.snapshot()["in_flight"] == 0
+    assert limit_of(limiter) == 2
+
+
+def test_fixed_limiter_never_moves(redis):
+    limiter = AdaptiveConcurrencyLimiter.fixed("fixed", 2)
+    for _ in range(10):
+        limiter.release(limiter.try_acquire(), Slot.SUCCESS, 0.0)
+    limiter.release(limiter.try_acquire(), Slot.OVERLOAD, 0.0)
+    assert limit_of(limiter) == 2
+
+
+def test_fails_open_when_redis_is_down(redis_down):
+    limiter = make_limiter()
+    assert limiter.acquire() is None
+    with limiter.slot() as slot:  # neither acquire nor release raises
+        slot.record(Slot.SUCCESS)
+    limiter.release("token", Slot.OVERLOAD, 1.0)
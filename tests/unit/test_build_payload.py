@@ -0,0 +1,125 @@
+import json
+
+import pytest
+
+from app.schemas.parse import (
+    PARSER_RESPONSE,
+    ElementType,
+    ExtractedElement,
+    FigureContent,
+    FigureImage,
+    PaperMetadata,
+    TableCell,
+    TableContent,
+)
+from app.services.pdf_parser_service import PDFParserService
+
+
+RAW = {
+    "omip_id": "OMIP-077",
+    "title": "Equivalence",
+    "authors": ["A", "B"],
+    "year": "2023",
+    "tables": [
+        {
+            "number": "1",
+            "caption": "Panel",
+            "confidence": 1,
+            "rows": [[{"text": "CD3", "colspan": "2"}, {"text": None, "rowspan": 3}], [], [{}]],
+            "page": 4,
+        },
+        {"caption": "No number", "rows": []},
+    ],
+    "figures": [
+        {"number": "1", "caption": "Gating", "image": {"page": 2, "bbox": [0, 1.5, 2, 3], "path": "f1.png"}, "confidence": 0.5},
+        {"number": "2", "image": {}},
+        {"caption": "No image"},
+    ],
+    "unknown_key": {"kept": True},
+}
+
+
+def model_path_rows(parser_result):
+    """Element rows as produced before element_rows: one pydantic model per cell, then model_dump()."""
+    elements = []
+    for table in parser_result.get("tables", []):
+        elements.append(ExtractedElement(
+            type=ElementType.table,
+            label=f"Table {table.get('number', len(elements) + 1)}",
+            caption=table.get("caption"),
+            order_index=len(elements),
+            content=TableContent(
+                number=table.get("number"),
+                caption=table.get("caption"),
+                rows=[
+                    [TableCell(text=c.get("text"), colspan=c.get("colspan"), rowspan=c.get("rowspan")) for c in row]
+                    for row in table.get("rows", [])
+                ],
+                confidence=table.get("confidence"),
+                is_manually_edited=False,
+            ),
+        ))
+    for figure in parser_result.get("figures", []):
+        image = figure.get("image", {})
+        elements.append(ExtractedElement(
+            type=ElementType.figure,
+            label=f"Figure {figure.get('number', len(elements) + 1)}",
+            caption=figure.get("caption"),
+            order_index=len(elements),
+            content=FigureContent(
+                number=figure.get("number"),
+                caption=figure.get("caption"),
+                image=FigureImage(page=image.get("page"), bbox=image.get("bbox"), path=image.get("path")) if image else None,
+                confidence=figure.get("confidence"),
+            ),
+        ))
+    # Same conversion ParseService._write_result applies to payloads that carry models
+    return [
+        {
+            "type": ElementType(el.type.value),
+            "label": el.label,
+            "caption": el.caption,
+            "content": el.content.model_dump(),
+            "order_index": el.order_index,
+        }
+        for el in elements
+    ]
+
+
+@pytest.fixture()
+def validated():
+    return PARSER_RESPONSE.validate_json(json.dumps(RAW))
+
+
+def test_rows_match_the_model_path(validated):
+    payload = PDFParserService.build_payload(None, validated, 0.0)
+    assert payload.element_rows == model_path_rows(validated)
+    assert payload.elements == []
+
+
+def test_rows_are_json_equal_to_the_model_path(validated):
+    # == treats 1 and 1.0 alike; the stored JSONB does not
+    rows = PDFParserService.build_payload(None, validated, 0.0).element_rows
+    assert json.dumps(rows, default=str, sort_keys=True) == json.dumps(model_path_rows(validated), default=str, sort_keys=True)
+
+
+def test_validation_coerces_like_the_models(validated):
+    cell = validated["tables"][0]["rows"][0][0]
+    assert cell["colspan"] == 2
+    assert validated["year"] == 2023
+    assert validated["unknown_key"] == {"kept": True}
+
+
+def test_metadata_matches_a_validated_model(validated):
+    metadata = PDFParserService.build_payload(None, validated, 0.0).raw_metadata
+    expected = PaperMetadata(
+        omip_id="OMIP-077", title="Equivalence", authors=["A", "B"], year=2023,
+        journal="Cytometry Part A", confidence_score=0.9, parser_raw=validated,
+    )
+    assert metadata.model_dump() == expected.model_dump()
+    assert metadata.parser_raw == validated
+
+
+def test_invalid_response_is_rejected_before_conversion():
+    with pytest.raises(Exception):
+        PARSER_RESPONSE.validate_json(json.dumps({"tables": [{"rows": [[{"colspan": "wide"}]]}]}))
@@ -0,0 +1,139 @@
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.external_parser_service import ExternalParserService
+from app.workers import tasks
+from app.workers.celery_app import QUEUE_BULK, QUEUE_INTERACTIVE
+
+
+@pytest.fixture()
+def probes(monkeypatch):
+    """Record probe_circuit_task schedules instead of sending them to a broker."""
+    scheduled = []
+    monkeypatch.setattr(tasks.probe_circuit_task, "apply_async", lambda args, countdown: scheduled.append((args, countdown)))
+    return scheduled
+
+
+@pytest.fixture()
+def dispatched(monkeypatch):
+    calls = []
+    monkeypatch.setattr(tasks, "dispatch_parse", lambda *args, **kwargs: calls.append(args))
+    return calls
+
+
+def make_breaker():
+    return CircuitBreaker("parser", failure_threshold=3, probe_interval_s=30)
+
+
+def test_opens_after_threshold_consecutive_failures_and_schedules_one_probe(redis, probes):
+    breaker = make_breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state() == "closed"
+    breaker.check()
+    breaker.record_failure()
+    breaker.record_failure()  # already open: no second probe
+    assert breaker.state() == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    assert probes == [(["parser"], 30)]
+
+
+def test_success_resets_the_consecutive_count(redis, probes):
+    breaker = make_breaker()
+    for _ in range(5):
+        breaker.record_failure()
+        breaker.record_success()
+    assert breaker.state() == "closed"
+
+
+def test_half_open_still_fails_fast(redis, probes):
+    breaker = make_breaker()
+    breaker.half_open()
+    assert breaker.is_open()
+    breaker.close()
+    assert breaker.state() == "closed"
+    assert breaker.snapshot()["failures"] == 0
+
+
+def test_parked_tasks_are_kept_in_order(redis, probes):
+    breaker = make_breaker()
+    breaker.park(["b", "r1", "f1", "k1", False, QUEUE_INTERACTIVE, 0])
+    breaker.park(["b", "r2", "f2", "k2", False, QUEUE_BULK, 5])
+    assert breaker.snapshot()["parked"] == 2
+    assert breaker.pop_parked()[1] == "r1"
+    assert breaker.pop_parked()[1] == "r2"
+    assert breaker.pop_parked() is None
+
+
+def test_redis_down_fails_closed_circuit(redis_down):
+    breaker = make_breaker()
+    assert breaker.state() == "closed"
+    breaker.check()
+    breaker.record_failure()
+    breaker.record_success()
+
+
+def test_probe_reopens_and_reschedules_while_upstream_is_down(redis, probes, dispatched, monkeypatch):
+    monkeypatch.setattr(ExternalParserService, "check_health", lambda self: False)
+    breaker = CircuitBreaker.for_parser()
+    breaker.reopen()
+    breaker.park(["b", "r1", "f1", "k1", False, QUEUE_BULK, 5])
+    probes.clear()
+
+    tasks.probe_circuit_task("parser")
+
+    assert breaker.state() == "open"
+    assert len(probes) == 1
+    assert dispatched == []
+
+
+def test_probe_closes_and_releases_parked_tasks_to_their_queue(redis, probes, dispatched, monkeypatch):
+    monkeypatch.setattr(ExternalParserService, "check_health", lambda self: True)
+    breaker = CircuitBreaker.for_parser()
+    breaker.reopen()
+    breaker.park(["b", "r1", "f1", "k1", False, QUEUE_INTERACTIVE, 0])
+    breaker.park(["b", "r2", "f2", "k2", True, QUEUE_BULK, None])
+
+    tasks.probe_circuit_task("parser")
+
+    assert breaker.state() == "closed"
+    assert dispatched == [
+        ("b", "r1", "f1", "k1", False, QUEUE_INTERACTIVE, 0),
+        ("b", "r2", "f2", "k2", True, QUEUE_BULK, None),
+    ]
+
+
+def test_park_keeps_queue_and_priority_of_the_delivery(redis, probes, monkeypatch):
+    runs = {}
+
+    @contextmanager
+    def fake_session():
+        yield SimpleNamespace(add=lambda run: None)
+
+    class FakeRunRepository:
+        def __init__(self, db):
+            pass
+
+        def get(self, run_id):
+            return runs.setdefault(str(run_id), SimpleNamespace(task_state=None))
+
+    monkeypatch.setattr(tasks, "get_session", fake_session)
+    monkeypatch.setattr(tasks, "RunRepository", FakeRunRepository)
+
+    request = SimpleNamespace(delivery_info={"routing_key": QUEUE_INTERACTIVE, "priority": 0})
+    queue, priority = tasks._delivery(request)
+    run_id = "00000000-0000-0000-0000-000000000001"
+    breaker = CircuitBreaker.for_parser()
+    tasks._park(breaker, ["b", run_id, "f", "k", False], queue, priority)
+
+    assert breaker.pop_parked() == ["b", run_id, "f", "k", False, QUEUE_INTERACTIVE, 0]
+    assert runs[run_id].task_state.value == "pending"
+
+
+def test_delivery_defaults_to_bulk_for_unknown_or_missing_queue():
+    assert tasks._delivery(SimpleNamespace(delivery_info=None)) == (QUEUE_BULK, None)
+    assert tasks._delivery(SimpleNamespace(delivery_info={"routing_key": "celery"})) == (QUEUE_BULK, None)
@@ -0,0 +1,120 @@
+import time
+import uuid
+from contextlib import contextmanager
+
+import pytest
+
+from app.core.config import settings
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.fair_scheduler import FairScheduler
+from app.workers import tasks
+from app.workers.celery_app import QUEUE_BULK, celery
+
+
+@pytest.fixture()
+def dispatched(monkeypatch):
+    calls = []
+    monkeypatch.setattr(tasks, "dispatch_parse", lambda *args, **kwargs: calls.append((args[0], args[1])))
+    return calls
+
+
+def batch(batch_id, n):
+    return [[batch_id, f"{batch_id}-{i}", f"{i}.pdf", f"k{i}", False, QUEUE_BULK] for i in range(n)]
+
+
+def test_window_caps_tasks_in_flight(redis, dispatched):
+    scheduler = FairScheduler(window=3, lease_ttl_s=60)
+    scheduler.submit("big", batch("big", 10))
+    assert len(dispatched) == 3
+    assert redis.zcard(scheduler.inflight_key) == 3
+
+
+def test_small_batch_is_interleaved_with_a_big_one(redis, dispatched):
+    scheduler = FairScheduler(window=2, lease_ttl_s=60)
+    scheduler.submit("big", batch("big", 100))
+    scheduler.submit("small", batch("small", 3))
+    assert len(dispatched) == 2  # window already full of big tasks
+    for i in range(6):
+        scheduler.release(dispatched[i][1], 1.0)
+    released = [batch_id for batch_id, _ in dispatched[2:]]
+    # Round robin: small gets every other slot instead of waiting for 100 big tasks
+    assert released[:6] in (["small", "big"] * 3, ["big", "small"] * 3)
+
+
+def test_finished_batches_leave_the_ring(redis, dispatched):
+    scheduler = FairScheduler(window=5, lease_ttl_s=60)
+    scheduler.submit("a", batch("a", 2))
+    for _, run_id in list(dispatched):
+        scheduler.release(run_id, 1.0)
+    assert scheduler.pump() == 0
+    assert redis.scard(scheduler.active_key) == 0
+
+
+def test_a_stale_peek_takes_nothing_and_leaves_the_ring(redis, dispatched):
+    scheduler = FairScheduler(window=1, lease_ttl_s=60)
+    scheduler.submit("a", batch("a", 3))
+    scheduler.submit("b", batch("b", 3))
+    ring = redis.lrange(scheduler.ring_key, 0, -1)
+    tail = ring[-1]
+    other = "a" if tail == "b" else "b"
+    # Another pump moved the tail since this one peeked at "other"
+    got = scheduler._next(
+        keys=[scheduler.inflight_key, scheduler.ring_key, scheduler.active_key, scheduler.batch_prefix + other],
+        args=[10, 60, other],
+    )
+    assert got == 0
+    assert redis.lrange(scheduler.ring_key, 0, -1) == ring
+
+
+def test_pump_reclaims_expired_leases_of_lost_tasks(redis, dispatched):
+    scheduler = FairScheduler(window=2, lease_ttl_s=0.1)
+    scheduler.submit("a", batch("a", 4))
+    assert len(dispatched) == 2
+    time.sleep(0.15)  # both workers died: nobody calls release
+    assert scheduler.pump() == 2
+    assert [run_id for _, run_id in dispatched] == ["a-0", "a-1", "a-2", "a-3"]
+
+
+def test_periodic_pump_task_is_scheduled_and_reaps(redis, dispatched):
+    assert celery.conf.beat_schedule["pump-scheduler"]["task"] == "pump_scheduler_task"
+    scheduler = FairScheduler(window=1, lease_ttl_s=0.1)
+    scheduler.submit("a", batch("a", 2))
+    time.sleep(0.15)
+    assert tasks.pump_scheduler_task() == 1
+
+
+def test_parking_a_run_frees_its_slot(redis, dispatched, monkeypatch):
+    @contextmanager
+    def no_db():
+        yield None
+
+    class NoRuns:
+        def __init__(self, db):
+            pass
+
+        def get(self, run_id):
+            return None
+
+    monkeypatch.setattr(tasks.probe_circuit_task, "apply_async", lambda *a, **k: None)
+    monkeypatch.setattr(tasks, "get_session", no_db)
+    monkeypatch.setattr(tasks, "RunRepository", NoRuns)
+    monkeypatch.setattr(settings, "scheduler_window", 1)
+    run_ids = [str(uuid.uuid4()) for _ in range(2)]
+    FairScheduler().submit("a", [["a", r, "x.pdf", "k", False, QUEUE_BULK] for r in run_ids])
+    assert [r for _, r in dispatched] == run_ids[:1]
+
+    # The circuit is open: the running task parks instead of finishing
+    tasks._park(CircuitBreaker.for_parser(), ["a", run_ids[0], "x.pdf", "k", False])
+
+    assert [r for _, r in dispatched] == run_ids
+
+
+def test_estimate_uses_average_task_time_and_share(redis, dispatched):
+    scheduler = FairScheduler(window=4, lease_ttl_s=60)
+    assert scheduler.estimate("a", 10) is None
+    scheduler.submit("a", batch("a", 20))
+    scheduler.submit("b", batch("b", 20))
+    scheduler.release("a-0", 10.0)
+    estimate = scheduler.estimate("a", 10)
+    assert estimate["share"] == 2.0
+    assert estimate["eta_seconds"] == 50.0
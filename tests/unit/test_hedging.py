@@ -0,0 +1,150 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from app.core.config import settings
+from app.services.adaptive_limiter import AdaptiveConcurrencyLimiter
+from app.services.external_parser_service import ExternalParserService
+from app.services.parser_metrics import Counter
+
+
+class FakeResponse:
+    def __init__(self, status_code, source):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.source = source
+
+
+@pytest.fixture()
+def service(redis, monkeypatch):
+    """One-endpoint client whose requests are scripted: (delay_s, status) per target."""
+    monkeypatch.setattr(settings, "parser_rate_limit_rps", 0)
+    svc = ExternalParserService(base_url="http://primary", limiter=AdaptiveConcurrencyLimiter.fixed("hedge-test", 2))
+    svc.hedge_base_url = "http://hedge"
+    svc.plan = {}
+    svc.finished = {"primary": threading.Event(), "hedge": threading.Event()}
+
+    def fake_post(make_body, params, base_url=None):
+        target = "hedge" if base_url == "http://hedge" else "primary"
+        delay, status = svc.plan[target]
+        time.sleep(delay)
+        svc.finished[target].set()
+        if isinstance(status, Exception):
+            raise status
+        return FakeResponse(status, target)
+
+    svc._post = fake_post
+    return svc
+
+
+def _in_flight(svc):
+    return svc.limiter.snapshot()["in_flight"]
+
+
+def _wait_released(svc, timeout=2.0):
+    deadline = time.time() + timeout
+    while _in_flight(svc) and time.time() < deadline:
+        time.sleep(0.01)
+    return _in_flight(svc)
+
+
+def test_threshold_needs_samples_and_must_beat_the_timeout(service, monkeypatch):
+    monkeypatch.setattr(settings, "parser_hedge_min_samples", 10)
+    for _ in range(9):
+        service.latency.observe(4.0)
+    assert service._hedge_threshold() is None
+    service.latency.observe(4.0)
+    assert service._hedge_threshold() == 5
+    service.timeout = 5
+    assert service._hedge_threshold() is None
+
+
+def test_threshold_fails_open_without_redis(service, redis_down):
+    service.latency.redis = redis_down
+    assert service._hedge_threshold() is None
+
+
+def test_fast_primary_is_not_hedged(service):
+    service.plan = {"primary": (0, 200), "hedge": (0, 200)}
+    assert service._post_hedged(None, {}, threshold=0.5).source == "primary"
+    assert Counter("parser:hedges_sent").value() == 0
+    assert _wait_released(service) == 0
+
+
+def test_hedge_wins_while_primary_keeps_its_slot(service):
+    service.plan = {"primary": (0.5, 200), "hedge": (0, 200)}
+    assert service._post_hedged(None, {}, threshold=0.05).source == "hedge"
+    assert Counter("parser:hedges_sent").value() == 1
+    assert Counter("parser:hedge_wins").value() == 1
+    # The losing primary is still running and still holds its lease
+    assert not service.finished["primary"].is_set()
+    assert _in_flight(service) == 1
+    assert _wait_released(service) == 0
+
+
+def test_failed_hedge_falls_back_to_primary(service):
+    service.plan = {"primary": (0.2, 200), "hedge": (0, 500)}
+    assert service._post_hedged(None, {}, threshold=0.05).source == "primary"
+    assert Counter("parser:hedge_wins").value() == 0
+
+
+def test_both_failing_returns_the_http_error_over_an_exception(service):
+    service.plan = {"primary": (0.2, ConnectionError("reset")), "hedge": (0, 502)}
+    assert service._post_hedged(None, {}, threshold=0.05).status_code == 502
+
+
+def test_no_hedge_when_the_limiter_is_full(service):
+    other = service.limiter.try_acquire()
+    service.plan = {"primary": (0.2, 200), "hedge": (0, 200)}
+    assert service._post_hedged(None, {}, threshold=0.05).source == "primary"
+    assert Counter("parser:hedges_sent").value() == 0
+    service.limiter.release(other, "success", 0.0)
+    assert _wait_released(service) == 0
+
+
+@pytest.mark.parametrize("broken", ["limiter", "rate_limiter"])
+def test_limiter_errors_mean_no_hedge(service, broken):
+    def fails():
+        raise ConnectionError("Redis is down")
+
+    if broken == "rate_limiter":
+        service.rate_limiter = type("Broken", (), {"try_acquire": staticmethod(fails)})()
+    else:
+        service.limiter.try_acquire = fails
+    service.plan = {"primary": (0.2, 200), "hedge": (0, 200)}
+
+    assert service._post_hedged(None, {}, threshold=0.05).source == "primary"
+    assert Counter("parser:hedges_sent").value() == 0
+    assert _wait_released(service) == 0
+
+
+def test_calls_share_one_executor(service):
+    executor = service._hedge_executor
+    service.plan = {"primary": (0, 200), "hedge": (0, 200)}
+    for _ in range(3):
+        service._post_hedged(None, {}, threshold=0.5)
+    assert service._hedge_executor is executor
+
+
+@pytest.mark.parametrize("outcome, observed", [(503, 0.0), (requests.exceptions.ReadTimeout("read timed out"), 60.0)])
+def test_errors_and_timeouts_feed_the_latency_histogram(redis, monkeypatch, outcome, observed):
+    # Recording only fast successes would pull the hedge threshold down during an outage
+    monkeypatch.setattr(settings, "parser_breaker_enabled", False)
+    svc = ExternalParserService(base_url="http://primary", timeout=60.0)
+    seen = []
+    monkeypatch.setattr(svc.latency, "observe", seen.append)
+
+    def post(url, **kwargs):
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResponse(outcome, "primary")
+
+    svc.session = type("Session", (), {"post": staticmethod(post)})()
+    body = type("Body", (), {"content_type": "multipart/form-data", "close": lambda self: None})
+    try:
+        svc._post(body, {})
+    except requests.exceptions.Timeout:
+        pass
+    assert seen == [pytest.approx(observed, abs=0.5)]
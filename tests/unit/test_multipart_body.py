@@ -0,0 +1,90 @@
+import io
+import threading
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from app.services.multipart_body import MultipartBody
+
+
+PDF = b"%PDF-1.4\n" + bytes(range(256)) * 1000  # ~256 KB, several read blocks
+
+
+class Recorder(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        Recorder.requests.append((dict(self.headers), body))
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def server():
+    Recorder.requests = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Recorder)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def parse_form(content_type: str, body: bytes) -> dict:
+    message = BytesParser(policy=HTTP).parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+    return {
+        part.get_param("name", header="content-disposition"): (
+            part.get_filename(), part.get_content_type(), part.get_payload(decode=True)
+        )
+        for part in message.iter_parts()
+    }
+
+
+def make_body(opened=None):
+    def open_file():
+        stream = io.BytesIO(PDF)
+        if opened is not None:
+            opened.append(stream)
+        return stream
+
+    return MultipartBody({"schema": "omip"}, "paper.pdf", open_file, len(PDF), content_type="application/pdf")
+
+
+def test_round_trip_through_requests_with_content_length(server):
+    body = make_body()
+    response = requests.post(f"{server}/parse", data=body, headers={"Content-Type": body.content_type}, timeout=10)
+    assert response.ok
+
+    headers, received = Recorder.requests[0]
+    assert "Transfer-Encoding" not in headers
+    assert int(headers["Content-Length"]) == len(body) == len(received)
+    form = parse_form(headers["Content-Type"], received)
+    assert form["schema"][2] == b"omip"
+    assert form["file"] == ("paper.pdf", "application/pdf", PDF)
+
+
+def test_blocks_add_up_to_the_declared_length():
+    body = make_body()
+    blocks = list(body)
+    assert sum(len(block) for block in blocks) == len(body)
+    assert max(len(block) for block in blocks) <= MultipartBody.CHUNK_SIZE
+    form = parse_form(body.content_type, b"".join(blocks))
+    assert form["file"][2] == PDF
+
+
+def test_close_releases_the_stream():
+    opened = []
+    body = make_body(opened)
+    body.read(10)
+    body.close()
+    assert opened[0].closed
+    assert body.read(10) == b""
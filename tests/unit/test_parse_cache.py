@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.services.parse_cache import ParseCache
+from app.workers.celery_app import celery
+
+
+RESPONSE = {"omip_id": "OMIP-001", "title": "T", "tables": [{"number": "1", "rows": []}], "figures": [], "extra": 1}
+OPTIONS = {"ocr": False}
+
+
+@pytest.fixture()
+def cache(storage):
+    return ParseCache(parser_url="http://parser-a", storage=storage)
+
+
+def test_miss_then_hit(cache):
+    assert cache.get("h1", "omip", OPTIONS) is None
+    cache.put("h1", "omip", OPTIONS, RESPONSE)
+    assert cache.get("h1", "omip", OPTIONS) == RESPONSE
+    assert cache.get("h2", "omip", OPTIONS) is None
+
+
+def test_fingerprint_covers_schema_options_url_and_version(cache, storage, monkeypatch):
+    cache.put("h1", "omip", OPTIONS, RESPONSE)
+    assert cache.get("h1", "generic", OPTIONS) is None
+    assert cache.get("h1", "omip", {"ocr": True}) is None
+    assert ParseCache(parser_url="http://parser-b", storage=storage).get("h1", "omip", OPTIONS) is None
+    monkeypatch.setattr(settings, "parser_version", settings.parser_version + "-next")
+    assert cache.get("h1", "omip", OPTIONS) is None
+
+
+def test_expired_entry_is_a_miss_and_removed(cache, storage):
+    cache.put("h1", "omip", OPTIONS, RESPONSE)
+    key = cache.key("h1", "omip", OPTIONS)
+    storage.touch(key, datetime.now(timezone.utc) - timedelta(days=settings.parse_cache_max_age_days + 1))
+    assert cache.get("h1", "omip", OPTIONS) is None
+    assert key not in storage.objects
+
+
+def test_newer_than_rejects_older_entries(cache):
+    cache.put("h1", "omip", OPTIONS, RESPONSE)
+    assert cache.get("h1", "omip", OPTIONS, newer_than=datetime.now(timezone.utc) + timedelta(seconds=1)) is None
+    assert cache.get("h1", "omip", OPTIONS, newer_than=datetime.now(timezone.utc) - timedelta(minutes=1)) == RESPONSE
+
+
+def test_unreadable_entry_is_a_miss(cache, storage):
+    cache.put("h1", "omip", OPTIONS, RESPONSE)
+    storage.objects[cache.key("h1", "omip", OPTIONS)] = (b"not json", datetime.now(timezone.utc))
+    assert cache.get("h1", "omip", OPTIONS) is None
+
+
+def test_prune_drops_expired_then_oldest(cache, storage):
+    now = datetime.now(timezone.utc)
+    for i, file_hash in enumerate(["old", "mid", "new"]):
+        cache.put(file_hash, "omip", OPTIONS, RESPONSE)
+        storage.touch(cache.key(file_hash, "omip", OPTIONS), now - timedelta(hours=3 - i))
+    cache.put("stale", "omip", OPTIONS, RESPONSE)
+    storage.touch(cache.key("stale", "omip", OPTIONS), now - timedelta(days=settings.parse_cache_max_age_days + 1))
+    size = len(storage.objects[cache.key("new", "omip", OPTIONS)][0])
+
+    assert cache.prune(max_bytes=2 * size, dry_run=True)["evicted"] == 1
+    assert len(storage.objects) == 4
+
+    stats = cache.prune(max_bytes=2 * size)
+    assert (stats["scanned"], stats["expired"], stats["evicted"], stats["bytes_after"]) == (4, 1, 1, 2 * size)
+    assert sorted(storage.objects) == sorted(cache.key(h, "omip", OPTIONS) for h in ("mid", "new"))
+
+
+def test_prune_is_scheduled_on_the_backfill_queue():
+    entry = next(e for e in celery.conf.beat_schedule.values() if e["task"] == "prune_parse_cache_task")
+    assert entry["schedule"] == settings.parse_cache_prune_interval_s
+    assert celery.conf.task_routes["prune_parse_cache_task"]["queue"] == "backfill"
@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+from app.services.parser_pool import EndpointLease, ParserEndpointPool
+
+
+URLS = ["http://a", "http://b", "http://c"]
+
+
+@pytest.fixture()
+def pool(redis):
+    return ParserEndpointPool(URLS, failure_threshold=2, readmit_after_s=30, lease_ttl_s=60)
+
+
+def _complete(pool, url, latency_s, failed=False):
+    """Acquire (url must be the pick), then release it as if the request took latency_s."""
+    lease = pool.acquire()
+    assert lease.url == url
+    lease.started = time.time() - latency_s
+    pool.release(lease, failed=failed)
+
+
+def _state(pool, url):
+    return next(e for e in pool.snapshot() if e["url"] == url)
+
+
+def test_unmeasured_idle_endpoints_are_tried_first(pool):
+    leases = [pool.acquire() for _ in URLS]
+    assert sorted(lease.url for lease in leases) == URLS
+    assert [e["in_flight"] for e in pool.snapshot()] == [1, 1, 1]
+
+
+def test_picks_lowest_inflight_times_latency(pool):
+    _complete(pool, "http://a", 1.0)
+    _complete(pool, "http://b", 10.0)
+    _complete(pool, "http://c", 2.5)
+    # scores (in_flight + 1) x ewma: a 1 -> 2 -> 3 as its leases pile up, c 2.5, b 10
+    assert [pool.acquire().url for _ in range(3)] == ["http://a", "http://a", "http://c"]
+
+
+def test_ewma_moves_towards_new_latency(pool):
+    _complete(pool, "http://a", 10.0)
+    assert _state(pool, "http://a")["latency_ewma_s"] == pytest.approx(10.0, abs=0.1)
+    pool.urls = ["http://a"]
+    _complete(pool, "http://a", 0.0)
+    assert _state(pool, "http://a")["latency_ewma_s"] == pytest.approx(8.0, abs=0.1)
+
+
+def test_consecutive_failures_evict_then_readmit(pool, monkeypatch):
+    pool.urls = ["http://a", "http://b"]
+    _complete(pool, "http://a", 1.0)
+    _complete(pool, "http://b", 1.0)
+    for _ in range(2):
+        pool.release(EndpointLease("http://a", "failed-request", time.time()), failed=True)
+    assert not _state(pool, "http://a")["healthy"]
+    assert {pool.acquire().url for _ in range(3)} == {"http://b"}
+
+    # Back after readmit_after_s; one success clears its record
+    later = time.time() + 31
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert _state(pool, "http://a")["healthy"]
+    lease = pool.acquire()
+    assert lease.url == "http://a"
+    pool.release(lease, failed=False)
+    assert _state(pool, "http://a")["consecutive_failures"] == 0
+
+
+def test_all_evicted_uses_the_one_due_back_first(pool):
+    pool.redis.hset(pool._state_key("http://a"), "evicted_until", time.time() + 50)
+    pool.redis.hset(pool._state_key("http://b"), "evicted_until", time.time() + 10)
+    pool.redis.hset(pool._state_key("http://c"), "evicted_until", time.time() + 30)
+    assert pool.acquire().url == "http://b"
+
+
+def test_expired_leases_stop_counting(pool, monkeypatch):
+    for _ in range(3):
+        pool.acquire()
+    later = time.time() + 61
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert [e["in_flight"] for e in pool.snapshot()] == [0, 0, 0]
+
+
+def test_redis_down_rotates_locally(redis_down):
+    pool = ParserEndpointPool(URLS)
+    leases = [pool.acquire() for _ in range(4)]
+    assert [lease.url for lease in leases] == URLS + ["http://a"]
+    assert all(lease.token is None for lease in leases)
+    pool.release(leases[0], failed=True)
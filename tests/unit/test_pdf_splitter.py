@@ -0,0 +1,181 @@
+import io
+import uuid
+
+import PyPDF2
+import pytest
+
+from app.core.config import settings
+from app.services.pdf_splitter import PDFSplitter
+from app.services.run_checkpoint import RunCheckpoint
+from app.workers import tasks
+
+
+RESPONSE = {"omip_id": "OMIP-010", "title": "Whole", "tables": [], "figures": []}
+
+
+def make_pdf(n_pages: int) -> bytes:
+    writer = PyPDF2.PdfWriter()
+    for _ in range(n_pages):
+        writer.add_blank_page(width=200, height=200)
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+def n_pages(pdf_bytes: bytes) -> int:
+    return len(PyPDF2.PdfReader(io.BytesIO(pdf_bytes)).pages)
+
+
+def test_short_pdf_is_one_range():
+    assert PDFSplitter(min_pages=10, pages_per_chunk=4).ranges(make_pdf(9)) == [(0, 9)]
+
+
+def test_long_pdf_is_cut_into_chunks_with_a_short_tail():
+    assert PDFSplitter(min_pages=10, pages_per_chunk=4).ranges(make_pdf(10)) == [(0, 4), (4, 8), (8, 10)]
+
+
+def test_extract_keeps_only_the_range():
+    assert n_pages(PDFSplitter.extract(make_pdf(10), 4, 8)) == 4
+    assert n_pages(PDFSplitter.extract(make_pdf(10), 8, 10)) == 2
+
+
+def test_split_cuts_every_range_from_one_read(monkeypatch):
+    reads = []
+    reader = PyPDF2.PdfReader
+    monkeypatch.setattr(PyPDF2, "PdfReader", lambda stream: reads.append(1) or reader(stream))
+    slices = PDFSplitter.split(make_pdf(10), [(0, 4), (4, 8), (8, 10)])
+    assert [n_pages(s) for s in slices] == [4, 4, 2]
+    assert len(reads) == 4  # one split, three counts
+
+
+def test_unreadable_pdf_raises():
+    with pytest.raises(Exception):
+        PDFSplitter(min_pages=10, pages_per_chunk=4).ranges(b"not a pdf")
+
+
+def test_shift_pages_makes_table_and_figure_pages_absolute():
+    result = {
+        "tables": [{"page": 1}, {"page": None}, {}],
+        "figures": [{"image": {"page": 2}}, {"image": None}, {}],
+    }
+    PDFSplitter.shift_pages(result, 15)
+    assert [t.get("page") for t in result["tables"]] == [16, None, None]
+    assert result["figures"][0]["image"]["page"] == 17
+    assert result["figures"][1]["image"] is None
+
+
+def test_renumber_keeps_unique_numbers():
+    items = [{"number": "1"}, {"number": "2"}, {"number": "S1"}]
+    assert PDFSplitter._renumber(items) == items
+
+
+def test_renumber_reassigns_duplicates_and_gaps():
+    renumbered = PDFSplitter._renumber([{"number": "1"}, {"number": "1"}, {"number": None}])
+    assert [item["number"] for item in renumbered] == ["1", "2", "3"]
+    assert [item.get("range_number") for item in renumbered] == ["1", "1", None]
+
+
+def test_merge_concatenates_ranges_in_page_order():
+    parts = [
+        {"omip_id": None, "title": "", "authors": [], "tables": [{"number": "1"}], "figures": [{"number": "1"}]},
+        {"omip_id": "OMIP-010", "title": "From range 2", "authors": ["A"], "tables": [{"number": "2"}], "figures": [{"number": "1"}]},
+    ]
+    merged = PDFSplitter.merge(parts, [(0, 15), (15, 30)])
+    assert (merged["omip_id"], merged["title"], merged["authors"]) == ("OMIP-010", "From range 2", ["A"])
+    assert [t["number"] for t in merged["tables"]] == ["1", "2"]
+    assert [f["number"] for f in merged["figures"]] == ["1", "2"]
+    assert merged["figures"][1]["range_number"] == "1"
+    assert merged["page_ranges"] == [[1, 15], [16, 30]]
+
+
+def test_split_failure_falls_back_to_the_whole_pdf(task_env, monkeypatch):
+    monkeypatch.setattr(settings, "parse_split_enabled", True)
+    env = task_env(outcome=(RESPONSE, True), pdf_bytes=b"not a pdf")
+    dispatched = []
+    monkeypatch.setattr(tasks, "dispatch_split_parse", lambda *args, **kwargs: dispatched.append(args))
+
+    tasks.parse_pdf_task(None, str(uuid.uuid4()), "paper.pdf", f"pdfs/{'d' * 64}.pdf")
+    assert dispatched == []
+    assert env["parser"].fetches == 1
+    assert env["persisted"][0].raw_metadata.title == "Whole"
+
+
+def test_long_pdf_is_dispatched_as_a_chord(task_env, monkeypatch):
+    monkeypatch.setattr(settings, "parse_split_enabled", True)
+    monkeypatch.setattr(settings, "parse_split_min_pages", 10)
+    monkeypatch.setattr(settings, "parse_split_pages_per_chunk", 5)
+    env = task_env(outcome=(RESPONSE, True), pdf_bytes=make_pdf(12))
+    dispatched = []
+    monkeypatch.setattr(tasks, "dispatch_split_parse", lambda task_args, ranges, started, pdf_bytes, queue: dispatched.append(ranges))
+
+    tasks.parse_pdf_task(None, str(uuid.uuid4()), "paper.pdf", f"pdfs/{'d' * 64}.pdf")
+    assert dispatched == [[(0, 5), (5, 10), (10, 12)]]
+    assert env["parser"].fetches == 0
+
+
+def test_range_task_reports_parked_while_the_circuit_is_open(redis, monkeypatch):
+    from app.services.circuit_breaker import CircuitBreaker
+    monkeypatch.setattr(CircuitBreaker, "is_open", lambda self: True)
+    result = tasks.parse_page_range_task(str(uuid.uuid4()), "paper.pdf", 15, 30)
+    assert result == {"start": 15, "parked": True}
+
+
+def test_split_dispatch_stores_each_range_once(storage, monkeypatch):
+    import celery
+    monkeypatch.setattr(tasks, "RunCheckpoint", lambda storage_service=None: RunCheckpoint(storage))
+    monkeypatch.setattr(celery, "chord", lambda header: lambda body: (header, body))
+    run_id = str(uuid.uuid4())
+    task_args = ["b", run_id, "paper.pdf", f"pdfs/{'d' * 64}.pdf", False]
+
+    header, _body = tasks.dispatch_split_parse(task_args, [(0, 5), (5, 12)], 0.0, make_pdf(12))
+    assert [list(sig.args) for sig in header] == [[run_id, "paper.pdf", 0, 5], [run_id, "paper.pdf", 5, 12]]
+    checkpoint = RunCheckpoint(storage)
+    assert [n_pages(checkpoint.load_slice(uuid.UUID(run_id), start)) for start in (0, 5)] == [5, 7]
+
+
+def test_range_task_parses_only_its_stored_slice(task_env, storage, monkeypatch):
+    env = task_env(outcome=RuntimeError("not used"))
+    sent = []
+    env["parser"].external_parser_service = type("Parser", (), {
+        "parse_pdf_omip": staticmethod(lambda pdf_bytes, filename: sent.append((n_pages(pdf_bytes), filename)) or {
+            "tables": [{"number": "1", "page": 1}], "figures": [],
+        }),
+    })()
+    monkeypatch.setattr(env["parser"], "download_pdf", lambda *args: pytest.fail("downloaded the whole PDF"))
+    run_id = str(uuid.uuid4())
+    RunCheckpoint(storage).save_slice(uuid.UUID(run_id), 15, make_pdf(3))
+
+    assert tasks.parse_page_range_task(run_id, "paper.pdf", 15, 18) == {"start": 15}
+    assert sent == [(3, "paper_p16-18.pdf")]
+    assert RunCheckpoint(storage).load_part(uuid.UUID(run_id), 15)["tables"][0]["page"] == 16
+
+
+def test_merged_response_is_cached_and_split_files_removed(task_env, storage, monkeypatch):
+    env = task_env(outcome=RuntimeError("not used"))
+    cached = []
+    env["parser"].cache = type("Cache", (), {"put": staticmethod(lambda *args: cached.append(args))})()
+    monkeypatch.setattr(tasks, "_announce_if_completed", lambda row: None)
+    run_id = str(uuid.uuid4())
+    checkpoint = RunCheckpoint(storage)
+    for start in (0, 15):
+        checkpoint.save_slice(uuid.UUID(run_id), start, b"%PDF")
+        checkpoint.save_part(uuid.UUID(run_id), start, dict(RESPONSE, authors=["A"], year=2020))
+    task_args = [None, run_id, "paper.pdf", f"pdfs/{'d' * 64}.pdf", False]
+
+    tasks.merge_page_ranges_task([{"start": 0}, {"start": 15}], task_args, [[0, 15], [15, 30]], 0.0)
+    assert [(args[0], args[3]["page_ranges"]) for args in cached] == [("d" * 64, [[1, 15], [16, 30]])]
+    assert len(env["persisted"]) == 1
+    assert storage.objects == {}
+
+
+def test_merge_parks_the_run_if_any_range_was_parked(task_env, storage, monkeypatch):
+    task_env(outcome=RuntimeError("not used"))
+    parked = []
+    monkeypatch.setattr(tasks, "_park", lambda breaker, task_args, queue, priority: parked.append((task_args, queue)))
+    run_id = str(uuid.uuid4())
+    RunCheckpoint(storage).save_part(uuid.UUID(run_id), 0, RESPONSE)
+    task_args = ["b", run_id, "paper.pdf", f"pdfs/{'d' * 64}.pdf", False]
+
+    tasks.merge_page_ranges_task([{"start": 0}, {"start": 15, "parked": True}], task_args, [[0, 15], [15, 30]], 0.0)
+    assert parked == [(task_args, "bulk")]
+    assert storage.objects == {}
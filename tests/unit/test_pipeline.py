@@ -0,0 +1,164 @@
+import threading
+import uuid
+from contextlib import contextmanager
+
+import pytest
+
+from app.core.config import settings
+from app.services.adaptive_limiter import LimiterTimeout
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.pdf_parser_service import PDFParserService
+from app.workers import pipeline, tasks
+
+
+RESPONSE = {"omip_id": "OMIP-003", "title": "Piped", "tables": [], "figures": []}
+
+
+class FakeParserService(PDFParserService):
+    """Outcome of the PARSER call chosen by filename; build_payload is the real one."""
+
+    def __init__(self, storage, outcomes):
+        self.storage_service = storage
+        self.outcomes = outcomes
+
+    def cached_parser_result(self, object_key):
+        return None
+
+    def download_pdf(self, object_key, filename=""):
+        if self.outcomes.get(filename) == "download":
+            raise Exception("Failed to download PDF from storage: NoSuchKey")
+        return b"%PDF"
+
+    def fetch_parser_result(self, object_key, filename, force_reparse, pdf_bytes):
+        outcome = self.outcomes.get(filename)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return RESPONSE, True
+
+
+class FakeRuns:
+    def __init__(self, db):
+        pass
+
+    def mark_processing(self, run_id):
+        return None
+
+    def set_stage(self, run_id, stage):
+        pass
+
+
+@pytest.fixture()
+def env(redis, storage, monkeypatch):
+    """Pipeline wired to in-memory stand-ins; hand-offs to tasks are recorded."""
+    @contextmanager
+    def null_session():
+        yield None
+
+    calls = {"persisted": [], "dispatched": [], "parked": [], "failed": [], "outcomes": {}}
+
+    class FakeParseService:
+        def persist_parse_result(self, run_id, batch_id, payload):
+            calls["persisted"].append(str(run_id))
+
+    monkeypatch.setattr(settings, "parser_breaker_enabled", False)
+    monkeypatch.setattr(pipeline, "PDFParserService", lambda: FakeParserService(storage, calls["outcomes"]))
+    monkeypatch.setattr(pipeline, "get_session", null_session)
+    monkeypatch.setattr(pipeline, "RunRepository", FakeRuns)
+    monkeypatch.setattr(pipeline, "ParseService", FakeParseService)
+    monkeypatch.setattr(tasks, "_announce_if_completed", lambda row: None)
+    monkeypatch.setattr(tasks, "_park", lambda breaker, args, *rest: calls["parked"].append(args[1]))
+    monkeypatch.setattr(tasks, "dispatch_parse", lambda *args, **kwargs: calls["dispatched"].append(args[1]))
+    monkeypatch.setattr(
+        tasks, "_record_batch_result",
+        lambda batch_id, success, failed_run_id=None, error="": calls["failed"].append(failed_run_id),
+    )
+    return calls
+
+
+def _items(*filenames):
+    return [pipeline.PipelineItem(str(uuid.uuid4()), str(uuid.uuid4()), name, f"pdfs/{'c' * 64}.pdf") for name in filenames]
+
+
+def _run(items, prefetch=1):
+    """Run the pipeline on a thread so a deadlock fails the test instead of hanging it."""
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(stats=pipeline.ParsePipeline(prefetch).run(items)), daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive(), "pipeline did not shut down"
+    return result["stats"]
+
+
+def test_each_outcome_is_handed_off_once(env):
+    env["outcomes"].update({
+        "bad.pdf": Exception("422 unprocessable"),
+        "busy.pdf": Exception("503 Service Unavailable"),
+        "open.pdf": CircuitOpenError("parser"),
+        "gone.pdf": "download",
+    })
+    ok, bad, busy, open_, gone = items = _items("ok.pdf", "bad.pdf", "busy.pdf", "open.pdf", "gone.pdf")
+
+    stats = _run(items)
+    assert stats == {"persisted": 1, "failed": 2, "requeued": 1, "parked": 1}
+    assert env["persisted"] == [ok.run_id]
+    assert env["failed"] == [bad.run_id, gone.run_id]
+    assert env["dispatched"] == [busy.run_id]
+    assert env["parked"] == [open_.run_id]
+
+
+def test_limiter_timeouts_are_requeued_not_failed(env, monkeypatch):
+    monkeypatch.setattr(tasks, "_record_batch_result", lambda *args, **kwargs: pytest.fail("counted as a failure"))
+    env["outcomes"]["full.pdf"] = LimiterTimeout("timeout waiting for a PARSER slot")
+    items = _items("full.pdf")
+
+    assert _run(items) == {"persisted": 0, "failed": 0, "requeued": 1, "parked": 0}
+    assert env["dispatched"] == [items[0].run_id]
+
+
+def test_a_failing_park_does_not_stall_the_pipeline(env, monkeypatch):
+    def park_fails(*args):
+        raise ConnectionError("Redis is down")
+
+    monkeypatch.setattr(tasks, "_park", park_fails)
+    env["outcomes"]["open.pdf"] = CircuitOpenError("parser")
+    items = _items("open.pdf", "ok.pdf", "ok2.pdf")
+
+    stats = _run(items)
+    assert env["dispatched"] == [items[0].run_id]
+    assert stats == {"persisted": 2, "failed": 0, "requeued": 1, "parked": 0}
+
+
+def test_a_failing_fail_is_recovered(env, monkeypatch):
+    def record_fails(*args, **kwargs):
+        raise ConnectionError("database is down")
+
+    monkeypatch.setattr(tasks, "_record_batch_result", record_fails)
+    env["outcomes"]["bad.pdf"] = Exception("422 unprocessable")
+    items = _items("bad.pdf", "ok.pdf")
+
+    stats = _run(items)
+    assert env["dispatched"] == [items[0].run_id]
+    assert stats["persisted"] == 1 and stats["requeued"] == 1
+
+
+def test_persist_errors_fail_the_run(env, monkeypatch):
+    class BrokenParseService:
+        def persist_parse_result(self, *args):
+            raise ValueError("constraint violated")
+
+    monkeypatch.setattr(pipeline, "ParseService", BrokenParseService)
+    items = _items("a.pdf", "b.pdf")
+    assert _run(items, prefetch=2) == {"persisted": 0, "failed": 2, "requeued": 0, "parked": 0}
+    assert env["failed"] == [item.run_id for item in items]
+
+
+def test_run_returns_even_when_nothing_can_be_handed_off(env, monkeypatch):
+    def fails(*args, **kwargs):
+        raise ConnectionError("everything is down")
+
+    monkeypatch.setattr(tasks, "_park", fails)
+    monkeypatch.setattr(tasks, "dispatch_parse", fails)
+    monkeypatch.setattr(tasks, "_record_batch_result", fails)
+    env["outcomes"]["open.pdf"] = CircuitOpenError("parser")
+
+    assert _run(_items("open.pdf")) == {"persisted": 0, "failed": 0, "requeued": 0, "parked": 0}
@@ -0,0 +1,85 @@
+import hashlib
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from app.schemas.api import PresignCompleteFile
+from app.services import presigned_upload_service
+from app.services.presigned_upload_service import PresignedUploadService
+from app.workers import tasks
+
+
+REAL = b"%PDF-real-content"
+SHA = hashlib.sha256(REAL).hexdigest()
+UPLOAD_KEY = f"{PresignedUploadService.STAGING_PREFIX}session/{SHA}"
+
+
+@pytest.fixture()
+def service(redis, storage, monkeypatch):
+    """Completion against in-memory storage; verification tasks are queued, not run."""
+    @contextmanager
+    def null_session():
+        yield None
+
+    class FakePapers:
+        def __init__(self, db):
+            pass
+
+        def get_or_create_many(self, items):
+            return {h: SimpleNamespace(id=f"paper-{h[:8]}", filename=f) for f, h in items}
+
+    svc = PresignedUploadService.__new__(PresignedUploadService)
+    svc.storage = storage
+    svc.queued = []
+    monkeypatch.setattr(tasks.verify_presigned_upload_task, "delay", lambda *args: svc.queued.append(args))
+    monkeypatch.setattr(presigned_upload_service, "get_session", null_session)
+    monkeypatch.setattr(presigned_upload_service, "PaperRepository", FakePapers)
+    return svc
+
+
+def _complete(svc, size=len(REAL)):
+    return svc.complete([PresignCompleteFile(upload_key=UPLOAD_KEY, filename="p.pdf", size=size)])
+
+
+def test_complete_only_checks_the_size_and_queues_verification(service, storage, monkeypatch):
+    monkeypatch.setattr(storage, "compute_sha256_object", lambda key: pytest.fail("hashed on the API tier"))
+    storage.put_object(UPLOAD_KEY, REAL)
+
+    body = _complete(service)
+    assert body == {"papers": [], "pending": [{"upload_key": UPLOAD_KEY, "filename": "p.pdf"}], "errors": []}
+    assert service.queued == [(UPLOAD_KEY, SHA)]
+
+
+def test_size_mismatch_is_rejected_without_verification(service, storage):
+    storage.put_object(UPLOAD_KEY, REAL)
+    body = _complete(service, size=len(REAL) + 1)
+    assert body["errors"][0]["error"].startswith("size mismatch")
+    assert service.queued == [] and storage.objects == {}
+
+
+def test_verified_upload_is_promoted_then_registered(service, storage):
+    storage.put_object(UPLOAD_KEY, REAL)
+    assert service.verify(UPLOAD_KEY, SHA) == PresignedUploadService.STORED
+    assert list(storage.objects) == [f"pdfs/{SHA}.pdf"]
+
+    body = _complete(service)
+    assert body["pending"] == [] and body["errors"] == []
+    assert body["papers"][0]["file_hash"] == SHA and body["papers"][0]["duplicate"] is False
+
+
+def test_forged_upload_never_reaches_the_content_addressed_key(service, storage):
+    storage.put_object(UPLOAD_KEY, b"%PDF-forged-bytes")
+    assert service.verify(UPLOAD_KEY, SHA) == PresignedUploadService.MISMATCH
+    assert storage.objects == {}
+
+    body = _complete(service)
+    assert body["papers"] == []
+    assert body["errors"][0]["error"] == "sha256 mismatch"
+
+
+def test_repeated_verification_is_a_no_op(service, storage):
+    storage.put_object(UPLOAD_KEY, REAL)
+    service.verify(UPLOAD_KEY, SHA)
+    assert service.verify(UPLOAD_KEY, SHA) is None
+    assert _complete(service)["papers"][0]["file_hash"] == SHA
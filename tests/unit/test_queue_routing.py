@@ -0,0 +1,77 @@
+import pytest
+
+from app.core.config import settings
+from app.services.parse_service import ParseService, _queue_for
+from app.workers import tasks
+from app.workers.celery_app import (
+    QUEUE_BACKFILL,
+    QUEUE_BULK,
+    QUEUE_INTERACTIVE,
+    QUEUE_PRIORITY,
+    celery,
+)
+
+
+@pytest.fixture()
+def sent(monkeypatch):
+    """Capture apply_async calls of the parse tasks instead of publishing them."""
+    calls = []
+
+    def capture(name):
+        return lambda args=None, **kwargs: calls.append((name, args, kwargs))
+
+    monkeypatch.setattr(tasks.parse_pdf_task, "apply_async", capture("parse_pdf_task"))
+    monkeypatch.setattr(tasks.parse_pdf_chunk_task, "apply_async", capture("parse_pdf_chunk_task"))
+    return calls
+
+
+def test_workers_poll_queues_in_strict_priority_order():
+    conf = celery.conf
+    assert [q.name for q in conf.task_queues] == [QUEUE_INTERACTIVE, QUEUE_BULK, QUEUE_BACKFILL]
+    assert conf.broker_transport_options["queue_order_strategy"] == "priority"
+    assert conf.task_default_queue == QUEUE_BULK
+    assert QUEUE_PRIORITY[QUEUE_INTERACTIVE] < QUEUE_PRIORITY[QUEUE_BULK] < QUEUE_PRIORITY[QUEUE_BACKFILL]
+
+
+def test_maintenance_tasks_are_routed_by_name():
+    routes = celery.conf.task_routes
+    assert routes["probe_circuit_task"]["queue"] == QUEUE_INTERACTIVE
+    assert routes["prune_parse_cache_task"]["queue"] == QUEUE_BACKFILL
+
+
+def test_single_paper_is_interactive_and_batches_are_bulk():
+    assert _queue_for(1) == QUEUE_INTERACTIVE
+    assert _queue_for(2) == QUEUE_BULK
+
+
+@pytest.mark.parametrize("queue", [QUEUE_INTERACTIVE, QUEUE_BULK, QUEUE_BACKFILL])
+def test_dispatch_parse_uses_the_queue_and_its_default_priority(sent, queue):
+    tasks.dispatch_parse("b", "r", "f.pdf", "pdfs/x.pdf", queue=queue)
+    (name, args, kwargs), = sent
+    assert name == "parse_pdf_task"
+    assert args == ["b", "r", "f.pdf", "pdfs/x.pdf", False]
+    assert kwargs["queue"] == queue
+    assert kwargs["priority"] == QUEUE_PRIORITY[queue]
+
+
+def test_dispatch_parse_keeps_an_explicit_priority(sent):
+    tasks.dispatch_parse("b", "r", "f.pdf", "k", queue=QUEUE_BULK, priority=0)
+    assert sent[0][2]["priority"] == 0
+
+
+def test_single_paper_batch_bypasses_scheduler_and_pipeline(sent, monkeypatch):
+    monkeypatch.setattr(settings, "pipeline_enabled", True)
+    monkeypatch.setattr(settings, "scheduler_enabled", True)
+    ParseService()._dispatch("b", [("r1", "f1.pdf", "k1")])
+    (name, args, kwargs), = sent
+    assert name == "parse_pdf_task"
+    assert kwargs["queue"] == QUEUE_INTERACTIVE
+
+
+def test_bulk_batch_in_pipeline_mode_is_sent_as_chunks(sent, monkeypatch):
+    monkeypatch.setattr(settings, "pipeline_enabled", True)
+    monkeypatch.setattr(settings, "pipeline_chunk_size", 2)
+    ParseService()._dispatch("b", [(f"r{i}", f"f{i}.pdf", f"k{i}") for i in range(5)])
+    assert [name for name, _, _ in sent] == ["parse_pdf_chunk_task"] * 3
+    assert [len(args[0]) for _, args, _ in sent] == [2, 2, 1]
+    assert all(kwargs["queue"] == QUEUE_BULK for _, _, kwargs in sent)
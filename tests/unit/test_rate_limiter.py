@@ -0,0 +1,77 @@
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services.rate_limiter import RateLimitTimeout, TokenBucketRateLimiter
+
+
+def test_burst_is_available_immediately_then_empty(redis):
+    limiter = TokenBucketRateLimiter("test", rate=1.0, burst=3)
+    assert [limiter.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+
+def test_tokens_refill_at_the_configured_rate(redis):
+    limiter = TokenBucketRateLimiter("test", rate=20.0, burst=1)
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+    time.sleep(0.06)  # > 1/20 s
+    assert limiter.try_acquire()
+
+
+def test_acquire_blocks_until_a_token_refills(redis):
+    limiter = TokenBucketRateLimiter("test", rate=5.0, burst=1)
+    limiter.acquire()
+    start = time.time()
+    limiter.acquire()
+    assert 0.15 <= time.time() - start < 0.5
+
+
+def test_acquire_times_out_instead_of_waiting_past_the_deadline(redis):
+    limiter = TokenBucketRateLimiter("test", rate=0.1, burst=1, wait_timeout_s=0.5)
+    limiter.acquire()
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire()
+
+
+def test_buckets_are_per_endpoint(redis):
+    parser = TokenBucketRateLimiter("parser", rate=1.0, burst=1)
+    llm = TokenBucketRateLimiter("llm", rate=1.0, burst=1)
+    assert parser.try_acquire()
+    assert not parser.try_acquire()
+    assert llm.try_acquire()
+
+
+def test_buckets_are_shared_between_instances(redis):
+    # Every worker builds its own limiter object; the bucket lives in Redis
+    assert TokenBucketRateLimiter("test", rate=1.0, burst=1).try_acquire()
+    assert not TokenBucketRateLimiter("test", rate=1.0, burst=1).try_acquire()
+
+
+def test_for_endpoint_reads_settings_and_zero_rate_disables(redis, monkeypatch):
+    monkeypatch.setattr(settings, "parser_rate_limit_rps", 0)
+    assert TokenBucketRateLimiter.for_endpoint("parser") is None
+
+    monkeypatch.setattr(settings, "llm_rate_limit_rps", 2.5)
+    monkeypatch.setattr(settings, "llm_rate_limit_burst", 7)
+    limiter = TokenBucketRateLimiter.for_endpoint("llm")
+    assert (limiter.name, limiter.rate, limiter.burst) == ("llm", 2.5, 7)
+
+
+def test_fails_open_when_redis_is_down(redis_down):
+    limiter = TokenBucketRateLimiter("test", rate=0.001, burst=1)
+    assert limiter.try_acquire()
+    assert limiter.try_acquire()
+    limiter.acquire()  # returns instead of blocking
+
+
+def test_parser_client_lets_the_timeout_through_unwrapped(redis, monkeypatch):
+    # A wrapped "timeout" message would read as a retryable PARSER error
+    from app.services.external_parser_service import ExternalParserService
+
+    monkeypatch.setattr(settings, "parser_breaker_enabled", False)
+    svc = ExternalParserService(base_url="http://parser")
+    svc.rate_limiter = TokenBucketRateLimiter("test", rate=0.1, burst=1, wait_timeout_s=0.1)
+    svc.rate_limiter.acquire()
+    with pytest.raises(RateLimitTimeout):
+        svc.parse_pdf_stream(lambda: None, 0, "paper.pdf")
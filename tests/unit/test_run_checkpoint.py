@@ -0,0 +1,85 @@
+import uuid
+
+import pytest
+
+from app.core.config import settings
+from app.models.models import ParseStage
+from app.services.rate_limiter import RateLimitTimeout
+from app.services.run_checkpoint import RunCheckpoint
+from app.workers import tasks
+
+
+OBJECT_KEY = f"pdfs/{'b' * 64}.pdf"
+RESPONSE = {"omip_id": "OMIP-007", "title": "Checkpointed", "tables": [{"number": "1", "rows": [[{"text": "x"}]]}], "figures": []}
+
+
+def _run(run_id):
+    tasks.parse_pdf_task(None, run_id, "paper.pdf", OBJECT_KEY)
+
+
+def test_fresh_response_is_checkpointed_until_persisted(task_env):
+    env = task_env(outcome=(RESPONSE, True))
+    run_id = str(uuid.uuid4())
+    saved = []
+    env["storage"].put_object = lambda key, data, content_type=None: saved.append(key)
+
+    _run(run_id)
+    assert saved == [f"runs/{run_id}/parser_raw.json"]
+    assert env["runs"].stages == [ParseStage.parsed.value]
+    assert env["persisted"][0].raw_metadata.omip_id == "OMIP-007"
+    assert env["storage"].objects == {}
+
+
+def test_cached_response_is_not_checkpointed(task_env):
+    env = task_env(outcome=(RESPONSE, False))
+    run_id = str(uuid.uuid4())
+    _run(run_id)
+    assert env["runs"].stages == []
+    assert env["storage"].objects == {}
+    assert len(env["persisted"]) == 1
+
+
+def test_retry_resumes_from_the_checkpoint_without_calling_parser(task_env, storage):
+    env = task_env(stage=ParseStage.parsed, outcome=RuntimeError("PARSER must not be called"))
+    run_id = str(uuid.uuid4())
+    RunCheckpoint(storage).save_raw(uuid.UUID(run_id), RESPONSE)
+
+    _run(run_id)
+    assert env["parser"].fetches == 0
+    assert env["persisted"][0].raw_metadata.title == "Checkpointed"
+    assert env["storage"].objects == {}
+
+
+def test_unusable_checkpoint_falls_back_to_parser(task_env, storage):
+    env = task_env(stage=ParseStage.parsed, outcome=(RESPONSE, True))
+    run_id = str(uuid.uuid4())
+    storage.put_object(f"runs/{run_id}/parser_raw.json", b"{broken")
+
+    _run(run_id)
+    assert env["parser"].fetches == 1
+    assert len(env["persisted"]) == 1
+
+
+def test_final_failure_clears_the_checkpoint(task_env, storage):
+    env = task_env(stage=ParseStage.parsed, outcome=(RESPONSE, True))
+    run_id = str(uuid.uuid4())
+    RunCheckpoint(storage).save_raw(uuid.UUID(run_id), {"omip_id": "not an OMIP id", "tables": [], "figures": []})
+
+    with pytest.raises(Exception):
+        _run(run_id)
+    assert len(env["failed"]) == 1
+    assert env["released"] == [None]
+    assert storage.objects == {}
+
+
+def test_limiter_timeout_requeues_without_using_a_retry(task_env, monkeypatch):
+    env = task_env(outcome=RateLimitTimeout("timeout waiting for a PARSER rate token"))
+    sent = []
+    monkeypatch.setattr(tasks.parse_pdf_task, "apply_async", lambda **kwargs: sent.append(kwargs))
+    monkeypatch.setattr(tasks.parse_pdf_task, "retry", lambda **kwargs: pytest.fail("used a retry"))
+    run_id = str(uuid.uuid4())
+
+    _run(run_id)
+    assert [s["countdown"] for s in sent] == [settings.parser_limiter_requeue_s]
+    assert sent[0]["args"][1] == run_id
+    assert env["failed"] == [] and env["released"] == []
@@ -0,0 +1,109 @@
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services.parse_cache import ParseCache
+from app.services.pdf_parser_service import ParseInFlight, PDFParserService
+from app.services.single_flight import SingleFlight
+
+
+FILE_HASH = "a" * 64
+OBJECT_KEY = f"pdfs/{FILE_HASH}.pdf"
+
+
+class FakeParser:
+    base_url = "http://parser"
+
+    def __init__(self):
+        self.calls = 0
+
+    def parse_pdf_omip(self, pdf_bytes, filename):
+        self.calls += 1
+        return {"omip_id": "OMIP-001", "title": f"call {self.calls}", "tables": [], "figures": []}
+
+
+@pytest.fixture()
+def service(redis, storage):
+    svc = PDFParserService.__new__(PDFParserService)
+    svc.external_parser_service = FakeParser()
+    svc.storage_service = storage
+    svc.cache = ParseCache(FakeParser.base_url, storage)
+    svc.single_flight = SingleFlight("parse", lease_ttl_s=60)
+    return svc
+
+
+def _fetch(service, **kwargs):
+    result, _ = service.fetch_parser_result(OBJECT_KEY, "paper.pdf", pdf_bytes=b"%PDF", **kwargs)
+    return result
+
+
+def _lease_key(service):
+    return service.cache.key(FILE_HASH, service.SCHEMA, service.OPTIONS)
+
+
+def test_leader_parses_caches_and_releases(service, redis):
+    assert _fetch(service)["title"] == "call 1"
+    assert service.external_parser_service.calls == 1
+    assert redis.keys("singleflight:*") == []
+    assert _fetch(service)["title"] == "call 1"
+    assert service.external_parser_service.calls == 1
+
+
+def test_follower_does_not_wait_while_the_leader_parses(service):
+    token = service.single_flight.try_acquire(_lease_key(service))
+    started = time.time()
+    with pytest.raises(ParseInFlight) as info:
+        _fetch(service)
+    assert time.time() - started < 1
+    assert info.value.since == pytest.approx(started, abs=1)
+    assert service.external_parser_service.calls == 0
+
+    # The follower keeps its original start time across attempts
+    with pytest.raises(ParseInFlight) as again:
+        _fetch(service, following_since=info.value.since)
+    assert again.value.since == info.value.since
+    service.single_flight.release(_lease_key(service), token)
+
+
+def test_follower_takes_the_leaders_response(service):
+    token = service.single_flight.try_acquire(_lease_key(service))
+    with pytest.raises(ParseInFlight) as info:
+        _fetch(service)
+    service.cache.put(FILE_HASH, service.SCHEMA, service.OPTIONS, {"title": "from leader", "tables": [], "figures": []})
+    assert _fetch(service, following_since=info.value.since)["title"] == "from leader"
+    assert service.external_parser_service.calls == 0
+    service.single_flight.release(_lease_key(service), token)
+
+
+def test_follower_becomes_leader_when_the_lease_is_gone(service):
+    token = service.single_flight.try_acquire(_lease_key(service))
+    with pytest.raises(ParseInFlight) as info:
+        _fetch(service)
+    service.single_flight.release(_lease_key(service), token)
+    assert _fetch(service, following_since=info.value.since)["title"] == "call 1"
+
+
+def test_follower_parses_itself_after_wait_limit(service):
+    service.single_flight.try_acquire(_lease_key(service))
+    since = time.time() - settings.parse_single_flight_wait_s - 1
+    assert _fetch(service, following_since=since)["title"] == "call 1"
+
+
+def test_redis_down_parses_directly(service, redis_down):
+    service.single_flight = SingleFlight("parse", lease_ttl_s=60)
+    assert _fetch(service)["title"] == "call 1"
+
+
+def test_pipeline_hands_a_follower_to_a_single_pdf_task(monkeypatch):
+    from app.workers import pipeline, tasks
+
+    dispatched = []
+    monkeypatch.setattr(tasks, "dispatch_parse", lambda *args, **kwargs: dispatched.append((args, kwargs)))
+    pipe = pipeline.ParsePipeline.__new__(pipeline.ParsePipeline)
+    pipe.stats = {"persisted": 0, "failed": 0, "requeued": 0, "parked": 0}
+    pipe.settled = set()
+
+    pipe._follow(pipeline.PipelineItem("b", "r", "paper.pdf", OBJECT_KEY))
+    assert dispatched == [(("b", "r", "paper.pdf", OBJECT_KEY, False), {"countdown": settings.parse_single_flight_poll_s})]
+    assert pipe.stats["requeued"] == 1